@@ -63,4 +63,89 @@ REQUEST_TIMEOUT = 5
 # Default values jika API gagal
 DEFAULT_TEMPERATURE = 28.5
 DEFAULT_HUMIDITY = 75
-DEFAULT_DESCRIPTION = "berawan"
\ No newline at end of file
+DEFAULT_DESCRIPTION = "berawan"
+
+# Konfigurasi model registry
+# Batas memori (MB) untuk model yang dimuat bersamaan sebelum model LRU dikeluarkan
+MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "512"))
+DEFAULT_MODEL_ID = os.getenv("DEFAULT_MODEL_ID", "lstm_smote_cv_3")
+
+# Batas memori (MB) untuk cache hasil prediksi yang dibagi antar sesi
+PREDICTION_CACHE_MAX_MB = int(os.getenv("PREDICTION_CACHE_MAX_MB", "64"))
+
+# Konfigurasi worker inferensi: "thread" atau "process", jumlah worker, dan antrean maksimum
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "8"))
+
+# Folder cache kolom biner (.npy) untuk dataset CSV agar start ulang tidak mem-parse teks lagi
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", os.path.join("dashboard", "data", ".cache"))
+
+# Model yang dipanaskan di background saat server start (dipisah koma, kosong = hanya data)
+WARMUP_MODEL_IDS = [
+    model_id.strip()
+    for model_id in os.getenv("WARMUP_MODEL_IDS", DEFAULT_MODEL_ID).split(",")
+    if model_id.strip()
+]
+
+# Batas peta Sulawesi Selatan [[lat utara, lon barat], [lat selatan, lon timur]]
+SULSEL_MAX_BOUNDS = [[-1.396842, 118.991911], [-7.941256, 122.786092]]
+
+# Konfigurasi inferensi grid: resolusi (derajat), ukuran tile (sel), jarak maksimum
+# ke titik sampel terdekat (derajat), dan folder output raster
+GRID_RESOLUTION_DEG = float(os.getenv("GRID_RESOLUTION_DEG", "0.01"))
+GRID_TILE_SIZE = int(os.getenv("GRID_TILE_SIZE", "256"))
+GRID_MAX_NEIGHBOR_DISTANCE_DEG = float(os.getenv("GRID_MAX_NEIGHBOR_DISTANCE_DEG", "0.05"))
+GRID_OUTPUT_DIR = os.getenv("GRID_OUTPUT_DIR", os.path.join("dashboard", "data", "grid"))
+
+# Interpolasi curah hujan kota ke titik prediksi: jumlah kota tetangga (1 = kota terdekat)
+# dan pangkat inverse distance weighting
+WEATHER_IDW_NEIGHBORS = int(os.getenv("WEATHER_IDW_NEIGHBORS", "4"))
+WEATHER_IDW_POWER = float(os.getenv("WEATHER_IDW_POWER", "2"))
+
+# Instrumentasi waktu per tahap: file trace (format Chrome trace) yang ditulis saat server
+# berhenti (kosong = tidak ditulis) dan jumlah event terakhir yang disimpan
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "10000"))
+
+# Inferensi sharded multi-proses untuk dataset besar: jumlah worker (0 = nonaktif)
+# dan jumlah baris minimum sebelum mode sharded dipakai
+SHARDED_INFERENCE_WORKERS = int(os.getenv("SHARDED_INFERENCE_WORKERS", "0"))
+SHARDED_MIN_ROWS = int(os.getenv("SHARDED_MIN_ROWS", "200000"))
+
+# Jumlah baris maksimum (skenario x titik) dalam satu batch skenario curah hujan
+SCENARIO_MAX_BATCH_ROWS = int(os.getenv("SCENARIO_MAX_BATCH_ROWS", "2000000"))
+
+# Folder cache model terkompilasi (graph beku per hash file .h5) agar worker baru tidak
+# membangun ulang layer Keras (kosong = nonaktif)
+MODEL_ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", os.path.join("dashboard", "models", ".cache"))
+
+# Batas kabupaten: level zoom yang disimplifikasi, toleransi simplifikasi (piksel layar),
+# langkah kuantisasi koordinat (derajat), dan folder cache biner
+BOUNDARY_ZOOM_LEVELS = [
+    int(zoom) for zoom in os.getenv("BOUNDARY_ZOOM_LEVELS", "6,8,10,12,14").split(",") if zoom.strip()
+]
+BOUNDARY_PIXEL_TOLERANCE = float(os.getenv("BOUNDARY_PIXEL_TOLERANCE", "1"))
+BOUNDARY_QUANTIZATION_DEG = float(os.getenv("BOUNDARY_QUANTIZATION_DEG", "0.00001"))
+BOUNDARY_CACHE_DIR = os.getenv("BOUNDARY_CACHE_DIR", os.path.join(DATA_CACHE_DIR, "boundaries"))
+
+# Vector tile (MVT): ukuran cache tile (MB), jumlah run prediksi yang tile-nya disimpan,
+# resolusi tile, dan buffer di tepi tile (unit tile)
+TILE_CACHE_MAX_MB = int(os.getenv("TILE_CACHE_MAX_MB", "32"))
+TILE_MAX_RUNS = int(os.getenv("TILE_MAX_RUNS", "8"))
+TILE_EXTENT = 4096
+TILE_BUFFER = int(os.getenv("TILE_BUFFER", "64"))
+# Lama browser boleh memakai tile dari cache (detik); run id yang sama bisa
+# dipublikasikan ulang (mis. ground truth setelah dataset berubah)
+TILE_MAX_AGE_S = int(os.getenv("TILE_MAX_AGE_S", "60"))
+
+# Klaster titik di peta: zoom terdalam yang masih diklaster (di atasnya titik digambar satu per satu)
+# dan ukuran sel grid klaster dalam piksel layar (pangkat dua, maks. 256)
+CLUSTER_MAX_ZOOM = int(os.getenv("CLUSTER_MAX_ZOOM", "11"))
+CLUSTER_CELL_PX = int(os.getenv("CLUSTER_CELL_PX", "64"))
+
+# Titik per viewport peta: margin di sekitar tampilan (fraksi lebar/tinggi per sisi),
+# jumlah entri cache per bbox terkuantisasi, dan jumlah tile maksimum per bbox
+VIEWPORT_MARGIN = float(os.getenv("VIEWPORT_MARGIN", "0.25"))
+VIEWPORT_CACHE_SIZE = int(os.getenv("VIEWPORT_CACHE_SIZE", "256"))
+VIEWPORT_MAX_TILES = int(os.getenv("VIEWPORT_MAX_TILES", "64"))
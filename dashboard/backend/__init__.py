@@ -1,9 +1,16 @@
 from .flood_prediction import FloodPredictionModel
+from .tflite_backend import TFLiteFloodModel
+from .model_registry import ModelRegistry, ModelSpec
 from .inference import MapState, load_example_inference_data, get_ground_truth_targets
+from .warmup import WarmupManager
 
 __all__ = [
     "FloodPredictionModel",
+    "TFLiteFloodModel",
+    "ModelRegistry",
+    "ModelSpec",
     "MapState",
+    "WarmupManager",
     "load_example_inference_data",
     "get_ground_truth_targets",
 ]
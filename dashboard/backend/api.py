@@ -0,0 +1,238 @@
+"""HTTP endpoints served alongside the Reflex app"""
+
+import asyncio
+from typing import Optional, List
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+
+from config import TILE_MAX_AGE_S
+from .timing import SpanRecorder
+from .warmup import WarmupManager
+from .model_registry import ModelRegistry
+from .inference_executor import InferenceExecutor
+from .scenario_prediction import RainfallScenario, predict_scenarios
+from .boundaries import RegencyBoundaries
+from .prediction_cache import PredictionCache
+from .inference import await_model, prediction_cache_key, predict_flood_result, _regency_summary
+from .vector_tiles import MVT_CONTENT_TYPE, TileRunRegistry
+from .point_clusters import ClusterRegistry
+from .viewport_points import GROUND_TRUTH_RUN_ID, publish_ground_truth
+
+
+MAX_TILE_ZOOM = 22
+
+
+api = FastAPI()
+
+
+@api.get("/api/timings")
+async def get_timings() -> dict:
+    """Latency histograms per span of the flood prediction path."""
+    return {"spans": SpanRecorder.get_instance().get_histograms()}
+
+
+@api.get("/api/timings/trace")
+async def get_timings_trace() -> JSONResponse:
+    """Recent spans as a Chrome trace file (open in chrome://tracing or Perfetto)."""
+    return JSONResponse(
+        SpanRecorder.get_instance().get_trace(),
+        headers={"Content-Disposition": 'attachment; filename="flood-trace.json"'},
+    )
+
+
+@api.delete("/api/timings")
+async def reset_timings() -> dict:
+    """Clear the recorded spans, e.g. before measuring a specific scenario."""
+    SpanRecorder.get_instance().reset()
+    return {"status": "reset"}
+
+
+@api.get("/api/warmup")
+async def get_warmup() -> dict:
+    """Readiness and load time of each warm-up artifact, and the overall cold start."""
+    return WarmupManager.get_instance().get_warmup_info()
+
+
+@api.get("/api/boundaries")
+async def get_boundaries(zoom: float = Query(default=8, ge=0, le=22)) -> JSONResponse:
+    """Regency boundaries simplified for a map zoom level, as GeoJSON."""
+    boundaries = RegencyBoundaries.get_instance()
+    collection = await asyncio.to_thread(boundaries.to_geojson, zoom)
+    return JSONResponse(
+        collection,
+        headers={
+            "Cache-Control": "public, max-age=86400",
+            "X-Boundary-Level": str(boundaries.level_for_zoom(zoom)),
+        },
+    )
+
+
+async def _await_model(model_id: str) -> None:
+    """Wait until a model can serve: 400 for an unknown id, 503 if it fails to load."""
+    try:
+        await await_model(model_id)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (OSError, RuntimeError) as e:
+        raise HTTPException(status_code=503, detail=f"Model {model_id} failed to load: {e}")
+
+
+async def _run_inference(fn, *args):
+    """Run a job on the inference executor: 503 if its queue is full or the job fails."""
+    try:
+        return await InferenceExecutor.get_instance().run(fn, *args)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@api.get("/api/regencies")
+async def get_regency_summary(
+    model_id: Optional[str] = None,
+    threshold: float = Query(default=0.5, ge=0, le=1),
+) -> dict:
+    """Predicted flood points per kabupaten, highest flood ratio first.
+
+    Empty if the regency boundaries are unavailable, like the map's summary.
+    """
+    model_id = model_id or ModelRegistry.get_instance().default_model_id
+    cache = PredictionCache.get_instance()
+    try:
+        cache_key = await asyncio.to_thread(prediction_cache_key, model_id)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = cache.get(cache_key)
+    if result is None:
+        await _await_model(model_id)
+        result = await _run_inference(predict_flood_result, model_id)
+        cache.put(cache_key, result)
+
+    return {
+        "model_id": model_id,
+        "threshold": threshold,
+        "regencies": await asyncio.to_thread(_regency_summary, result, threshold),
+    }
+
+
+def _check_tile(z: int, x: int, y: int) -> None:
+    if not 0 <= z <= MAX_TILE_ZOOM or not (0 <= x < 2**z and 0 <= y < 2**z):
+        raise HTTPException(status_code=400, detail=f"Invalid tile {z}/{x}/{y}")
+
+
+def _publish_ground_truth(run_id: str) -> TileRunRegistry:
+    """Publish (or republish after a dataset change) the ground truth points for their run id."""
+    if run_id == GROUND_TRUTH_RUN_ID:
+        publish_ground_truth()
+    return TileRunRegistry.get_instance()
+
+
+def _tile_response(tile: bytes) -> Response:
+    # Not immutable: a run id can be republished with new points (the ground
+    # truth after a dataset change, a prediction after a cache eviction).
+    return Response(
+        tile,
+        media_type=MVT_CONTENT_TYPE,
+        headers={"Cache-Control": f"public, max-age={TILE_MAX_AGE_S}"},
+    )
+
+
+@api.get("/api/tiles/flood/{run_id}/{z}/{x}/{y}.mvt")
+async def get_flood_tile(
+    run_id: str, z: int, x: int, y: int, threshold: float = Query(default=0.5, ge=0, le=1)
+) -> Response:
+    """Flood points of a prediction run (``MapState.flood_tile_run_id``) as a vector tile."""
+    _check_tile(z, x, y)
+    registry = await asyncio.to_thread(_publish_ground_truth, run_id)
+    tile = await asyncio.to_thread(registry.point_tile, run_id, z, x, y, threshold)
+    if tile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown prediction run: {run_id}")
+    return _tile_response(tile)
+
+
+@api.get("/api/tiles/boundaries/{z}/{x}/{y}.mvt")
+async def get_boundary_tile(z: int, x: int, y: int) -> Response:
+    """Regency boundaries as a vector tile."""
+    _check_tile(z, x, y)
+    tile = await asyncio.to_thread(TileRunRegistry.get_instance().boundary_tile, z, x, y)
+    return _tile_response(tile)
+
+
+@api.get("/api/clusters/{run_id}")
+async def get_clusters(
+    run_id: str,
+    z: float = Query(ge=0, le=MAX_TILE_ZOOM),
+    west: float = Query(ge=-180, le=180),
+    south: float = Query(ge=-90, le=90),
+    east: float = Query(ge=-180, le=180),
+    north: float = Query(ge=-90, le=90),
+    threshold: float = Query(default=0.5, ge=0, le=1),
+) -> dict:
+    """Point clusters of a prediction run inside a viewport, at the map's zoom level."""
+    await asyncio.to_thread(_publish_ground_truth, run_id)
+    index = await asyncio.to_thread(ClusterRegistry.get_instance().get, run_id, threshold)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Unknown prediction run: {run_id}")
+    return index.query(z, west, south, east, north).to_dict()
+
+
+class ScenarioRequest(BaseModel):
+    """One rainfall scenario: either both precipitation values or a 3-day total."""
+    label: Optional[str] = None
+    precip_1d: Optional[float] = Field(default=None, ge=0)
+    precip_3d: Optional[float] = Field(default=None, ge=0)
+    total_3d_mm: Optional[float] = Field(default=None, ge=0)
+
+    def to_scenario(self) -> RainfallScenario:
+        if self.total_3d_mm is not None:
+            return RainfallScenario.from_total_3d(self.total_3d_mm, self.label)
+        if self.precip_1d is None or self.precip_3d is None:
+            raise ValueError("Give total_3d_mm or both precip_1d and precip_3d")
+        return RainfallScenario(
+            self.label or f"{self.precip_1d:g}/{self.precip_3d:g} mm",
+            self.precip_1d,
+            self.precip_3d,
+        )
+
+
+class ScenarioBatchRequest(BaseModel):
+    scenarios: List[ScenarioRequest] = Field(min_length=1, max_length=64)
+    model_id: Optional[str] = None
+    threshold: float = Field(default=0.5, ge=0, le=1)
+    include_points: bool = True
+
+
+def _scenario_entries(results: list, threshold: float, include_points: bool) -> List[dict]:
+    """Response entries of scenario results (the point lists are large: run off the event loop)."""
+    entries = []
+    for scenario_result in results:
+        scenario, result = scenario_result.scenario, scenario_result.result
+        entry = {
+            "label": scenario.label,
+            "precip_1d": scenario.precip_1d,
+            "precip_3d": scenario.precip_3d,
+            "points": len(result),
+            "flood_count": result.flood_count(threshold),
+        }
+        if include_points:
+            entry["flood_points"] = result.flood_points(threshold).tolist()
+        entries.append(entry)
+    return entries
+
+
+@api.post("/api/scenarios")
+async def run_scenarios(request: ScenarioBatchRequest) -> dict:
+    """Flood counts (and points) for K what-if rainfall scenarios in one model call."""
+    try:
+        scenarios = [scenario.to_scenario() for scenario in request.scenarios]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    model_id = request.model_id or ModelRegistry.get_instance().default_model_id
+    await _await_model(model_id)
+    results = await _run_inference(predict_scenarios, scenarios, model_id)
+    response = await asyncio.to_thread(
+        _scenario_entries, results, request.threshold, request.include_points
+    )
+    return {"model_id": model_id, "threshold": request.threshold, "scenarios": response}
@@ -0,0 +1,522 @@
+"""Regency boundaries simplified per zoom level and cached as quantized binary arrays"""
+
+import glob
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, List, Dict, Tuple, Sequence
+
+import numpy as np
+
+from config import (
+    BOUNDARY_ZOOM_LEVELS,
+    BOUNDARY_PIXEL_TOLERANCE,
+    BOUNDARY_QUANTIZATION_DEG,
+    BOUNDARY_CACHE_DIR,
+)
+
+
+GEOJSON_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "geojson")
+CACHE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+LEVEL_ARRAYS = ("coords", "ring_offsets", "polygon_offsets", "regency_offsets")
+
+
+def _json_loads(text: bytes):
+    """Parse JSON with orjson when it is installed (several times faster), else json."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(text)
+    return orjson.loads(text)
+
+
+@dataclass(frozen=True)
+class Regency:
+    """One regency's MultiPolygon: polygons of rings of (lon, lat) vertices, not closed."""
+    regency_id: int
+    name: str
+    polygons: List[List[np.ndarray]]
+
+
+def read_regencies(geojson_dir: str = GEOJSON_DIR) -> List[Regency]:
+    """Parse every ``<id>_<name>.geojson`` in the folder, ordered by id.
+
+    Ring closing vertices and consecutive duplicate vertices are dropped.
+    """
+    regencies = []
+    for path in glob.glob(os.path.join(geojson_dir, "*.geojson")):
+        regency_id, _, slug = os.path.splitext(os.path.basename(path))[0].partition("_")
+        with open(path, "rb") as f:
+            geometry = _json_loads(f.read())
+
+        parts = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            parts = [parts]
+
+        polygons = []
+        for polygon in parts:
+            rings = []
+            for ring in polygon:
+                ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                    ring = ring[:-1]
+                ring = ring[np.r_[True, np.any(ring[1:] != ring[:-1], axis=1)]]
+                if len(ring) >= 3:
+                    rings.append(ring)
+            if rings:
+                polygons.append(rings)
+
+        regencies.append(Regency(int(regency_id), slug.replace("_", " ").title(), polygons))
+    return sorted(regencies, key=lambda regency: regency.regency_id)
+
+
+def tolerance_for_zoom(zoom: int, pixels: float = BOUNDARY_PIXEL_TOLERANCE) -> float:
+    """Simplification tolerance in degrees: ``pixels`` screen pixels of a 256px tile at ``zoom``."""
+    return pixels * 360.0 / (256 * 2 ** zoom)
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Mask of vertices kept by Douglas-Peucker; both endpoints are always kept.
+
+    A closed arc (first vertex equals last) is split at its vertex farthest
+    from the start, since the chord between the endpoints has no length.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        offsets = points[first + 1:last] - points[first]
+        chord = points[last] - points[first]
+        length = np.hypot(chord[0], chord[1])
+        if length > 0:
+            distance = np.abs(chord[0] * offsets[:, 1] - chord[1] * offsets[:, 0]) / length
+        else:
+            distance = np.hypot(offsets[:, 0], offsets[:, 1])
+
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return keep
+
+
+class BoundaryTopology:
+    """The regency rings decomposed into arcs shared between neighbors.
+
+    Rings are cut at junctions, vertices with more than two distinct
+    neighbors, which is where two regencies' borders meet or part. A border
+    stretch shared by two regencies becomes one arc that both rings
+    reference (one of them reversed), so it is simplified once and both
+    sides stay identical: simplification opens no gaps or overlaps between
+    neighbors. Rings without junctions (islands, enclaves) are single
+    closed arcs starting at their lowest vertex id, so an enclave and the
+    hole it fills also share their arc.
+    """
+
+    def __init__(self, regencies: Sequence[Regency]):
+        rings = [ring for regency in regencies for polygon in regency.polygons for ring in polygon]
+        ring_offsets = np.cumsum([0] + [len(ring) for ring in rings])
+
+        self.vertices, vertex_ids = np.unique(np.concatenate(rings), axis=0, return_inverse=True)
+        vertex_ids = vertex_ids.reshape(-1)
+
+        # Distinct neighbors per vertex over all rings (ring edges wrap around).
+        following = np.arange(len(vertex_ids)) + 1
+        following[ring_offsets[1:] - 1] = ring_offsets[:-1]
+        edges = np.sort(np.stack([vertex_ids, vertex_ids[following]], axis=1), axis=1)
+        edges = np.unique(edges, axis=0)
+        degree = np.bincount(edges.ravel(), minlength=len(self.vertices))
+        junction = degree > 2
+
+        self.arcs: List[np.ndarray] = []
+        self.ring_arcs: List[List[int]] = []
+        arc_index: Dict[Tuple[int, ...], int] = {}
+        for start, stop in zip(ring_offsets[:-1], ring_offsets[1:]):
+            ids = vertex_ids[start:stop]
+            cuts = np.flatnonzero(junction[ids])
+            if len(cuts) == 0:
+                ids = np.roll(ids, -int(np.argmin(ids)))
+                pieces = [np.append(ids, ids[0])]
+            else:
+                ids = np.roll(ids, -int(cuts[0]))
+                cuts = np.append(cuts - cuts[0], len(ids))
+                closed = np.append(ids, ids[0])
+                pieces = [closed[a:b + 1] for a, b in zip(cuts[:-1], cuts[1:])]
+
+            refs = []
+            for piece in pieces:
+                key, reverse_key = tuple(piece.tolist()), tuple(piece[::-1].tolist())
+                if key in arc_index:
+                    refs.append(arc_index[key])
+                elif reverse_key in arc_index:
+                    refs.append(~arc_index[reverse_key])
+                else:
+                    arc_index[key] = len(self.arcs)
+                    refs.append(len(self.arcs))
+                    self.arcs.append(piece)
+            self.ring_arcs.append(refs)
+
+        self.structure = [[len(polygon) for polygon in regency.polygons] for regency in regencies]
+
+    @property
+    def shared_arcs(self) -> int:
+        """Arcs referenced by more than one ring."""
+        counts = np.bincount(
+            [ref if ref >= 0 else ~ref for refs in self.ring_arcs for ref in refs],
+            minlength=len(self.arcs),
+        )
+        return int(np.count_nonzero(counts > 1))
+
+    def quantized_level(
+        self, tolerance: float, origin: np.ndarray, step: float
+    ) -> Dict[str, np.ndarray]:
+        """Simplify every arc once, quantize it, and reassemble the rings.
+
+        Returns the flat arrays of one level: int32 grid coordinates of every
+        closed ring, plus offsets from rings into coordinates, polygons into
+        rings and regencies into polygons. Rings left with fewer than three
+        distinct vertices are dropped, and so is a polygon whose outer ring
+        is dropped.
+        """
+        arcs = []
+        for arc in self.arcs:
+            points = self.vertices[arc]
+            points = points[douglas_peucker(points, tolerance)]
+            grid = np.round((points - origin) / step).astype(np.int32)
+            arcs.append(grid[np.r_[True, np.any(grid[1:] != grid[:-1], axis=1)]])
+
+        coords, ring_lengths, polygon_lengths, regency_lengths = [], [], [], []
+        ring_iter = iter(self.ring_arcs)
+        for polygon_sizes in self.structure:
+            kept_polygons = 0
+            for ring_count in polygon_sizes:
+                kept_rings = 0
+                for ring_index in range(ring_count):
+                    refs = next(ring_iter)
+                    pieces = [arcs[ref] if ref >= 0 else arcs[~ref][::-1] for ref in refs]
+                    ring = np.concatenate([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+                    if len(ring) < 4:
+                        if ring_index == 0:
+                            # Skip the holes of a dropped outer ring.
+                            for _ in range(ring_count - 1):
+                                next(ring_iter)
+                            break
+                        continue
+                    coords.append(ring)
+                    ring_lengths.append(len(ring))
+                    kept_rings += 1
+                if kept_rings:
+                    polygon_lengths.append(kept_rings)
+                    kept_polygons += 1
+            regency_lengths.append(kept_polygons)
+
+        return {
+            "coords": np.concatenate(coords) if coords else np.empty((0, 2), dtype=np.int32),
+            "ring_offsets": np.cumsum([0] + ring_lengths, dtype=np.int64),
+            "polygon_offsets": np.cumsum([0] + polygon_lengths, dtype=np.int64),
+            "regency_offsets": np.cumsum([0] + regency_lengths, dtype=np.int64),
+        }
+
+
+@dataclass(frozen=True)
+class BoundaryLevel:
+    """One simplified level as flat arrays (memory-mapped when read from the cache)."""
+    zoom: int
+    tolerance: float
+    origin: np.ndarray
+    step: float
+    coords: np.ndarray
+    ring_offsets: np.ndarray
+    polygon_offsets: np.ndarray
+    regency_offsets: np.ndarray
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.coords)
+
+    def lonlat(self) -> np.ndarray:
+        """(lon, lat) of every vertex, dequantized."""
+        return self.origin + self.coords * self.step
+
+    def regency_polygons(self, index: int, lonlat: Optional[np.ndarray] = None) -> List[List[np.ndarray]]:
+        """Polygons of rings of (lon, lat) vertices of the regency at position ``index``."""
+        lonlat = self.lonlat() if lonlat is None else lonlat
+        polygons = []
+        for polygon in range(self.regency_offsets[index], self.regency_offsets[index + 1]):
+            polygons.append([
+                lonlat[self.ring_offsets[ring]:self.ring_offsets[ring + 1]]
+                for ring in range(self.polygon_offsets[polygon], self.polygon_offsets[polygon + 1])
+            ])
+        return polygons
+
+
+def _source_signature(geojson_dir: str) -> List[list]:
+    """(name, size, mtime_ns) of every source file; any change invalidates the cache."""
+    signature = []
+    for path in sorted(glob.glob(os.path.join(geojson_dir, "*.geojson"))):
+        stat = os.stat(path)
+        signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def _cache_parameters(zoom_levels: Sequence[int], pixel_tolerance: float, step: float) -> dict:
+    return {
+        "version": CACHE_FORMAT_VERSION,
+        "zoom_levels": sorted(int(zoom) for zoom in zoom_levels),
+        "pixel_tolerance": pixel_tolerance,
+        "quantization_deg": step,
+    }
+
+
+def build_boundary_cache(
+    geojson_dir: str = GEOJSON_DIR,
+    cache_root: str = BOUNDARY_CACHE_DIR,
+    zoom_levels: Sequence[int] = BOUNDARY_ZOOM_LEVELS,
+    pixel_tolerance: float = BOUNDARY_PIXEL_TOLERANCE,
+    step: float = BOUNDARY_QUANTIZATION_DEG,
+) -> dict:
+    """Parse the GeoJSON once, build every level and write it as ``.npy`` arrays.
+
+    Returns the manifest. The cache directory is replaced atomically, so a
+    reader never sees half-written levels.
+    """
+    start = time.perf_counter()
+    regencies = read_regencies(geojson_dir)
+    if not regencies:
+        raise FileNotFoundError(f"No .geojson files in {geojson_dir}")
+    parse_seconds = time.perf_counter() - start
+
+    topology = BoundaryTopology(regencies)
+    origin = np.floor(topology.vertices.min(axis=0) / step) * step
+
+    tmp_dir = f"{cache_root}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        levels = []
+        for zoom in sorted(int(zoom) for zoom in zoom_levels):
+            tolerance = tolerance_for_zoom(zoom, pixel_tolerance)
+            arrays = topology.quantized_level(tolerance, origin, step)
+            for name, values in arrays.items():
+                np.save(os.path.join(tmp_dir, f"z{zoom:02d}.{name}.npy"), values)
+            levels.append({
+                "zoom": zoom,
+                "tolerance": tolerance,
+                "vertices": len(arrays["coords"]),
+                "rings": len(arrays["ring_offsets"]) - 1,
+                "bytes": sum(values.nbytes for values in arrays.values()),
+            })
+
+        manifest = {
+            **_cache_parameters(zoom_levels, pixel_tolerance, step),
+            "sources": _source_signature(geojson_dir),
+            "origin": origin.tolist(),
+            "regencies": [
+                {"id": regency.regency_id, "name": regency.name} for regency in regencies
+            ],
+            "source_vertices": len(np.concatenate([
+                ring for regency in regencies for polygon in regency.polygons for ring in polygon
+            ])),
+            "arcs": len(topology.arcs),
+            "shared_arcs": topology.shared_arcs,
+            "parse_seconds": round(parse_seconds, 3),
+            "build_seconds": round(time.perf_counter() - start, 3),
+            "levels": levels,
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Readers of the old files keep their mappings; unlinking is safe on POSIX.
+        shutil.rmtree(cache_root, ignore_errors=True)
+        os.makedirs(os.path.dirname(os.path.abspath(cache_root)), exist_ok=True)
+        os.rename(tmp_dir, cache_root)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return manifest
+
+
+class RegencyBoundaries:
+    """Singleton serving simplified regency boundaries per zoom level.
+
+    The first use checks the cache manifest against the GeoJSON files and
+    rebuilds it if anything changed; after that a level's arrays are only
+    memory-mapped when that level is first requested, so a start never
+    parses the 29 MB of JSON and never reads levels nobody asks for.
+    """
+
+    _instance: Optional["RegencyBoundaries"] = None
+    _lock: Lock = Lock()
+
+    def __init__(
+        self,
+        geojson_dir: str = GEOJSON_DIR,
+        cache_root: str = BOUNDARY_CACHE_DIR,
+        zoom_levels: Sequence[int] = BOUNDARY_ZOOM_LEVELS,
+        pixel_tolerance: float = BOUNDARY_PIXEL_TOLERANCE,
+        step: float = BOUNDARY_QUANTIZATION_DEG,
+    ):
+        """Private constructor - use get_instance() instead."""
+        if not zoom_levels:
+            raise ValueError("At least one zoom level is required")
+
+        self.geojson_dir: str = geojson_dir
+        self.cache_root: str = cache_root
+        self._parameters: dict = _cache_parameters(zoom_levels, pixel_tolerance, step)
+        self._manifest: Optional[dict] = None
+        self._levels: Dict[int, BoundaryLevel] = {}
+        self._geojson: Dict[int, dict] = {}
+        self._cache_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "RegencyBoundaries":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _read_manifest(self) -> Optional[dict]:
+        """The cache manifest if it matches the sources and parameters, else None."""
+        try:
+            with open(os.path.join(self.cache_root, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if any(manifest.get(key) != value for key, value in self._parameters.items()):
+            return None
+        if manifest.get("sources") != _source_signature(self.geojson_dir):
+            return None
+        return manifest
+
+    @property
+    def manifest(self) -> dict:
+        """Cache manifest, building the cache first if it is missing or stale."""
+        if self._manifest is None:
+            with self._cache_lock:
+                if self._manifest is None:
+                    manifest = self._read_manifest()
+                    if manifest is None:
+                        print(f"Building regency boundary cache in {self.cache_root}...")
+                        manifest = build_boundary_cache(
+                            self.geojson_dir,
+                            self.cache_root,
+                            self._parameters["zoom_levels"],
+                            self._parameters["pixel_tolerance"],
+                            self._parameters["quantization_deg"],
+                        )
+                    self._manifest = manifest
+        return self._manifest
+
+    @property
+    def regencies(self) -> List[dict]:
+        """``{"id", "name"}`` of every regency, in cache order."""
+        return self.manifest["regencies"]
+
+    def level_for_zoom(self, zoom: float) -> int:
+        """The coarsest cached level that is still within tolerance at ``zoom``."""
+        levels = self._parameters["zoom_levels"]
+        for level in levels:
+            if level >= int(zoom):
+                return level
+        return levels[-1]
+
+    def level(self, zoom: float) -> BoundaryLevel:
+        """Memory-mapped arrays of the level serving ``zoom``."""
+        level_zoom = self.level_for_zoom(zoom)
+        level = self._levels.get(level_zoom)
+        if level is not None:
+            return level
+
+        manifest = self.manifest
+        with self._cache_lock:
+            if level_zoom not in self._levels:
+                arrays = {
+                    name: np.load(
+                        os.path.join(self.cache_root, f"z{level_zoom:02d}.{name}.npy"), mmap_mode="r"
+                    ).view(np.ndarray)
+                    for name in LEVEL_ARRAYS
+                }
+                self._levels[level_zoom] = BoundaryLevel(
+                    zoom=level_zoom,
+                    tolerance=tolerance_for_zoom(level_zoom, self._parameters["pixel_tolerance"]),
+                    origin=np.asarray(manifest["origin"]),
+                    step=self._parameters["quantization_deg"],
+                    **arrays,
+                )
+            return self._levels[level_zoom]
+
+    def to_geojson(self, zoom: float) -> dict:
+        """FeatureCollection of every regency at the level serving ``zoom``.
+
+        Coordinates are rounded to the quantization step, so the JSON stays
+        compact. Built once per level.
+        """
+        level = self.level(zoom)
+        cached = self._geojson.get(level.zoom)
+        if cached is not None:
+            return cached
+
+        decimals = max(0, int(np.ceil(-np.log10(level.step))))
+        lonlat = np.round(level.lonlat(), decimals)
+        features = []
+        for index, regency in enumerate(self.regencies):
+            polygons = level.regency_polygons(index, lonlat)
+            if not polygons:
+                continue
+            features.append({
+                "type": "Feature",
+                "properties": {"id": regency["id"], "name": regency["name"]},
+                "geometry": {
+                    "type": "MultiPolygon",
+                    "coordinates": [[ring.tolist() for ring in polygon] for polygon in polygons],
+                },
+            })
+
+        collection = {"type": "FeatureCollection", "features": features}
+        self._geojson[level.zoom] = collection
+        return collection
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pandas as pd
+
+    source_bytes = sum(os.path.getsize(path) for path in glob.glob(os.path.join(GEOJSON_DIR, "*.geojson")))
+    with tempfile.TemporaryDirectory() as cache_root:
+        manifest = build_boundary_cache(cache_root=cache_root)
+        print(
+            f"{len(manifest['regencies'])} regencies, {manifest['source_vertices']:,} vertices, "
+            f"{manifest['arcs']:,} arcs ({manifest['shared_arcs']:,} shared); "
+            f"parse {manifest['parse_seconds']}s, build {manifest['build_seconds']}s"
+        )
+
+        boundaries = RegencyBoundaries(cache_root=cache_root)
+        start = time.perf_counter()
+        boundaries.manifest
+        print(f"Warm start (manifest check): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        rows = []
+        for level in manifest["levels"]:
+            start = time.perf_counter()
+            geojson = json.dumps(boundaries.to_geojson(level["zoom"]), separators=(",", ":"))
+            rows.append({
+                **level,
+                "vertex_ratio": round(level["vertices"] / manifest["source_vertices"], 4),
+                "geojson_kb": round(len(geojson) / 1024, 1),
+                "geojson_ms": round((time.perf_counter() - start) * 1000, 1),
+            })
+        print(f"Source GeoJSON: {source_bytes / 2**20:.1f} MB")
+        print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,196 @@
+"""Columnar binary cache for the CSV datasets"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_CACHE_DIR
+from .prediction_cache import file_fingerprint
+
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def columnar_cache_dir(csv_path: str, cache_root: str = DATA_CACHE_DIR) -> str:
+    """Directory holding the per-column ``.npy`` files of one CSV."""
+    csv_path = os.path.abspath(csv_path)
+    path_hash = hashlib.sha1(csv_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_root, f"{Path(csv_path).stem}-{path_hash}")
+
+
+def _read_manifest(cache_dir: str) -> Optional[dict]:
+    """Read a cache manifest, or None if it is missing or unreadable."""
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir: str, manifest: dict) -> None:
+    """Write a manifest atomically next to the column files."""
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_NAME))
+
+
+def _is_current(csv_path: str, cache_dir: str, manifest: dict) -> bool:
+    """Check a manifest against the source file's size, mtime and hash.
+
+    A matching size and mtime is trusted as is. If only the mtime moved
+    (e.g. the file was touched or copied) the content hash decides, and a
+    match refreshes the stored mtime so the next start skips hashing again.
+    """
+    stat = os.stat(csv_path)
+    if manifest["source_size"] != stat.st_size:
+        return False
+    if manifest["source_mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if manifest["source_sha256"] != file_fingerprint(csv_path):
+        return False
+
+    manifest["source_mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_manifest(cache_dir, manifest)
+    except OSError:
+        pass
+    return True
+
+
+def load_columnar(csv_path: str, cache_root: str = DATA_CACHE_DIR) -> Optional[pd.DataFrame]:
+    """Memory-map the cached columns of a CSV, or None if the cache is stale."""
+    cache_dir = columnar_cache_dir(csv_path, cache_root)
+    manifest = _read_manifest(cache_dir)
+    if manifest is None or not _is_current(csv_path, cache_dir, manifest):
+        return None
+
+    columns = {}
+    for column in manifest["columns"]:
+        column_path = os.path.join(cache_dir, column["file"])
+        if column["dtype"] == "object":
+            columns[column["name"]] = np.load(column_path, allow_pickle=True)
+        else:
+            # Plain ndarray view over the mapping, so results don't stay np.memmap
+            columns[column["name"]] = np.load(column_path, mmap_mode="r").view(np.ndarray)
+    return pd.DataFrame(columns, copy=False)
+
+
+def write_columnar(frame: pd.DataFrame, csv_path: str, cache_root: str = DATA_CACHE_DIR) -> str:
+    """Write one ``.npy`` per column plus a manifest keyed by the source file."""
+    cache_dir = columnar_cache_dir(csv_path, cache_root)
+    stat = os.stat(csv_path)
+    tmp_dir = f"{cache_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    try:
+        columns = []
+        for index, name in enumerate(frame.columns):
+            values = frame[name].to_numpy()
+            file_name = f"{index:03d}.npy"
+            np.save(os.path.join(tmp_dir, file_name), values, allow_pickle=values.dtype == object)
+            columns.append({"name": str(name), "file": file_name, "dtype": str(values.dtype)})
+
+        _write_manifest(tmp_dir, {
+            "version": CACHE_FORMAT_VERSION,
+            "source": os.path.abspath(csv_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_sha256": file_fingerprint(csv_path),
+            "rows": len(frame),
+            "columns": columns,
+        })
+
+        # Readers of the old files keep their mappings; unlinking is safe on POSIX.
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.rename(tmp_dir, cache_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return cache_dir
+
+
+def read_csv_cached(csv_path: str, cache_root: str = DATA_CACHE_DIR) -> pd.DataFrame:
+    """Read a CSV through the columnar cache, building the cache on a miss.
+
+    Cache failures never break loading: the CSV is parsed as before.
+    """
+    try:
+        frame = load_columnar(csv_path, cache_root)
+        if frame is not None:
+            return frame
+    except Exception as e:
+        print(f"Columnar cache unreadable for {csv_path}, reparsing: {e}")
+
+    frame = pd.read_csv(csv_path)
+    try:
+        cache_dir = write_columnar(frame, csv_path, cache_root)
+        print(f"Columnar cache written to {cache_dir}")
+    except Exception as e:
+        print(f"Failed to write columnar cache for {csv_path}: {e}")
+    return frame
+
+
+def benchmark_startup(rows: int, work_dir: str) -> dict:
+    """Time parsing a synthetic CSV against memory-mapping its columnar cache."""
+    source = pd.read_csv(os.path.join("dashboard", "data", "flood_inference_data.csv"))
+    repeats = -(-rows // len(source))
+    frame = pd.concat([source] * repeats, ignore_index=True).iloc[:rows]
+
+    csv_path = os.path.join(work_dir, f"bench_{rows}.csv")
+    cache_root = os.path.join(work_dir, "cache")
+    frame.to_csv(csv_path, index=False)
+    del frame
+
+    start = time.perf_counter()
+    parsed = pd.read_csv(csv_path)
+    csv_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_columnar(parsed, csv_path, cache_root)
+    build_seconds = time.perf_counter() - start
+    del parsed
+
+    start = time.perf_counter()
+    cached = load_columnar(csv_path, cache_root)
+    mmap_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    np.ascontiguousarray(cached.to_numpy(np.float32))
+    materialize_seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "csv_mb": round(os.path.getsize(csv_path) / 2**20, 1),
+        "read_csv_s": round(csv_seconds, 4),
+        "build_cache_s": round(build_seconds, 4),
+        "mmap_load_s": round(mmap_seconds, 4),
+        "mmap_to_float32_s": round(materialize_seconds, 4),
+        "speedup": round(csv_seconds / max(mmap_seconds, 1e-9), 1),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    row_counts = [int(arg) for arg in sys.argv[1:]] or [2_000, 1_000_000, 10_000_000]
+    results = []
+    for rows in row_counts:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results.append(benchmark_startup(rows, work_dir))
+            print(results[-1])
+
+    print(pd.DataFrame(results).to_string(index=False))
@@ -1,10 +1,48 @@
 """Flood Prediction Model Service using Tensorflow"""
 
+import time
 from pathlib import Path
 from threading import Lock
-import tensorflow as tf
+import numpy as np
 
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List, Iterable, Iterator, Callable
+
+from config import MODEL_ARTIFACT_DIR
+from .model_artifacts import export_frozen_graph, load_frozen_graph
+from .timing import span, timed
+
+if TYPE_CHECKING:
+    import tensorflow as tf
+
+
+# Model input columns, in the order the models and standard_scaler.pkl expect.
+FEATURE_COLUMNS = [
+    "lon",
+    "lat",
+    "precip_1d",
+    "precip_3d",
+    "NDVI",
+    "NDWI",
+    "landcover",
+    "elevation",
+    "slope",
+    "aspect",
+    "upstream_area",
+    "TWI",
+]
+
+
+def to_model_input(input_data: List[float]) -> np.ndarray:
+    """Convert features to a float32 array shaped (batch_size, 1, features)."""
+    input_array = np.asarray(input_data, dtype=np.float32)
+    if input_array.ndim == 1:
+        input_array = input_array[np.newaxis, :]  # Add batch dimension
+
+    # Add the middle dimension to match expected shape (batch_size, 1, features)
+    if input_array.ndim == 2:
+        input_array = input_array[:, np.newaxis, :]
+
+    return input_array
 
 
 class FloodPredictionModel:
@@ -15,11 +53,19 @@ class FloodPredictionModel:
 
     def __init__(self):
         """Private constructor - use get_instance() instead."""
-        self._model: Optional[tf.keras.Model] = None
+        self._model: Optional["tf.keras.Model"] = None
+        self._infer: Optional[Callable[["tf.Tensor"], "tf.Tensor"]] = None
+        self._n_features: Optional[int] = None
+        self._warmup_seconds: Optional[float] = None
         self._model_path: Optional[str] = None
+        self._input_shape: Optional[tuple] = None
+        self._output_shape: Optional[tuple] = None
+        self._artifact: Optional[str] = None
         self._is_loaded: bool = False
-        self.batch_size: int = 32
+        self._load_lock: Lock = Lock()
+        self.batch_size: int = 1024
         self.sigmoid_threshold: float = 0.5
+        self.artifact_dir: str = MODEL_ARTIFACT_DIR
 
     @classmethod
     def get_instance(cls) -> "FloodPredictionModel":
@@ -39,7 +85,7 @@ class FloodPredictionModel:
     @property
     def is_loaded(self) -> bool:
         """Check if model is loaded."""
-        return self._is_loaded and self._model is not None
+        return self._is_loaded and self._infer is not None
 
     def load_if_needed(self, model_path: str) -> None:
         """Load model only if not already loaded or path changed."""
@@ -51,64 +97,171 @@ class FloodPredictionModel:
         if self._is_loaded and self._model_path == model_path:
             return
 
-        with self._lock:
+        with self._load_lock:
             if self._is_loaded and self._model_path == model_path:
                 return
 
-            self._load_model(model_path)
+            with span("model.load"):
+                self._load_model(model_path)
 
     def _load_model(self, model_path: str) -> None:
-        """Internal method to load the model."""
+        """Internal method to load the model.
+
+        The frozen graph cached for this file's hash is used when present;
+        otherwise the .h5 is loaded through Keras and the traced function is
+        frozen into the cache for the next process.
+        """
         print(f"Loading model from {model_path}...")
 
         try:
-            self._model: tf.keras.models = tf.keras.models.load_model(model_path)
+            # Imported here rather than at module level so pages and workers
+            # that never predict don't pay TensorFlow's import time and memory.
+            import tensorflow as tf
+
+            artifact = load_frozen_graph(str(model_path), self.artifact_dir)
+            if artifact is not None:
+                infer, meta = artifact
+                self._model = None
+                self._input_shape = tuple(meta["input_shape"])
+                self._output_shape = tuple(meta["output_shape"])
+                self._artifact = meta["path"]
+            else:
+                self._model: "tf.keras.Model" = tf.keras.models.load_model(model_path)
+                self._input_shape = tuple(self._model.input_shape)
+                self._output_shape = tuple(self._model.output_shape)
+                self._artifact = None
+                infer = self._trace_inference_function()
+                self._export_artifact(infer, model_path)
+
+            self._n_features = int(self._input_shape[-1])
+            self._warm_up(infer)
             self._model_path = model_path
             self._is_loaded = True
 
         except Exception as e:
             self._is_loaded = False
             self._model = None
+            self._infer = None
             self._model_path = None
             raise RuntimeError(f"Failed to load model: {e}")
 
-    def preprocess(self, input_data: List[float]) -> tf.Tensor:
+    def _export_artifact(self, infer: Callable[["tf.Tensor"], "tf.Tensor"], model_path: str) -> None:
+        """Freeze the traced function into the artifact cache; a failure only costs speed."""
+        try:
+            artifact = export_frozen_graph(
+                infer, str(model_path), self._input_shape, self._output_shape, self.artifact_dir
+            )
+            if artifact:
+                print(f"Model artifact cached at {artifact}")
+        except Exception as e:
+            print(f"Failed to cache model artifact: {e}")
+
+    def _trace_inference_function(self) -> Callable[["tf.Tensor"], "tf.Tensor"]:
+        """Trace a fixed-signature inference function over the Keras model.
+
+        ``keras.Model.predict`` rebuilds its data adapter and execution loop on
+        every call. Tracing the forward pass once with a ``(None, 1, n_features)``
+        signature lets every later call reuse the same concrete graph.
+        """
+        import tensorflow as tf
+
+        model = self._model
+        n_features = int(self._input_shape[-1])
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec(shape=(None, 1, n_features), dtype=tf.float32)
+            ]
+        )
+        def infer(input_tensor: "tf.Tensor") -> "tf.Tensor":
+            return model(input_tensor, training=False)
+
+        return infer
+
+    def _warm_up(self, infer: Callable[["tf.Tensor"], "tf.Tensor"]) -> None:
+        """Run dummy batches so graph optimisation happens at load time, not on the first request."""
+        import tensorflow as tf
+
+        start = time.perf_counter()
+        # The second call on a different batch size finalises graph optimisation
+        # for the dynamic batch dimension; without it the first real request
+        # still pays for it.
+        for warmup_rows in (1, 2):
+            dummy = tf.zeros((warmup_rows, 1, self._n_features), dtype=tf.float32)
+            self.post_processor(infer(dummy))
+        self._warmup_seconds = time.perf_counter() - start
+        self._infer = infer
+        print(f"Inference function warmed up in {self._warmup_seconds:.3f}s")
+
+    def preprocess(self, input_data: List[float]) -> "tf.Tensor":
         """Preprocess input data for model prediction."""
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
 
-        # input_tensor = tf.data.Dataset.from_tensor_slices(input_data)
-        # input_tensor = tf.expand_dims(input_tensor, axis=1)
+        import tensorflow as tf
 
-        # input_tensor = input_tensor.batch(self.batch_size)
-        # input_tensor = input_tensor.prefetch(tf.data.AUTOTUNE)
-        input_tensor = tf.convert_to_tensor(input_data, dtype=tf.float32)
-        if len(input_tensor.shape) == 1:
-            input_tensor = tf.expand_dims(input_tensor, axis=0)  # Add batch dimension
-    
-    # Add the middle dimension to match expected shape (batch_size, 1, features)
-        input_tensor = tf.expand_dims(input_tensor, axis=1)
-    
-        return input_tensor
+        return tf.convert_to_tensor(to_model_input(input_data))
 
-    def predict(self, input_data: List[float]) -> float:
+    def predict(self, input_data: List[float]) -> List[int]:
         """Make prediction with loaded model."""
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
 
+        result = []
+        for chunk_result in self.predict_stream([input_data]):
+            result.extend(chunk_result)
+        return result
+
+    @timed("model.predict_proba")
+    def predict_proba(self, input_data: List[float]) -> np.ndarray:
+        """Return the raw sigmoid outputs as a flat float32 array."""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+
+        try:
+            return self._predict_chunk(input_data)
+        except Exception as e:
+            raise RuntimeError(f"Prediction failed: {e}")
+
+    def predict_stream(self, chunks: Iterable[List[float]]) -> Iterator[List[int]]:
+        """Yield predictions for each chunk of an iterable of feature chunks.
+
+        Every chunk is fed to the model ``batch_size`` rows at a time, so the
+        input tensors and activations never exceed one batch. The chunk and
+        its per-row outputs are held whole, though, so peak memory is bounded
+        by the chunk size (e.g. ``iter_features_scaled``'s ``chunk_size``),
+        never by the full dataset.
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+
         try:
-            input_tensor = self.preprocess(input_data)
-            prediction = self._model.predict(input_tensor, verbose=0)
-            result = self.post_processor(prediction)
-            return result
+            for chunk in chunks:
+                yield self.post_processor(self._predict_chunk(chunk))
 
         except Exception as e:
             raise RuntimeError(f"Prediction failed: {e}")
 
-    def post_processor(self, result: tf.Tensor) -> float:
+    def _predict_chunk(self, chunk: List[float]) -> np.ndarray:
+        """Run one chunk through the model ``batch_size`` rows at a time."""
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk[np.newaxis, :]
+
+        probabilities = np.empty(len(chunk), dtype=np.float32)
+        for start in range(0, len(chunk), self.batch_size):
+            with span("model.preprocess"):
+                input_tensor = self.preprocess(chunk[start:start + self.batch_size])
+            with span("model.infer"):
+                prediction = np.asarray(self._infer(input_tensor)).reshape(-1)
+            probabilities[start:start + len(prediction)] = prediction
+        return probabilities
+
+    @timed("model.post_processor")
+    def post_processor(self, result: np.ndarray) -> List[int]:
         """Post-process the prediction result."""
-        class_id = tf.cast(tf.greater_equal(result, self.sigmoid_threshold), tf.int32)
-        return class_id.numpy().flatten().tolist()
+        class_id = np.greater_equal(result, self.sigmoid_threshold).astype(np.int32)
+        return class_id.reshape(-1).tolist()
 
     def get_model_info(self) -> dict:
         """Get information about the loaded model."""
@@ -118,8 +271,10 @@ class FloodPredictionModel:
         return {
             "status": "loaded",
             "path": self._model_path,
-            "input_shape": self._model.input_shape,
-            "output_shape": self._model.output_shape,
+            "artifact": self._artifact,
+            "input_shape": self._input_shape,
+            "output_shape": self._output_shape,
+            "warmup_seconds": self._warmup_seconds,
         }
 
 
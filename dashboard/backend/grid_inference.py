@@ -0,0 +1,298 @@
+"""Province-wide grid inference written to a memory-mapped raster"""
+
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Tuple, Sequence
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from config import (
+    SULSEL_MAX_BOUNDS,
+    DEFAULT_MODEL_ID,
+    GRID_RESOLUTION_DEG,
+    GRID_TILE_SIZE,
+    GRID_MAX_NEIGHBOR_DISTANCE_DEG,
+    GRID_OUTPUT_DIR,
+)
+from .flood_prediction import FEATURE_COLUMNS
+from .model_registry import ModelRegistry
+from .prediction_cache import file_fingerprint
+from .inference import DataLoader
+
+
+RASTER_FORMAT_VERSION = 1
+RASTER_NAME = "probabilities.npy"
+SIDECAR_NAME = "probabilities.json"
+TILES_DONE_NAME = "tiles_done.npy"
+
+_LAT_INDEX = FEATURE_COLUMNS.index("lat")
+_LON_INDEX = FEATURE_COLUMNS.index("lon")
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    """Regular lat/lon grid; row 0 is the northern edge, column 0 the western edge."""
+    north: float
+    west: float
+    south: float
+    east: float
+    resolution_deg: float
+
+    @classmethod
+    def from_bounds(cls, bounds: Sequence[Sequence[float]], resolution_deg: float) -> "GridSpec":
+        """Build a grid from Leaflet-style ``[[lat, lon], [lat, lon]]`` corners."""
+        (lat_a, lon_a), (lat_b, lon_b) = bounds
+        return cls(
+            north=max(lat_a, lat_b),
+            west=min(lon_a, lon_b),
+            south=min(lat_a, lat_b),
+            east=max(lon_a, lon_b),
+            resolution_deg=resolution_deg,
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, cols) of the raster."""
+        rows = math.ceil(round((self.north - self.south) / self.resolution_deg, 9))
+        cols = math.ceil(round((self.east - self.west) / self.resolution_deg, 9))
+        return rows, cols
+
+    @property
+    def geotransform(self) -> List[float]:
+        """GDAL-style geotransform of the raster's top-left corner."""
+        return [self.west, self.resolution_deg, 0.0, self.north, 0.0, -self.resolution_deg]
+
+    def cell_centers(self, rows: slice, cols: slice) -> Tuple[np.ndarray, np.ndarray]:
+        """Flattened (lat, lon) of the cell centres in a block of the raster."""
+        row_index = np.arange(rows.start, rows.stop)
+        col_index = np.arange(cols.start, cols.stop)
+        lat = self.north - (row_index + 0.5) * self.resolution_deg
+        lon = self.west + (col_index + 0.5) * self.resolution_deg
+        lat_grid, lon_grid = np.meshgrid(lat, lon, indexing="ij")
+        return lat_grid.reshape(-1), lon_grid.reshape(-1)
+
+
+class NearestSampleFeatures:
+    """Grid-cell features taken from the nearest inference sample.
+
+    The dataset only has features at sample points, so each cell borrows the
+    nearest sample's features with its own lat/lon. Cells farther than
+    ``max_distance_deg`` from any sample are left as no-data.
+    """
+
+    def __init__(self, max_distance_deg: float = GRID_MAX_NEIGHBOR_DISTANCE_DEG):
+        data = DataLoader.get_instance().get_data()
+        self.max_distance_deg: float = max_distance_deg
+        self._raw_features: np.ndarray = data[FEATURE_COLUMNS].to_numpy(np.float64)
+        self._tree = KDTree(data[["lat", "lon"]].to_numpy(np.float64))
+
+    def features(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw features for the covered cells, and the coverage mask."""
+        distance, index = self._tree.query(np.column_stack([lat, lon]), k=1)
+        covered = distance[:, 0] <= self.max_distance_deg
+
+        raw_features = self._raw_features[index[covered, 0]]
+        raw_features[:, _LAT_INDEX] = lat[covered]
+        raw_features[:, _LON_INDEX] = lon[covered]
+        return raw_features, covered
+
+
+class GridInferenceRun:
+    """A resumable grid inference run stored in ``out_dir``.
+
+    Probabilities go into a float32 ``.npy`` raster (NaN = no data) opened as
+    a memory map, described by a JSON sidecar with the georeference. The
+    raster is processed in square tiles; a tile is marked done in
+    ``tiles_done.npy`` only after its cells are flushed, so an interrupted run
+    resumes at the first unfinished tile. Tiles are independent, so several
+    processes can fill disjoint tiles of the same raster at once.
+    """
+
+    def __init__(
+        self,
+        out_dir: str = GRID_OUTPUT_DIR,
+        grid: Optional[GridSpec] = None,
+        model_id: str = DEFAULT_MODEL_ID,
+        tile_size: int = GRID_TILE_SIZE,
+        max_neighbor_distance_deg: float = GRID_MAX_NEIGHBOR_DISTANCE_DEG,
+    ):
+        if tile_size <= 0:
+            raise ValueError("Tile size must be a positive integer")
+
+        self.out_dir: str = out_dir
+        self.grid: GridSpec = grid or GridSpec.from_bounds(SULSEL_MAX_BOUNDS, GRID_RESOLUTION_DEG)
+        self.model_id: str = model_id
+        self.tile_size: int = tile_size
+        self.max_neighbor_distance_deg: float = max_neighbor_distance_deg
+
+    @classmethod
+    def open(cls, out_dir: str = GRID_OUTPUT_DIR) -> "GridInferenceRun":
+        """Reopen a prepared run from its sidecar."""
+        sidecar = read_sidecar(out_dir)
+        return cls(
+            out_dir=out_dir,
+            grid=GridSpec(**sidecar["grid"]),
+            model_id=sidecar["model_id"],
+            tile_size=sidecar["tile_size"],
+            max_neighbor_distance_deg=sidecar["max_neighbor_distance_deg"],
+        )
+
+    @property
+    def tile_shape(self) -> Tuple[int, int]:
+        """Number of tiles along (rows, cols)."""
+        rows, cols = self.grid.shape
+        return math.ceil(rows / self.tile_size), math.ceil(cols / self.tile_size)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.out_dir, name)
+
+    def _sidecar(self) -> dict:
+        """Georeference and run parameters written next to the raster."""
+        rows, cols = self.grid.shape
+        return {
+            "version": RASTER_FORMAT_VERSION,
+            "crs": "EPSG:4326",
+            "grid": asdict(self.grid),
+            "shape": [rows, cols],
+            "geotransform": self.grid.geotransform,
+            "dtype": "float32",
+            "nodata": "NaN",
+            "model_id": self.model_id,
+            "tile_size": self.tile_size,
+            "max_neighbor_distance_deg": self.max_neighbor_distance_deg,
+            "data_fingerprint": file_fingerprint(DataLoader.get_instance().data_path),
+        }
+
+    def prepare(self) -> bool:
+        """Create the raster, or keep it if it matches this run; True if resuming."""
+        sidecar = self._sidecar()
+        try:
+            if read_sidecar(self.out_dir) == sidecar:
+                return True
+        except (OSError, ValueError):
+            pass
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        raster = np.lib.format.open_memmap(
+            self._path(RASTER_NAME), mode="w+", dtype=np.float32, shape=self.grid.shape
+        )
+        raster[:] = np.nan
+        raster.flush()
+        tiles_done = np.lib.format.open_memmap(
+            self._path(TILES_DONE_NAME), mode="w+", dtype=np.uint8, shape=self.tile_shape
+        )
+        tiles_done.flush()
+
+        tmp_path = self._path(f"{SIDECAR_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, indent=2)
+        os.replace(tmp_path, self._path(SIDECAR_NAME))
+        return False
+
+    def pending_tiles(self) -> List[Tuple[int, int]]:
+        """Tiles that haven't been written yet, in row-major order."""
+        tiles_done = np.load(self._path(TILES_DONE_NAME), mmap_mode="r")
+        return [tuple(int(i) for i in tile) for tile in np.argwhere(tiles_done == 0)]
+
+    def run_tiles(self, tiles: Sequence[Tuple[int, int]]) -> int:
+        """Score the given tiles in this process; returns the cells predicted."""
+        model, spec = ModelRegistry.get_instance().get_with_spec(self.model_id)
+        provider = NearestSampleFeatures(self.max_neighbor_distance_deg)
+        raster = np.load(self._path(RASTER_NAME), mmap_mode="r+")
+        tiles_done = np.load(self._path(TILES_DONE_NAME), mmap_mode="r+")
+        rows, cols = self.grid.shape
+
+        predicted = 0
+        for tile_row, tile_col in tiles:
+            row_slice = slice(tile_row * self.tile_size, min((tile_row + 1) * self.tile_size, rows))
+            col_slice = slice(tile_col * self.tile_size, min((tile_col + 1) * self.tile_size, cols))
+            lat, lon = self.grid.cell_centers(row_slice, col_slice)
+
+            raw_features, covered = provider.features(lat, lon)
+            probabilities = np.full(len(lat), np.nan, dtype=np.float32)
+            if covered.any():
+                if spec.scaled_input:
+                    model_input = DataLoader.get_instance().scale_features(raw_features)
+                else:
+                    model_input = raw_features.astype(np.float32)
+                probabilities[covered] = model.predict_proba(model_input)
+                predicted += int(np.count_nonzero(covered))
+
+            raster[row_slice, col_slice] = probabilities.reshape(
+                row_slice.stop - row_slice.start, col_slice.stop - col_slice.start
+            )
+            raster.flush()
+            tiles_done[tile_row, tile_col] = 1
+            tiles_done.flush()
+
+        return predicted
+
+    def run(self, workers: int = 1) -> dict:
+        """Prepare or resume the raster and score every pending tile."""
+        start = time.perf_counter()
+        resumed = self.prepare()
+        tiles = self.pending_tiles()
+        print(
+            f"Grid {self.grid.shape} in {self.tile_shape} tiles: "
+            f"{len(tiles)} pending{' (resumed)' if resumed else ''}"
+        )
+
+        if workers <= 1 or len(tiles) <= 1:
+            predicted = self.run_tiles(tiles)
+        else:
+            # Interleave tiles so every worker gets a similar mix of land and sea.
+            batches = [tiles[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                predicted = sum(executor.map(_run_tiles_in_worker, [self.out_dir] * workers, batches))
+
+        return {
+            "shape": self.grid.shape,
+            "tiles": len(tiles),
+            "resumed": resumed,
+            "predicted_cells": predicted,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+
+def _run_tiles_in_worker(out_dir: str, tiles: List[Tuple[int, int]]) -> int:
+    """Process-pool entry point: reopen the run and score a batch of tiles."""
+    return GridInferenceRun.open(out_dir).run_tiles(tiles)
+
+
+def read_sidecar(out_dir: str = GRID_OUTPUT_DIR) -> dict:
+    """Read a raster's JSON sidecar."""
+    with open(os.path.join(out_dir, SIDECAR_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_grid_raster(out_dir: str = GRID_OUTPUT_DIR) -> Tuple[np.ndarray, dict]:
+    """Memory-map a finished raster read-only, together with its sidecar."""
+    return np.load(os.path.join(out_dir, RASTER_NAME), mmap_mode="r"), read_sidecar(out_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Province-wide grid flood inference")
+    parser.add_argument("--out-dir", default=GRID_OUTPUT_DIR)
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID)
+    parser.add_argument("--resolution", type=float, default=GRID_RESOLUTION_DEG)
+    parser.add_argument("--tile-size", type=int, default=GRID_TILE_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    grid_run = GridInferenceRun(
+        out_dir=args.out_dir,
+        grid=GridSpec.from_bounds(SULSEL_MAX_BOUNDS, args.resolution),
+        model_id=args.model_id,
+        tile_size=args.tile_size,
+    )
+    print(grid_run.run(workers=args.workers))
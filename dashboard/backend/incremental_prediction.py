@@ -0,0 +1,170 @@
+"""Incremental re-prediction when only the precipitation features change"""
+
+import time
+from threading import Lock
+from typing import Optional, Dict, Sequence, Union
+
+import numpy as np
+
+from .flood_prediction import FEATURE_COLUMNS
+from .model_registry import ModelRegistry
+from .prediction_result import PredictionResult
+from .inference import DataLoader
+
+
+# Features that change with the weather; every other feature is static terrain/land cover.
+DYNAMIC_COLUMNS = ["precip_1d", "precip_3d"]
+_DYNAMIC_INDEX = [FEATURE_COLUMNS.index(column) for column in DYNAMIC_COLUMNS]
+
+
+class IncrementalPredictor:
+    """Keeps one model's inputs and outputs pinned and re-scores only changed rows.
+
+    The model input matrix (static columns scaled once) and the latest
+    probabilities stay in memory. A weather update writes the new
+    precipitation into the two dynamic columns of the rows whose raw values
+    actually changed and runs only those rows through the model; the other
+    rows keep their previous probabilities. The pinned base belongs to one
+    feature matrix: if the dataset or scaler changes on disk it is scored
+    again from scratch, dropping precipitation applied to the old rows.
+    """
+
+    _instances: Dict[str, "IncrementalPredictor"] = {}
+    _lock: Lock = Lock()
+
+    def __init__(self, model_id: str, data_loader: Optional[DataLoader] = None):
+        """Private constructor - use get_instance() instead."""
+        self.model_id: str = model_id
+        self.version: int = 0
+        self.last_update_info: dict = {}
+        self._data_loader: DataLoader = data_loader or DataLoader.get_instance()
+        self._inputs: Optional[np.ndarray] = None
+        self._raw_dynamic: Optional[np.ndarray] = None
+        self._probabilities: Optional[np.ndarray] = None
+        self._coordinates: Optional[np.ndarray] = None
+        self._result: Optional[PredictionResult] = None
+        self._base_matrix: Optional[np.ndarray] = None
+        self._update_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls, model_id: Optional[str] = None) -> "IncrementalPredictor":
+        """Get the predictor for a model id using double-checked locking."""
+        model_id = model_id or ModelRegistry.get_instance().default_model_id
+        if model_id not in cls._instances:
+            with cls._lock:
+                if model_id not in cls._instances:
+                    cls._instances[model_id] = cls(model_id)
+        return cls._instances[model_id]
+
+    def _ensure_base(self) -> None:
+        """Score the whole dataset and pin the model inputs, again if the dataset changed."""
+        # The loader hands out a new matrix whenever the CSV or scaler changed.
+        feature_matrix = self._data_loader.get_feature_matrix()
+        if self._result is not None and self._base_matrix is feature_matrix:
+            return
+        if self._result is not None:
+            print(f"Dataset changed, re-scoring the incremental base of {self.model_id}")
+            self.version += 1
+
+        model, spec = ModelRegistry.get_instance().get_with_spec(self.model_id)
+        data = self._data_loader.get_data()
+        if spec.scaled_input:
+            # Private writable copy: the shared matrix is read-only by design.
+            inputs = np.array(feature_matrix, dtype=np.float32)
+        else:
+            inputs = data[FEATURE_COLUMNS].to_numpy(np.float32)
+
+        self._inputs = inputs
+        self._raw_dynamic = data[DYNAMIC_COLUMNS].to_numpy(np.float64)
+        self._coordinates = self._data_loader.get_coordinate_array()
+        self._probabilities = np.array(model.predict_proba(inputs), dtype=np.float32)
+        self._result = PredictionResult(self._coordinates, self._probabilities.copy())
+        self._base_matrix = feature_matrix
+
+    def result(self) -> PredictionResult:
+        """Latest probabilities for every row of the dataset."""
+        with self._update_lock:
+            self._ensure_base()
+            return self._result
+
+    def update_precipitation(
+        self,
+        precip_1d: Union[float, Sequence[float]],
+        precip_3d: Union[float, Sequence[float]],
+        rows: Optional[Sequence[int]] = None,
+    ) -> PredictionResult:
+        """Apply new raw precipitation values and re-score the rows that changed.
+
+        ``precip_1d``/``precip_3d`` are aligned with ``rows`` (every row of the
+        dataset if omitted); scalars apply to all of them.
+        """
+        with self._update_lock:
+            self._ensure_base()
+            start = time.perf_counter()
+
+            if rows is None:
+                rows = np.arange(len(self._raw_dynamic))
+            rows = np.asarray(rows, dtype=np.intp)
+            new_dynamic = np.column_stack([
+                np.broadcast_to(np.asarray(precip_1d, dtype=np.float64), rows.shape),
+                np.broadcast_to(np.asarray(precip_3d, dtype=np.float64), rows.shape),
+            ])
+
+            changed = np.any(new_dynamic != self._raw_dynamic[rows], axis=1)
+            changed_rows = rows[changed]
+            if len(changed_rows):
+                model, spec = ModelRegistry.get_instance().get_with_spec(self.model_id)
+                values = new_dynamic[changed]
+                self._raw_dynamic[changed_rows] = values
+                if spec.scaled_input:
+                    values = self._data_loader.scale_columns(values, DYNAMIC_COLUMNS)
+                self._inputs[np.ix_(changed_rows, _DYNAMIC_INDEX)] = values
+                self._probabilities[changed_rows] = model.predict_proba(self._inputs[changed_rows])
+
+                self._result = PredictionResult(self._coordinates, self._probabilities.copy())
+                self.version += 1
+
+            self.last_update_info = {
+                "version": self.version,
+                "rows_checked": len(rows),
+                "rows_rescored": len(changed_rows),
+                "seconds": time.perf_counter() - start,
+            }
+            return self._result
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import pandas as pd
+
+    source_path = os.path.join("dashboard", "data", "flood_inference_data.csv")
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(0)
+    ModelRegistry.get_instance().get()  # keep model load out of the timings
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in (2_000, 200_000):
+            data_path = os.path.join(work_dir, f"bench_{rows}.csv")
+            pd.concat([source] * -(-rows // len(source)), ignore_index=True).iloc[:rows].to_csv(
+                data_path, index=False
+            )
+            data_loader = DataLoader()
+            data_loader.load_data(data_path)
+            predictor = IncrementalPredictor(ModelRegistry.get_instance().default_model_id, data_loader)
+
+            start = time.perf_counter()
+            predictor.result()
+            full_seconds = time.perf_counter() - start
+
+            for fraction in (0.01, 0.1, 0.5):
+                precip = data_loader.get_data()[DYNAMIC_COLUMNS].to_numpy()
+                changed = rng.random(rows) < fraction
+                precip[changed] += rng.uniform(1, 20, size=(int(changed.sum()), 1))
+                predictor.update_precipitation(precip[:, 0], precip[:, 1])
+                info = predictor.last_update_info
+                print(
+                    f"{rows:>8} rows, {fraction:>4.0%} changed: full {full_seconds:.3f}s, "
+                    f"incremental {info['seconds']:.3f}s ({info['rows_rescored']} rescored, "
+                    f"{info['seconds'] / full_seconds:.1%} of full)"
+                )
@@ -2,11 +2,32 @@ from threading import Lock
 import asyncio
 import os
 import reflex as rx
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Iterator, Union
+import numpy as np
 import pandas as pd
 import pickle
 from sklearn.preprocessing import StandardScaler
-from .flood_prediction import FloodPredictionModel
+from config import DEFAULT_MODEL_ID, SHARDED_INFERENCE_WORKERS, SHARDED_MIN_ROWS
+from .flood_prediction import FEATURE_COLUMNS
+from .model_registry import ModelRegistry
+from .prediction_cache import PredictionCache
+from .inference_executor import InferenceExecutor
+from .prediction_result import PredictionResult
+from .columnar_cache import read_csv_cached
+from .timing import span, timed
+from .sharded_inference import ShardedInferencePool
+from .vector_tiles import TileRunRegistry
+
+
+def _file_signature(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(size, mtime) of a file, used to notice when it changes on disk."""
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
 
 
 class DataLoader:
@@ -18,8 +39,16 @@ class DataLoader:
     def __init__(self):
         self._data: Optional[pd.DataFrame] = None
         self._scaler: Optional[StandardScaler] = None
+        self._data_path: Optional[str] = None
+        self._scaler_path: Optional[str] = None
+        self._data_signature: Optional[Tuple[int, int]] = None
+        self._scaler_signature: Optional[Tuple[int, int]] = None
         self._is_loaded: bool = False
         self._scaler_loaded: bool = False
+        self._feature_matrix: Optional[np.ndarray] = None
+        self._coordinate_array: Optional[np.ndarray] = None
+        self._matrix_key: Optional[tuple] = None
+        self._matrix_lock: Lock = Lock()
 
     @classmethod
     def get_instance(cls) -> "DataLoader":
@@ -45,9 +74,16 @@ class DataLoader:
         with self._lock:
             if self._is_loaded:
                 return
+            self._read_data(data_path)
 
-            self._data = pd.read_csv(data_path)
-            self._is_loaded = True
+    def _read_data(self, data_path: str) -> None:
+        """Read the dataset and record its signature; the caller holds the lock."""
+        with span("data_loader.load_data"):
+            data = read_csv_cached(data_path)
+        self._data = data
+        self._data_path = data_path
+        self._data_signature = _file_signature(data_path)
+        self._is_loaded = True
 
     def load_scaler(self, scaler_path: Optional[str] = None) -> None:
         """Load the fitted StandardScaler from pickle file."""
@@ -60,15 +96,35 @@ class DataLoader:
         with self._lock:
             if self._scaler_loaded:
                 return
+            self._read_scaler(scaler_path)
 
-            try:
-                with open(scaler_path, "rb") as f:
-                    self._scaler = pickle.load(f)
-                self._scaler_loaded = True
-                print(f"Scaler loaded from {scaler_path}")
-            except Exception as e:
-                print(f"Failed to load scaler: {e}")
-                self._scaler = None
+    def _read_scaler(self, scaler_path: str) -> None:
+        """Unpickle the scaler and record its signature; the caller holds the lock."""
+        try:
+            with span("data_loader.load_scaler"), open(scaler_path, "rb") as f:
+                self._scaler = pickle.load(f)
+            self._scaler_path = scaler_path
+            self._scaler_signature = _file_signature(scaler_path)
+            self._scaler_loaded = True
+            print(f"Scaler loaded from {scaler_path}")
+        except Exception as e:
+            print(f"Failed to load scaler: {e}")
+            self._scaler = None
+            self._scaler_loaded = False
+
+    @property
+    def data_path(self) -> str:
+        """Path of the loaded dataset."""
+        if not self._is_loaded:
+            self.load_data()
+        return self._data_path
+
+    @property
+    def scaler_path(self) -> Optional[str]:
+        """Path of the loaded scaler, or None if it failed to load."""
+        if not self._scaler_loaded:
+            self.load_scaler()
+        return self._scaler_path
 
     def get_data(self) -> pd.DataFrame:
         if not self._is_loaded:
@@ -87,30 +143,125 @@ class DataLoader:
             self.load_data()
         return self._data[["lat", "lon"]].values.tolist()
 
-    def get_features_scaled(self) -> pd.DataFrame:
-        """Get scaled features for model prediction."""
+    def refresh_if_changed(self) -> None:
+        """Reload the dataset and/or scaler if their files changed on disk.
+
+        The check and the reload happen under one lock, so concurrent callers
+        reload a changed file once and never see it half-loaded.
+        """
+        with self._lock:
+            if self._is_loaded and _file_signature(self._data_path) != self._data_signature:
+                print(f"Dataset changed on disk, reloading {self._data_path}")
+                self._read_data(self._data_path)
+
+            if (
+                self._scaler_loaded
+                and _file_signature(self._scaler_path) != self._scaler_signature
+            ):
+                print(f"Scaler changed on disk, reloading {self._scaler_path}")
+                self._read_scaler(self._scaler_path)
+
+    def get_feature_matrix(self) -> np.ndarray:
+        """Get scaled features as a shared, read-only float32 matrix.
+
+        Columns follow ``FEATURE_COLUMNS``. The matrix is computed once and
+        handed to every session and model as-is; it is only recomputed when
+        the CSV or the scaler file changes on disk.
+        """
+        self.refresh_if_changed()
         if not self._is_loaded:
-            self.load_data()
+            self.load_data(self._data_path)
+        if not self._scaler_loaded:
+            self.load_scaler(self._scaler_path)
 
-        # Get only feature columns (exclude lat, lon, target)
-        feature_columns = [
-            col for col in self._data.columns if col not in ["target"]
-        ]
-        features = self._data[feature_columns].copy()
+        matrix_key = (self._data_signature, self._scaler_signature, id(self._data))
+        if self._feature_matrix is not None and self._matrix_key == matrix_key:
+            return self._feature_matrix
+
+        with self._matrix_lock:
+            if self._feature_matrix is not None and self._matrix_key == matrix_key:
+                return self._feature_matrix
+
+            with span("data_loader.scale"):
+                feature_matrix = self.scale_features(self._data[FEATURE_COLUMNS])
+            feature_matrix.setflags(write=False)
+            coordinate_array = self._data[["lat", "lon"]].to_numpy(np.float64)
+            coordinate_array.setflags(write=False)
 
-        # Load and apply scaler
+            self._feature_matrix = feature_matrix
+            self._coordinate_array = coordinate_array
+            self._matrix_key = matrix_key
+            return feature_matrix
+
+    def scale_features(self, features: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """Scale raw features in ``FEATURE_COLUMNS`` order into a float32 matrix."""
         if not self._scaler_loaded:
-            self.load_scaler()
+            self.load_scaler(self._scaler_path)
 
+        if not isinstance(features, pd.DataFrame):
+            features = pd.DataFrame(features, columns=FEATURE_COLUMNS)
         if self._scaler is not None:
             try:
-                scaled_features = self._scaler.transform(features)
-                return pd.DataFrame(scaled_features, columns=features.columns)
+                features = self._scaler.transform(features)
             except Exception as e:
                 print(f"Error scaling features: {e}")
-                return features
 
-        return features
+        return np.ascontiguousarray(features, dtype=np.float32)
+
+    def scale_columns(self, values: np.ndarray, columns: List[str]) -> np.ndarray:
+        """Scale a subset of raw feature columns with the fitted scaler's statistics.
+
+        Lets callers patch a few columns of the feature matrix without
+        re-transforming the others.
+        """
+        if not self._scaler_loaded:
+            self.load_scaler(self._scaler_path)
+
+        values = np.asarray(values, dtype=np.float64)
+        if self._scaler is None:
+            return values.astype(np.float32)
+
+        fitted_columns = list(getattr(self._scaler, "feature_names_in_", FEATURE_COLUMNS))
+        index = [fitted_columns.index(column) for column in columns]
+        if self._scaler.mean_ is not None:
+            values = values - self._scaler.mean_[index]
+        if self._scaler.scale_ is not None:
+            values = values / self._scaler.scale_[index]
+        return values.astype(np.float32)
+
+    def get_coordinate_array(self) -> np.ndarray:
+        """Get (lat, lon) as a read-only float64 array aligned with the feature matrix."""
+        self.get_feature_matrix()
+        return self._coordinate_array
+
+    def get_features_scaled(self) -> pd.DataFrame:
+        """Get scaled features for model prediction."""
+        return pd.DataFrame(self.get_feature_matrix(), columns=FEATURE_COLUMNS)
+
+    def iter_features_scaled(
+        self, chunk_size: int, data_path: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Stream scaled feature chunks straight from the CSV file.
+
+        Unlike ``get_features_scaled`` this never holds the whole dataset in
+        memory, so it can feed ``FloodPredictionModel.predict_stream`` with
+        inputs far larger than RAM.
+        """
+        if data_path is None:
+            data_path = os.path.join(
+                os.getcwd(), "dashboard", "data", "flood_inference_data.csv"
+            )
+
+        if not self._scaler_loaded:
+            self.load_scaler()
+
+        for chunk in pd.read_csv(data_path, chunksize=chunk_size):
+            features = chunk.drop(columns=["target"], errors="ignore")
+            if self._scaler is not None:
+                features = pd.DataFrame(
+                    self._scaler.transform(features), columns=features.columns
+                )
+            yield features
 
     def get_features_raw(self) -> pd.DataFrame:
         """Get raw features without scaling."""
@@ -129,21 +280,191 @@ def get_ground_truth_targets() -> List[List[float]]:
     return data_loader.get_ground_truth()
 
 
-def load_example_inference_data() -> Tuple[List[List[float]], pd.DataFrame]:
-    """Load example inference data for testing."""
+def get_ground_truth_classes() -> List[float]:
+    """Target class of every ground truth point, aligned with ``get_ground_truth_targets``."""
+    data = DataLoader.get_instance().get_data()
+    if "target" not in data.columns:
+        return [0.0] * len(data)
+    return data["target"].astype(float).tolist()
+
+
+def load_example_inference_data(
+    scaled: bool = True,
+) -> Tuple[List[List[float]], Union[np.ndarray, pd.DataFrame]]:
+    """Load example inference data for testing.
+
+    ``scaled=False`` returns the raw model features for backends that apply
+    their own scaler (see ``ModelSpec.scaled_input``).
+    """
     data_loader = DataLoader.get_instance()
 
     ground_truth = data_loader.get_coordinates()
 
-    X = data_loader.get_features_scaled()
+    if scaled:
+        X = data_loader.get_feature_matrix()
+    else:
+        X = data_loader.get_data()[FEATURE_COLUMNS]
 
     return ground_truth, X
 
 
-class MapState(rx.State):
-    ground_truth_coordinates: list = get_ground_truth_targets()
+@timed("inference.predict_flood_result")
+def predict_flood_result(model_id: str) -> PredictionResult:
+    """Run the model over the inference dataset and keep the probabilities.
+
+    Blocking; meant to run on the ``InferenceExecutor`` pool. Datasets of at
+    least ``SHARDED_MIN_ROWS`` rows are split across the sharded worker pool
+    when ``SHARDED_INFERENCE_WORKERS`` is set.
+    """
+    model, spec = ModelRegistry.get_instance().get_with_spec(model_id)
+    data_loader = DataLoader.get_instance()
+
+    if spec.scaled_input:
+        input_data = data_loader.get_feature_matrix()
+    else:
+        input_data = data_loader.get_data()[FEATURE_COLUMNS]
+    coordinates = data_loader.get_coordinate_array()
+
+    if SHARDED_INFERENCE_WORKERS > 0 and len(input_data) >= SHARDED_MIN_ROWS:
+        probabilities = ShardedInferencePool.get_instance().predict_proba(
+            np.asarray(input_data, dtype=np.float32), model_id
+        )
+    else:
+        probabilities = model.predict_proba(input_data)
+    print(f"Prediction completed: {len(probabilities)} samples predicted.")
+    return PredictionResult(coordinates, probabilities)
+
+
+def prediction_cache_key(model_id: str) -> Tuple[str, str, str]:
+    """Cache key of the prediction a model would produce on the current dataset.
+
+    Rehashes the model, scaler or dataset file whenever one changed on disk,
+    so event handlers call it through ``asyncio.to_thread``.
+    """
+    spec = ModelRegistry.get_instance().get_spec(model_id)
+    data_loader = DataLoader.get_instance()
+    return PredictionCache.make_key(
+        spec.path,
+        f"{spec.backend}:{spec.quantization}",
+        data_loader.scaler_path if spec.scaled_input else spec.scaler_path,
+        data_loader.data_path,
+    )
+
+
+def live_prediction_cache_key(model_id: str, rainfall_fingerprint: str) -> tuple:
+    """Cache key of a live-rainfall prediction: the dataset key plus the rainfall hash."""
+    return prediction_cache_key(model_id) + (f"live:{rainfall_fingerprint}",)
+
+
+async def await_model(model_id: str) -> None:
+    """Wait until a model can serve inference jobs; KeyError for an unknown id.
+
+    In process mode the executor's workers load (and preload) their own copy,
+    so the web process only checks the id instead of loading the model too.
+    """
+    registry = ModelRegistry.get_instance()
+    if InferenceExecutor.get_instance().mode == "process":
+        registry.get_spec(model_id)
+        return
+    await asyncio.wrap_future(registry.load_async(model_id))
+
 
-    predicted_flood_coordinates: list = []
+def _model_ready(model_id: str) -> bool:
+    """Whether a model serves without loading first (always, once workers own the models)."""
+    return InferenceExecutor.get_instance().mode == "process" or ModelRegistry.get_instance().is_ready(model_id)
+
+
+def _warm_regency_labels() -> None:
+    """Join the dataset points to regencies off the event loop (only slow the first time)."""
+    from .regency_index import RegencyAggregator
+
+    # Missing, unreadable or malformed boundary files; anything else is a bug and propagates.
+    try:
+        RegencyAggregator.get_instance().labels()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error assigning points to regencies: {e}")
+
+
+def _regency_summary(result: PredictionResult, threshold: float) -> list:
+    """Per-regency flood counts for the map state; empty if the boundaries are unavailable."""
+    from .regency_index import RegencyAggregator
+
+    try:
+        return RegencyAggregator.get_instance().summarize_dicts(result, threshold)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error summarizing flood points per regency: {e}")
+        return []
+
+
+def _points_in_view(
+    run_id: str, result: PredictionResult, selection: tuple, zoom: float, bounds: List[float]
+) -> Tuple[List[float], List[float]]:
+    """Flat points and probabilities of a selection around the map view (see ``ViewportPoints``)."""
+    from .viewport_points import ViewportPoints
+
+    if len(bounds) != 4:
+        return [], []
+    return ViewportPoints.get_instance().points(run_id, result, selection, zoom, bounds)
+
+
+def _flood_points_in_view(
+    run_id: str, result: PredictionResult, top_k: int, zoom: float, bounds: List[float]
+) -> Tuple[List[float], List[float]]:
+    """Flat top-k points and probabilities around the map view.
+
+    Threshold views go to the browser as vector tiles (``/api/tiles/flood``),
+    so only a top-k selection, which tiles can't express, is sent as state.
+    """
+    if top_k == 0:
+        return [], []
+    return _points_in_view(run_id, result, ("top_k", top_k), zoom, bounds)
+
+
+def _derive_flood_view(
+    run_id: str, result: PredictionResult, top_k: int, threshold: float, zoom: float, bounds: List[float]
+) -> Tuple[List[float], List[float], list]:
+    """Flood points around the map view and the regency summary of a result (run off the event loop)."""
+    points, probabilities = _flood_points_in_view(run_id, result, top_k, zoom, bounds)
+    return points, probabilities, _regency_summary(result, threshold)
+
+
+def _cached_prediction(source: str, model_id: str, rainfall_fingerprint: str) -> Optional[PredictionResult]:
+    """A session's current prediction from the cache, or None if it was evicted."""
+    if source == "live":
+        cache_key = live_prediction_cache_key(model_id, rainfall_fingerprint)
+    else:
+        cache_key = prediction_cache_key(model_id)
+    return PredictionCache.get_instance().get(cache_key)
+
+
+class MapState(rx.State):
+    # Flat [lat0, lon0, lat1, lon1, ...] top-k points around the current view, drawn by
+    # the canvas point layer; threshold views and ground truth are drawn from vector tiles
+    predicted_flood_points: list[float] = []
+    predicted_flood_probabilities: list[float] = []
+    # Id of the current prediction in the vector tile URLs (/api/tiles/flood/<id>/...)
+    flood_tile_run_id: str = ""
+    # Flood counts per kabupaten of the current prediction, highest flood ratio first
+    regency_summary: list[dict] = []
+
+    sigmoid_threshold: float = 0.5
+    top_k: int = 0
+    # Last reported map view: zoom and [west, south, east, north]
+    view_zoom: float = 0.0
+    view_bounds: list[float] = []
+    has_prediction: bool = False
+    # True while a run_flood_prediction or run_live_prediction of this session is in flight
+    is_predicting: bool = False
+    _running_predictions: int = 0
+    # "dataset" (precipitation from the CSV) or "live" (WeatherService rainfall)
+    prediction_source: str = "dataset"
+    live_rainfall_fingerprint: str = ""
+    live_weather_status: str = ""
+
+    model_id: str = DEFAULT_MODEL_ID
+    model_ready: bool = False
+    is_switching_model: bool = False
+    model_error: str = ""
 
     def clear_coordinates(self) -> None:
         """Clear all coordinates from the map."""
@@ -153,29 +474,277 @@ class MapState(rx.State):
     async def run_flood_prediction(self) -> float:
         """Run flood prediction using the model."""
         print("Starting flood prediction...")
+        await self._begin_prediction()
         try:
-            model = FloodPredictionModel.get_instance()
-            ground_truth, input_data = load_example_inference_data()
-            if not model.is_loaded:
-                raise RuntimeError("Flood prediction model is not loaded")
-            prediction = model.predict(input_data)
-            print(f"Prediction completed: {(len(prediction), prediction[:10])} samples predicted.")
-            df = pd.DataFrame({
-            'lat': [coord[0] for coord in ground_truth],
-            'lon': [coord[1] for coord in ground_truth], 
-            'target': prediction
-        })
-        
-        # Filter for flood predictions (target != 0) and get coordinates
-            flood_coords = df.query("target != 0")[['lat', 'lon']].values.tolist()
-            print(f"Predicted flood coordinates: {flood_coords[:10]} coordinates.")
+            with span("map_state.run_flood_prediction"):
+                # Resolve the model once: a model switch during this run only
+                # affects the next prediction, never the one in flight.
+                model_id = self.model_id
+                cache = PredictionCache.get_instance()
+
+                with span("map_state.cache_lookup"):
+                    # Hashing a changed model or dataset file stays off the event loop.
+                    cache_key = await asyncio.to_thread(prediction_cache_key, model_id)
+                    result = cache.get(cache_key)
+
+                if result is not None:
+                    print(f"Flood prediction served from cache: {len(result)} samples.")
+                else:
+                    with span("map_state.await_model"):
+                        await await_model(model_id)
+                    # Scaling and inference are CPU-bound; run them on the inference
+                    # pool so other sessions' events keep flowing meanwhile.
+                    with span("map_state.executor"):
+                        result = await InferenceExecutor.get_instance().run(
+                            predict_flood_result, model_id
+                        )
+                    cache.put(cache_key, result)
+
+                with span("map_state.regency_labels"):
+                    await asyncio.to_thread(_warm_regency_labels)
+
+                # The viewport queries of this run then never build its index on the event loop.
+                run_id = TileRunRegistry.get_instance().publish(cache_key, result)
+                with span("map_state.point_index"):
+                    await asyncio.to_thread(TileRunRegistry.get_instance().index, run_id)
+
+                # Points and summary are derived on a worker thread; leaving
+                # ``async with self`` then sends the state delta to the browser.
+                with span("map_state.state_push"):
+                    threshold = await self._show_flood_view(
+                        run_id, result, {"has_prediction": True, "prediction_source": "dataset"}
+                    )
+                flood_count = await asyncio.to_thread(result.flood_count, threshold)
+            print(f"Flood prediction completed: {flood_count} coordinates predicted.")
+        except Exception as e:
+            print(f"Error during flood prediction: {e}")
+        finally:
+            await self._end_prediction()
 
+    @rx.event(background=True)
+    async def run_live_prediction(self):
+        """Run flood prediction with current and forecast rainfall from WeatherService."""
+        from .weather_pipeline import CITY_NAMES, fetch_city_rainfall, predict_live_result
+
+        print("Starting live rainfall flood prediction...")
+        await self._begin_prediction()
+        try:
+            model_id = self.model_id
+            rainfall = await asyncio.to_thread(fetch_city_rainfall)
+            if rainfall.available == 0:
+                print("Live flood prediction skipped: no city returned rainfall.")
+                async with self:
+                    self.live_weather_status = (
+                        f"Gagal memuat curah hujan: 0/{len(CITY_NAMES)} kota tersedia"
+                    )
+                return
+            cache = PredictionCache.get_instance()
+            cache_key = await asyncio.to_thread(live_prediction_cache_key, model_id, rainfall.fingerprint)
+
+            result = cache.get(cache_key)
+            if result is None:
+                await await_model(model_id)
+                result = await InferenceExecutor.get_instance().run(
+                    predict_live_result, model_id, rainfall
+                )
+                cache.put(cache_key, result)
+
+            await asyncio.to_thread(_warm_regency_labels)
+            run_id = TileRunRegistry.get_instance().publish(cache_key, result)
+            await asyncio.to_thread(TileRunRegistry.get_instance().index, run_id)
+            await self._show_flood_view(run_id, result, {
+                "has_prediction": True,
+                "prediction_source": "live",
+                "live_rainfall_fingerprint": rainfall.fingerprint,
+                "live_weather_status": (
+                    f"Curah hujan {rainfall.fetched_at}: "
+                    f"{rainfall.available}/{len(CITY_NAMES)} kota tersedia"
+                ),
+            })
+            print(f"Live flood prediction completed from {rainfall.available} cities.")
+        except Exception as e:
+            print(f"Error during live flood prediction: {e}")
+            async with self:
+                self.live_weather_status = "Gagal memuat curah hujan terkini"
+        finally:
+            await self._end_prediction()
+
+    async def _begin_prediction(self) -> None:
+        """Mark a prediction run of this session as in flight (runs may overlap)."""
+        async with self:
+            self._running_predictions += 1
+            self.is_predicting = True
+
+    async def _end_prediction(self) -> None:
+        async with self:
+            self._running_predictions -= 1
+            self.is_predicting = self._running_predictions > 0
+
+    def _flood_view_settings(self) -> tuple:
+        """The settings the displayed flood points and regency summary are derived from."""
+        return self.top_k, self.sigmoid_threshold, self.view_zoom, list(self.view_bounds)
+
+    async def _show_flood_view(
+        self, run_id: str, result: PredictionResult, prediction_fields: Optional[dict] = None
+    ) -> Optional[float]:
+        """Derive a result's flood points and summary on a worker thread, then show them.
+
+        They are derived again if the threshold, top-k or view changed in the
+        meantime. Without ``prediction_fields`` the result must still be the
+        one shown, else nothing changes; with them it is a new prediction, and
+        the fields are set in the same state update as its points. Returns the
+        threshold shown, or None if dropped.
+        """
+        while True:
+            async with self:
+                settings = self._flood_view_settings()
+            derived = await asyncio.to_thread(_derive_flood_view, run_id, result, *settings)
             async with self:
-                self.predicted_flood_coordinates = flood_coords
-            print(f"Flood prediction completed: {len(flood_coords)} coordinates predicted.")
+                if prediction_fields is None and self.flood_tile_run_id != run_id:
+                    return None
+                if self._flood_view_settings() == settings:
+                    for name, value in (prediction_fields or {}).items():
+                        setattr(self, name, value)
+                    self.flood_tile_run_id = run_id
+                    (
+                        self.predicted_flood_points,
+                        self.predicted_flood_probabilities,
+                        self.regency_summary,
+                    ) = derived
+                    return self.sigmoid_threshold
+
+    async def _rederive_flood_points(self):
+        """Re-threshold the cached result, or return the rerun event if it was evicted."""
+        async with self:
+            if not self.has_prediction:
+                return None
+            run_id = self.flood_tile_run_id
+            source = (self.prediction_source, self.model_id, self.live_rainfall_fingerprint)
+
+        # Hashing a changed model or dataset file for the cache key stays off the event loop.
+        result = await asyncio.to_thread(_cached_prediction, *source)
+        if result is None:
+            async with self:
+                # A run already in flight derives its points with the current settings.
+                return None if self.is_predicting else self._rerun_prediction()
+        await self._show_flood_view(run_id, result)
+        return None
+
+    def _rerun_prediction(self):
+        """The event that recomputes the current prediction source."""
+        if self.prediction_source == "live":
+            return MapState.run_live_prediction
+        return MapState.run_flood_prediction
+
+    @rx.event
+    def preview_threshold(self, value: list[float]):
+        """Follow the slider while it is dragged; points are re-derived on commit."""
+        self.sigmoid_threshold = round(float(value[0]) / 100, 2)
+
+    @rx.event(background=True)
+    async def set_threshold(self, value: list[float]):
+        """Set the sigmoid threshold (slider percent) and re-derive flood points."""
+        async with self:
+            self.sigmoid_threshold = round(float(value[0]) / 100, 2)
+            self.top_k = 0
+        rerun = await self._rederive_flood_points()
+        if rerun is not None:
+            yield rerun
+
+    @rx.event(background=True)
+    async def set_viewport(self, view: dict):
+        """Record the map view (zoom, west, south, east, north) and load the top-k points around it.
+
+        The points are cut on a worker thread, where building a run's index
+        or a top-k selection may take a while. A view superseded by a newer
+        one while it was computed is dropped.
+        """
+        zoom = float(view["zoom"])
+        bounds = [float(view[side]) for side in ("west", "south", "east", "north")]
+        async with self:
+            self.view_zoom, self.view_bounds = zoom, bounds
+            has_prediction = self.has_prediction
+            run_id, top_k = flood_view = (self.flood_tile_run_id, self.top_k)
+            source = (self.prediction_source, self.model_id, self.live_rainfall_fingerprint)
+
+        result, flood_points = None, None
+        if has_prediction:
+            result = await asyncio.to_thread(_cached_prediction, *source)
+            if result is not None:
+                flood_points = await asyncio.to_thread(
+                    _flood_points_in_view, run_id, result, top_k, zoom, bounds
+                )
+
+        async with self:
+            if self.view_zoom != zoom or list(self.view_bounds) != bounds:
+                return
+            if flood_points is not None and flood_view == (self.flood_tile_run_id, self.top_k):
+                self.predicted_flood_points, self.predicted_flood_probabilities = flood_points
+            # An evicted prediction is recomputed, unless a run is already on its way.
+            rerun = has_prediction and result is None and not self.is_predicting
+        if rerun:
+            yield self._rerun_prediction()
+
+    @rx.event(background=True)
+    async def show_top_k(self, k: int):
+        """Show only the ``k`` riskiest points; ``k <= 0`` returns to the threshold view."""
+        async with self:
+            self.top_k = max(0, int(k))
+        rerun = await self._rederive_flood_points()
+        if rerun is not None:
+            yield rerun
+
+    @rx.event(background=True)
+    async def warm_up_model(self):
+        """Load the selected model in the background on first page load.
+
+        TensorFlow is only imported here, so the Overview page and workers
+        that never predict don't pay for it; meanwhile the UI shows the model
+        as warming up instead of blocking. ``model_ready`` mirrors the
+        registry, which also serves the warm-up task and other sessions.
+        """
+        async with self:
+            model_id = self.model_id
+
+        if not _model_ready(model_id):
+            try:
+                await await_model(model_id)
+            except Exception as e:
+                print(f"Error warming up flood model: {e}")
+                async with self:
+                    self.model_error = f"Gagal memuat model {model_id}"
+                    self.model_ready = _model_ready(self.model_id)
+                return
+
+        async with self:
+            self.model_ready = _model_ready(self.model_id)
+
+    @rx.event(background=True)
+    async def switch_model(self, model_id: str):
+        """Load another model in the background and switch to it when ready."""
+        async with self:
+            if model_id == self.model_id or self.is_switching_model:
+                return
+            self.is_switching_model = True
+            self.model_error = ""
+
+        try:
+            await await_model(model_id)
+            async with self:
+                self.model_id = model_id
+                self.model_ready = _model_ready(model_id)
+                rerun = self._rerun_prediction() if self.has_prediction else None
+            print(f"Switched flood model to {model_id}")
+            if rerun is not None:
+                yield rerun
         except Exception as e:
-            print(f"Error during flood prediction: {e}")
-        
+            print(f"Error switching flood model: {e}")
+            async with self:
+                self.model_error = f"Gagal memuat model {model_id}"
+        finally:
+            async with self:
+                self.is_switching_model = False
+
     @rx.event
     def set_flood_prediction_coordinates(self):
         """Set the predicted flood coordinates."""
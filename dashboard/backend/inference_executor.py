@@ -0,0 +1,133 @@
+"""Worker pool that keeps blocking inference off the Reflex event loop"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from threading import Lock
+from typing import Optional, Callable, Any, Sequence
+
+from config import INFERENCE_EXECUTOR, INFERENCE_WORKERS, INFERENCE_QUEUE_DEPTH
+
+
+def _preload_worker(model_ids: Sequence[str]) -> None:
+    """Process-pool initializer: load the models once per worker process."""
+    from .model_registry import ModelRegistry
+
+    registry = ModelRegistry.get_instance()
+    for model_id in model_ids:
+        try:
+            registry.get(model_id)
+        except Exception as e:
+            print(f"Worker failed to preload model {model_id}: {e}")
+
+
+class InferenceExecutor:
+    """Singleton executor that event handlers can await for inference work.
+
+    ``mode="thread"`` runs jobs in a thread pool; TensorFlow releases the GIL
+    inside its kernels, so the event loop stays responsive. ``mode="process"``
+    runs jobs in spawned worker processes that each preload the models, which
+    also isolates the GIL-bound Python parts of the pipeline. Jobs beyond
+    ``queue_depth`` (running plus waiting) are rejected instead of piling up.
+    """
+
+    _instance: Optional["InferenceExecutor"] = None
+    _lock: Lock = Lock()
+
+    def __init__(
+        self,
+        mode: str = INFERENCE_EXECUTOR,
+        workers: int = INFERENCE_WORKERS,
+        queue_depth: int = INFERENCE_QUEUE_DEPTH,
+        preload_model_ids: Sequence[str] = (),
+    ):
+        """Private constructor - use get_instance() instead."""
+        if mode not in ("thread", "process"):
+            raise ValueError("Executor mode must be 'thread' or 'process'")
+        if workers <= 0 or queue_depth <= 0:
+            raise ValueError("Workers and queue depth must be positive integers")
+
+        self.mode: str = mode
+        self.workers: int = workers
+        self.queue_depth: int = queue_depth
+        self.preload_model_ids: Sequence[str] = preload_model_ids
+        self._executor: Optional[Executor] = None
+        self._pending: int = 0
+        self._pending_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "InferenceExecutor":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    from config import DEFAULT_MODEL_ID
+
+                    cls._instance = cls(preload_model_ids=(DEFAULT_MODEL_ID,))
+        return cls._instance
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs running or waiting for a worker."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        """Create the underlying pool on first use."""
+        if self._executor is None:
+            with self._pending_lock:
+                if self._executor is None:
+                    if self.mode == "process":
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_preload_worker,
+                            initargs=(tuple(self.preload_model_ids),),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="inference"
+                        )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the pool and await its result.
+
+        In thread mode ``fn`` runs in a copy of the caller's context, so its
+        timing spans nest under the awaiting span. In process mode ``fn`` must
+        be a module-level function and its arguments and result must be
+        picklable.
+        """
+        with self._pending_lock:
+            if self._pending >= self.queue_depth:
+                raise RuntimeError(
+                    f"Inference queue is full ({self.queue_depth} jobs), try again later"
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            job = functools.partial(fn, *args, **kwargs)
+            if self.mode == "thread":
+                job = functools.partial(contextvars.copy_context().run, job)
+            return await loop.run_in_executor(self._get_executor(), job)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the pool down; it is recreated on the next run()."""
+        with self._pending_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def get_executor_info(self) -> dict:
+        """Get configuration and current load."""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": self._pending,
+        }
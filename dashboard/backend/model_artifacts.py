@@ -0,0 +1,170 @@
+"""Frozen-graph cache of the Keras flood models, keyed by the .h5 file hash"""
+
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Optional, Tuple, List, Callable
+
+from config import MODEL_ARTIFACT_DIR
+from .prediction_cache import file_fingerprint
+
+if TYPE_CHECKING:
+    import tensorflow as tf
+
+
+def artifact_paths(model_path: str, cache_root: str = MODEL_ARTIFACT_DIR) -> Tuple[str, str]:
+    """(graph, metadata) paths of the artifact for the model file's current contents."""
+    stem = os.path.splitext(os.path.basename(model_path))[0].replace(" ", "_")
+    key = f"{stem}-{file_fingerprint(model_path)[:16]}"
+    return os.path.join(cache_root, f"{key}.pb"), os.path.join(cache_root, f"{key}.json")
+
+
+def export_frozen_graph(
+    infer: "tf.types.experimental.PolymorphicFunction",
+    model_path: str,
+    input_shape: tuple,
+    output_shape: tuple,
+    cache_root: str = MODEL_ARTIFACT_DIR,
+) -> Optional[str]:
+    """Freeze a traced inference function into a GraphDef next to its metadata.
+
+    The variables become constants, so loading is a protobuf parse and a
+    graph import: no layer objects are rebuilt and no weights restored.
+    Returns the graph path, or None when caching is disabled.
+    """
+    if not cache_root:
+        return None
+
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import (
+        convert_variables_to_constants_v2,
+    )
+
+    frozen = convert_variables_to_constants_v2(infer.get_concrete_function())
+    graph_path, meta_path = artifact_paths(model_path, cache_root)
+    os.makedirs(cache_root, exist_ok=True)
+
+    tmp_path = f"{graph_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(frozen.graph.as_graph_def().SerializeToString())
+    os.replace(tmp_path, graph_path)
+
+    # The metadata is written last: a graph without it is never loaded.
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "source": os.path.basename(model_path),
+            "tensorflow": tf.__version__,
+            "input": frozen.inputs[0].name,
+            "output": frozen.outputs[0].name,
+            "input_shape": list(input_shape),
+            "output_shape": list(output_shape),
+        }, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return graph_path
+
+
+def load_frozen_graph(
+    model_path: str, cache_root: str = MODEL_ARTIFACT_DIR
+) -> Optional[Tuple[Callable[["tf.Tensor"], "tf.Tensor"], dict]]:
+    """Load the cached inference function for a model file, or None if there is none.
+
+    Artifacts written by another TensorFlow version are ignored, since
+    GraphDefs are not guaranteed to carry over between releases. A truncated
+    or corrupt artifact is deleted, so the caller falls back to the .h5 and
+    exports a fresh one.
+    """
+    if not cache_root:
+        return None
+
+    graph_path, meta_path = artifact_paths(model_path, cache_root)
+    if not (os.path.exists(graph_path) and os.path.exists(meta_path)):
+        return None
+
+    import tensorflow as tf
+    from google.protobuf.message import DecodeError
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("tensorflow") != tf.__version__:
+            return None
+        meta["path"] = graph_path
+
+        graph_def = tf.compat.v1.GraphDef()
+        with open(graph_path, "rb") as f:
+            graph_def.ParseFromString(f.read())
+
+        wrapped = tf.compat.v1.wrap_function(
+            lambda: tf.compat.v1.import_graph_def(graph_def, name=""), []
+        )
+        infer = wrapped.prune(
+            wrapped.graph.get_tensor_by_name(meta["input"]),
+            wrapped.graph.get_tensor_by_name(meta["output"]),
+        )
+    except (OSError, ValueError, KeyError, DecodeError) as e:
+        print(f"Discarding unreadable model artifact {graph_path}: {e}")
+        for path in (meta_path, graph_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return None
+    return infer, meta
+
+
+def _measure_cold_load(model_path: str, cache_root: str) -> dict:
+    """Import TensorFlow and load one model in a fresh process (see benchmark_cold_load)."""
+    start = time.perf_counter()
+    import tensorflow  # noqa: F401
+    import_seconds = time.perf_counter() - start
+
+    from .flood_prediction import FloodPredictionModel
+
+    model = FloodPredictionModel()
+    model.artifact_dir = cache_root
+    start = time.perf_counter()
+    model.load_if_needed(model_path)
+    return {
+        "source": "artifact" if model.get_model_info()["artifact"] else "h5",
+        "import_seconds": round(import_seconds, 3),
+        "load_seconds": round(time.perf_counter() - start, 3),
+        "warmup_seconds": round(model.get_model_info()["warmup_seconds"], 3),
+    }
+
+
+def benchmark_cold_load(
+    model_path: str, cache_root: str = MODEL_ARTIFACT_DIR, repeats: int = 3
+) -> List[dict]:
+    """Cold model load from the .h5 and from the artifact, each in spawned processes.
+
+    This is what a freshly started worker pays before it can serve. The
+    artifact is built up front so its export does not count as load time.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    from .flood_prediction import FloodPredictionModel
+
+    FloodPredictionModel().load_if_needed(model_path)  # writes the artifact if missing
+
+    results = []
+    for root in ("", cache_root):
+        for _ in range(repeats):
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results.append(executor.submit(_measure_cold_load, model_path, root).result())
+    return results
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from .model_registry import ModelRegistry
+
+    keras_paths = sorted({
+        spec.path for spec in ModelRegistry.get_instance().list_specs() if spec.backend == "keras"
+    })
+    for model_path in keras_paths:
+        print(f"{model_path}: {artifact_paths(model_path)[0]}")
+        print(pd.DataFrame(benchmark_cold_load(model_path)).to_string(index=False))
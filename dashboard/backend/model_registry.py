@@ -0,0 +1,285 @@
+"""Registry of flood models keyed by model id"""
+
+import contextvars
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, List, Dict, Tuple
+
+from config import MODEL_MEMORY_BUDGET_MB, DEFAULT_MODEL_ID
+from .flood_prediction import FloodPredictionModel
+from .tflite_backend import TFLiteFloodModel
+from .sklearn_backend import SklearnFloodModel
+
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models")
+
+
+def _resident_bytes() -> int:
+    """Resident set size of this process."""
+    import psutil
+
+    return psutil.Process().memory_info().rss
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Where a model lives and which backend serves it."""
+    model_id: str
+    path: str
+    backend: str = "keras"
+    label: str = ""
+    quantization: str = "none"
+    scaler_path: Optional[str] = None
+
+    @property
+    def scaled_input(self) -> bool:
+        """Whether the model expects features scaled by standard_scaler.pkl."""
+        return self.backend != "sklearn"
+
+
+DEFAULT_MODEL_SPECS = [
+    ModelSpec(
+        "lstm_smote_cv_3",
+        os.path.join(MODELS_DIR, "lstm_smote_cv (3).h5"),
+        label="LSTM SMOTE CV (3)",
+    ),
+    ModelSpec(
+        "lstm_smote_cv",
+        os.path.join(MODELS_DIR, "lstm_smote_cv.h5"),
+        label="LSTM SMOTE CV",
+    ),
+    ModelSpec(
+        "lstm_smote_cv_3_tflite",
+        os.path.join(MODELS_DIR, "lstm_smote_cv (3).h5"),
+        backend="tflite",
+        label="LSTM SMOTE CV (3) - TFLite",
+    ),
+    # Each quantization is its own entry, so switching never mutates a serving model.
+    ModelSpec(
+        "lstm_smote_cv_3_tflite_dynamic",
+        os.path.join(MODELS_DIR, "lstm_smote_cv (3).h5"),
+        backend="tflite",
+        label="LSTM SMOTE CV (3) - TFLite (dynamic)",
+        quantization="dynamic",
+    ),
+    ModelSpec(
+        "random_forest",
+        os.path.join(MODELS_DIR, "random_forest_model.joblib"),
+        backend="sklearn",
+        label="Random Forest",
+        scaler_path=os.path.join(MODELS_DIR, "robust_scaler.pkl"),
+    ),
+]
+
+
+class ModelRegistry:
+    """Singleton registry that keeps several loaded models in an LRU.
+
+    Models are loaded on a background thread, so the model currently serving
+    keeps answering while the next one loads. Loaded models are evicted least
+    recently used first once their combined footprint exceeds the memory
+    budget. Eviction only drops the registry's reference: a prediction that
+    already holds the model object finishes normally.
+    """
+
+    _instance: Optional["ModelRegistry"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, memory_budget_mb: int = MODEL_MEMORY_BUDGET_MB):
+        """Private constructor - use get_instance() instead."""
+        self.memory_budget_bytes: int = memory_budget_mb * 2**20
+        self.default_model_id: str = DEFAULT_MODEL_ID
+        self._specs: Dict[str, ModelSpec] = {}
+        self._loaded: "OrderedDict[str, FloodPredictionModel]" = OrderedDict()
+        self._footprints: Dict[str, int] = {}
+        self._runtime_footprints: Dict[str, int] = {}
+        self._pending: Dict[str, Future] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._state_lock: Lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+        for spec in DEFAULT_MODEL_SPECS:
+            self.register(spec)
+
+    @classmethod
+    def get_instance(cls) -> "ModelRegistry":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def register(self, spec: ModelSpec) -> None:
+        """Register (or replace) the spec for a model id."""
+        with self._state_lock:
+            self._specs[spec.model_id] = spec
+
+    def get_spec(self, model_id: str) -> ModelSpec:
+        """Get the spec registered under a model id."""
+        try:
+            return self._specs[model_id]
+        except KeyError:
+            raise KeyError(f"Unknown model id: {model_id}")
+
+    def list_specs(self) -> List[ModelSpec]:
+        """All registered specs, in registration order."""
+        return list(self._specs.values())
+
+    def is_loaded(self, model_id: str) -> bool:
+        """Check if a model is loaded and resident in the registry."""
+        return model_id in self._loaded
+
+    def is_ready(self, model_id: Optional[str] = None) -> bool:
+        """Check if a model (the default if omitted) can serve without loading."""
+        return self.is_loaded(model_id or self.default_model_id)
+
+    def model_status(self, model_id: str) -> dict:
+        """Load state of a model: pending, loading, ready or failed, with timing and error."""
+        with self._state_lock:
+            if model_id not in self._specs:
+                status, error = "failed", f"Unknown model id: {model_id}"
+            elif model_id in self._loaded:
+                status, error = "ready", ""
+            elif model_id in self._pending:
+                status, error = "loading", ""
+            elif model_id in self._errors:
+                status, error = "failed", self._errors[model_id]
+            else:
+                status, error = "pending", ""
+            return {
+                "name": f"model:{model_id}",
+                "status": status,
+                "seconds": self._load_seconds.get(model_id),
+                "error": error,
+            }
+
+    def get(self, model_id: Optional[str] = None) -> FloodPredictionModel:
+        """Get a loaded model, loading it on the calling thread if needed."""
+        model_id = model_id or self.default_model_id
+        with self._state_lock:
+            model = self._loaded.get(model_id)
+            if model is not None:
+                self._loaded.move_to_end(model_id)
+                return model
+
+        return self.load_async(model_id).result()
+
+    def get_with_spec(self, model_id: Optional[str] = None) -> Tuple[FloodPredictionModel, ModelSpec]:
+        """Get a loaded model together with its spec."""
+        model_id = model_id or self.default_model_id
+        return self.get(model_id), self.get_spec(model_id)
+
+    def load_async(self, model_id: str) -> Future:
+        """Load a model in the background; concurrent callers share one Future."""
+        spec = self.get_spec(model_id)
+        with self._state_lock:
+            if model_id in self._loaded:
+                future: Future = Future()
+                future.set_result(self._loaded[model_id])
+                return future
+            if model_id not in self._pending:
+                # The load's spans nest under the span of the caller that started it.
+                self._pending[model_id] = self._executor.submit(
+                    contextvars.copy_context().run, self._load, spec
+                )
+            return self._pending[model_id]
+
+    def _load(self, spec: ModelSpec) -> FloodPredictionModel:
+        """Build and load the backend for a spec, then admit it into the LRU.
+
+        The footprint is the growth in resident memory across the load. Loads
+        run one at a time on the loader thread, so the difference belongs to
+        this model; the backend runtime is imported (and charged separately)
+        before measuring.
+        """
+        start = time.perf_counter()
+        try:
+            self._import_runtime(spec.backend)
+            rss_before = _resident_bytes()
+            model = self._build_model(spec)
+            footprint = max(_resident_bytes() - rss_before, 0)
+
+            with self._state_lock:
+                self._loaded[spec.model_id] = model
+                self._footprints[spec.model_id] = footprint
+                self._load_seconds[spec.model_id] = time.perf_counter() - start
+                self._errors.pop(spec.model_id, None)
+                self._evict_over_budget(keep=spec.model_id)
+            return model
+
+        except Exception as e:
+            with self._state_lock:
+                self._load_seconds[spec.model_id] = time.perf_counter() - start
+                self._errors[spec.model_id] = str(e)
+            raise
+
+        finally:
+            with self._state_lock:
+                self._pending.pop(spec.model_id, None)
+
+    def _import_runtime(self, backend: str) -> None:
+        """Import the runtime a backend needs, recording its cost once."""
+        if backend in self._runtime_footprints:
+            return
+        rss_before = _resident_bytes()
+        self._import_backend(backend)
+        with self._state_lock:
+            self._runtime_footprints[backend] = max(_resident_bytes() - rss_before, 0)
+
+    @staticmethod
+    def _import_backend(backend: str) -> None:
+        """Import the library a backend runs on."""
+        if backend in ("keras", "tflite"):
+            import tensorflow  # noqa: F401
+        elif backend == "sklearn":
+            import joblib  # noqa: F401
+            import sklearn.ensemble  # noqa: F401
+
+    @staticmethod
+    def _build_model(spec: ModelSpec) -> FloodPredictionModel:
+        """Create the backend a spec names and load its model file."""
+        if spec.backend == "keras":
+            model = FloodPredictionModel()
+            model.load_if_needed(spec.path)
+        elif spec.backend == "tflite":
+            model = TFLiteFloodModel()
+            model.load_if_needed(spec.path, quantization=spec.quantization)
+        elif spec.backend == "sklearn":
+            model = SklearnFloodModel(scaler_path=spec.scaler_path)
+            model.load_if_needed(spec.path)
+        else:
+            raise ValueError(f"Unknown model backend: {spec.backend}")
+        return model
+
+    def _evict_over_budget(self, keep: str) -> None:
+        """Drop least recently used models until the budget is met."""
+        while sum(self._footprints.values()) > self.memory_budget_bytes:
+            candidates = [
+                model_id for model_id in self._loaded
+                if model_id not in (keep, self.default_model_id)
+            ]
+            if not candidates:
+                break
+            evicted = candidates[0]
+            self._loaded.pop(evicted)
+            self._footprints.pop(evicted)
+            print(f"Evicted model {evicted} from registry (memory budget)")
+
+    def get_registry_info(self) -> dict:
+        """Get information about registered and loaded models."""
+        with self._state_lock:
+            return {
+                "default_model_id": self.default_model_id,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "loaded": list(self._loaded.keys()),
+                "loading": list(self._pending.keys()),
+                "footprint_bytes": sum(self._footprints.values()),
+                "runtime_bytes": dict(self._runtime_footprints),
+                "registered": [spec.model_id for spec in self._specs.values()],
+            }
@@ -0,0 +1,208 @@
+"""Zoom-level grid clusters of map points, queried by viewport"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from config import CLUSTER_MAX_ZOOM, CLUSTER_CELL_PX, TILE_MAX_RUNS
+from .prediction_result import PredictionResult, flat_coordinates
+from .vector_tiles import TileRunRegistry, project, unproject
+
+
+TILE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class ClusterLevel:
+    """Clusters of one zoom level, sorted row-major by grid cell."""
+    zoom: int
+    side: int  # Grid cells per axis
+    cell_x: np.ndarray
+    cell_y: np.ndarray
+    keys: np.ndarray  # cell_y * side + cell_x, ascending
+    projected: np.ndarray  # Point-weighted centroid in Web Mercator [0, 1)
+    counts: np.ndarray
+    max_probability: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def take(self, positions: np.ndarray) -> "ClusterLevel":
+        """The clusters at ``positions``, still in key order if ``positions`` is sorted."""
+        return ClusterLevel(
+            self.zoom, self.side, self.cell_x[positions], self.cell_y[positions], self.keys[positions],
+            self.projected[positions], self.counts[positions], self.max_probability[positions],
+        )
+
+    def to_dict(self) -> dict:
+        """Flat arrays as the map's cluster layer takes them."""
+        return {
+            "zoom": self.zoom,
+            "points": flat_coordinates(unproject(self.projected)),
+            "counts": self.counts.tolist(),
+            "probabilities": self.max_probability.astype(np.float64).round(2).tolist(),
+        }
+
+
+def _aggregate(
+    zoom: int,
+    side: int,
+    cell_x: np.ndarray,
+    cell_y: np.ndarray,
+    projected: np.ndarray,
+    counts: np.ndarray,
+    probabilities: np.ndarray,
+) -> ClusterLevel:
+    """Merge the points or child clusters sharing a grid cell."""
+    keys = cell_y * side + cell_x
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]])) if len(keys) else order
+
+    counts = counts[order]
+    totals = np.add.reduceat(counts, starts) if len(keys) else counts
+    weighted = projected[order] * counts[:, np.newaxis]
+    centroids = np.add.reduceat(weighted, starts) / totals[:, np.newaxis] if len(keys) else weighted
+    max_probability = np.maximum.reduceat(probabilities[order], starts) if len(keys) else probabilities
+
+    return ClusterLevel(
+        zoom, side, cell_x[order][starts], cell_y[order][starts], keys[starts],
+        centroids, totals, max_probability,
+    )
+
+
+class ClusterIndex:
+    """Grid clusters of a point set at every zoom level up to ``max_zoom``.
+
+    Cells are ``cell_px`` screen pixels wide at their zoom. With a
+    power-of-two cell size a cell at zoom z is exactly four cells at z + 1,
+    so every coarser level is built from the one below by halving cell
+    coordinates instead of regrouping the points. A viewport query runs two
+    binary searches per grid row in view, so both its work and its payload
+    are bounded by the screen size rather than the point count.
+    """
+
+    def __init__(
+        self,
+        coordinates: np.ndarray,
+        probabilities: np.ndarray,
+        max_zoom: int = CLUSTER_MAX_ZOOM,
+        cell_px: int = CLUSTER_CELL_PX,
+    ):
+        if not 1 <= cell_px <= TILE_SIZE or cell_px & (cell_px - 1):
+            raise ValueError(f"Cluster cell size must be a power of two up to {TILE_SIZE} px, got {cell_px}")
+
+        self.max_zoom: int = max_zoom
+        cells_per_tile_log2 = (TILE_SIZE // cell_px).bit_length() - 1
+        projected = project(coordinates)
+        probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+        self.point_count: int = len(probabilities)
+
+        side = 1 << (max_zoom + cells_per_tile_log2)
+        cells = np.clip((projected * side).astype(np.int64), 0, side - 1)
+        level = _aggregate(
+            max_zoom, side, cells[:, 0], cells[:, 1],
+            projected, np.ones(len(projected), dtype=np.int64), probabilities,
+        )
+        levels = [level]
+        for zoom in range(max_zoom - 1, -1, -1):
+            level = _aggregate(
+                zoom, level.side >> 1, level.cell_x >> 1, level.cell_y >> 1,
+                level.projected, level.counts, level.max_probability,
+            )
+            levels.append(level)
+        self.levels: List[ClusterLevel] = levels[::-1]
+
+    def query(self, zoom: float, west: float, south: float, east: float, north: float) -> ClusterLevel:
+        """Clusters of the level for ``zoom`` whose cell intersects the bounding box."""
+        level = self.levels[int(np.clip(np.floor(zoom), 0, self.max_zoom))]
+        corners = np.floor(project([[north, west], [south, east]]) * level.side).astype(np.int64)
+        (x0, y0), (x1, y1) = np.clip(corners, 0, level.side - 1)
+        if x0 > x1 or y0 > y1 or not len(level):
+            return level.take(np.empty(0, dtype=np.int64))
+
+        if y1 - y0 + 1 > len(level):
+            # More rows in view than clusters: one pass over the level is cheaper.
+            inside = (level.cell_x >= x0) & (level.cell_x <= x1) & (level.cell_y >= y0) & (level.cell_y <= y1)
+            return level.take(np.flatnonzero(inside))
+
+        rows = np.arange(y0, y1 + 1) * level.side
+        starts = np.searchsorted(level.keys, rows + x0, side="left")
+        lengths = np.searchsorted(level.keys, rows + x1, side="right") - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return level.take(positions)
+
+
+class ClusterRegistry:
+    """Singleton of cluster indexes per published prediction run and threshold.
+
+    An index covers the run's points at or above the threshold and is built
+    on the first query. It is rebuilt if the run id was republished with a
+    new result (see ``TileRunRegistry.publish``).
+    """
+
+    _instance: Optional["ClusterRegistry"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_indexes: int = 2 * TILE_MAX_RUNS):
+        """Private constructor - use get_instance() instead."""
+        self.max_indexes: int = max_indexes
+        self._indexes: "OrderedDict[Tuple[str, float], Tuple[PredictionResult, ClusterIndex]]" = OrderedDict()
+        self._indexes_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "ClusterRegistry":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(self, run_id: str, threshold: float) -> Optional[ClusterIndex]:
+        """Cluster index of a published run, or None if the run is unknown."""
+        result = TileRunRegistry.get_instance().result(run_id)
+        if result is None:
+            return None
+
+        key = (run_id, round(float(threshold), 2))
+        with self._indexes_lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] is result:
+                self._indexes.move_to_end(key)
+                return cached[1]
+
+        mask = result.flood_mask(key[1])
+        index = ClusterIndex(result.coordinates[mask], result.probabilities[mask])
+        with self._indexes_lock:
+            self._indexes[key] = (result, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    coordinates = np.column_stack([rng.uniform(-6.5, -2.0, rows), rng.uniform(119.0, 121.5, rows)])
+    probabilities = rng.random(rows, dtype=np.float32)
+
+    start = time.perf_counter()
+    index = ClusterIndex(coordinates, probabilities)
+    print(f"Built {len(index.levels)} levels over {rows:,} points in {time.perf_counter() - start:.2f}s")
+
+    # Viewports of a 1280x800 px map centered on the province.
+    for zoom in (6, 8, 10, index.max_zoom):
+        half_lon = 640 * 360 / (TILE_SIZE * 2**zoom)
+        half_lat = 400 * 360 / (TILE_SIZE * 2**zoom)
+        start = time.perf_counter()
+        view = index.query(zoom, 120.0 - half_lon, -4.0 - half_lat, 120.0 + half_lon, -4.0 + half_lat)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  zoom {zoom:>2}: {len(view):,} clusters of {int(view.counts.sum()):,} points in {elapsed:.2f} ms")
@@ -0,0 +1,124 @@
+"""Cross-session cache of flood prediction results"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Dict, Tuple, Hashable
+
+from config import PREDICTION_CACHE_MAX_MB
+from .prediction_result import PredictionResult
+
+
+_fingerprints: Dict[str, Tuple[int, int, str]] = {}
+_fingerprints_lock: Lock = Lock()
+
+
+def file_fingerprint(path: str) -> str:
+    """SHA-256 of a file, rehashed only when its size or mtime changes."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    with _fingerprints_lock:
+        cached = _fingerprints.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[path] = (stat.st_size, stat.st_mtime_ns, fingerprint)
+    return fingerprint
+
+
+class PredictionCache:
+    """Singleton LRU of prediction results shared by every session.
+
+    Entries are ``PredictionResult`` objects keyed by the model, scaler and
+    dataset fingerprints, and are evicted least recently used first once their
+    total ``nbytes`` exceeds the budget. The threshold is not part of the key:
+    results keep the probabilities, so any threshold is derived from one entry.
+    """
+
+    _instance: Optional["PredictionCache"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_mb: int = PREDICTION_CACHE_MAX_MB):
+        """Private constructor - use get_instance() instead."""
+        self.max_bytes: int = max_mb * 2**20
+        self._entries: "OrderedDict[Hashable, PredictionResult]" = OrderedDict()
+        self._size_bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._entries_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "PredictionCache":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def make_key(
+        model_path: str,
+        model_variant: str,
+        scaler_path: Optional[str],
+        data_path: str,
+    ) -> Tuple[str, str, str]:
+        """Build a key from the model, scaler and dataset fingerprints."""
+        return (
+            f"{file_fingerprint(model_path)}:{model_variant}",
+            file_fingerprint(scaler_path) if scaler_path else "",
+            file_fingerprint(data_path),
+        )
+
+    def get(self, key: Hashable) -> Optional[PredictionResult]:
+        """Get a cached result and mark it as recently used."""
+        with self._entries_lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: PredictionResult) -> None:
+        """Store a result, evicting least recently used entries over budget."""
+        if value.nbytes > self.max_bytes:
+            return
+
+        with self._entries_lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.nbytes
+            self._entries[key] = value
+            self._size_bytes += value.nbytes
+
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._entries_lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def get_cache_info(self) -> dict:
+        """Get size and hit statistics."""
+        with self._entries_lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
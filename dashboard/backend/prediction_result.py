@@ -0,0 +1,65 @@
+"""Flood probabilities for a set of points, re-thresholdable without the model"""
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+
+def flat_coordinates(coordinates: np.ndarray) -> List[float]:
+    """[lat0, lon0, lat1, lon1, ...] rounded to 6 decimals (~0.1 m), as the map's point layer takes them."""
+    return np.round(np.asarray(coordinates, dtype=np.float64), 6).ravel().tolist()
+
+
+@dataclass(frozen=True)
+class PredictionResult:
+    """Sigmoid outputs of one prediction run and the points they belong to.
+
+    Both arrays are read-only so one result can be shared by every session;
+    thresholds and top-k views are derived with vectorized operations.
+    """
+    coordinates: np.ndarray
+    probabilities: np.ndarray
+
+    def __post_init__(self):
+        coordinates = np.ascontiguousarray(self.coordinates, dtype=np.float64).reshape(-1, 2)
+        probabilities = np.ascontiguousarray(self.probabilities, dtype=np.float32).reshape(-1)
+        if len(coordinates) != len(probabilities):
+            raise ValueError("Coordinates and probabilities must have the same length")
+
+        coordinates.setflags(write=False)
+        probabilities.setflags(write=False)
+        object.__setattr__(self, "coordinates", coordinates)
+        object.__setattr__(self, "probabilities", probabilities)
+
+    def __len__(self) -> int:
+        return len(self.probabilities)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays."""
+        return self.coordinates.nbytes + self.probabilities.nbytes
+
+    def flood_mask(self, threshold: float) -> np.ndarray:
+        """Boolean mask of points predicted as flood at ``threshold``."""
+        return self.probabilities >= np.float32(threshold)
+
+    def flood_points(self, threshold: float) -> np.ndarray:
+        """(lat, lon) of points predicted as flood at ``threshold``."""
+        return self.coordinates[self.flood_mask(threshold)]
+
+    def flood_count(self, threshold: float) -> int:
+        """Number of points predicted as flood at ``threshold``."""
+        return int(np.count_nonzero(self.flood_mask(threshold)))
+
+    def top_k_indices(self, k: int) -> np.ndarray:
+        """Indices of the ``k`` riskiest points, highest probability first."""
+        k = max(0, min(int(k), len(self)))
+        if k == 0:
+            return np.empty(0, dtype=np.intp)
+        candidates = np.argpartition(self.probabilities, len(self) - k)[len(self) - k:]
+        return candidates[np.argsort(self.probabilities[candidates])[::-1]]
+
+    def top_k_points(self, k: int) -> np.ndarray:
+        """(lat, lon) of the ``k`` riskiest points, highest probability first."""
+        return self.coordinates[self.top_k_indices(k)]
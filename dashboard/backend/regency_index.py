@@ -0,0 +1,263 @@
+"""Point-in-regency assignment and per-regency flood aggregates"""
+
+import weakref
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Optional, List, Dict, Tuple
+
+import numpy as np
+
+from .boundaries import BoundaryLevel, RegencyBoundaries
+from .prediction_result import PredictionResult
+from .inference import DataLoader
+
+
+UNASSIGNED = -1
+
+
+class RegencyIndex:
+    """Ray-casting point-in-polygon over regency edges bucketed into horizontal slabs.
+
+    Every boundary edge is registered in each slab its y-range overlaps, so
+    a point only tests the edges of its own slab: the ones a horizontal ray
+    from it can cross. A bulk query expands the (point, edge) candidate pairs
+    with array ops, counts crossings to the right of each point per regency,
+    and an odd count places the point in that regency. Holes and
+    multi-part regencies fall out of the parity rule. Because neighbors
+    share their simplified border arcs, a point lands in at most one regency.
+    """
+
+    def __init__(self, level: BoundaryLevel, edges_per_slab: int = 8):
+        lonlat = level.lonlat()
+        ring_offsets = np.asarray(level.ring_offsets)
+        polygon_offsets = np.asarray(level.polygon_offsets)
+        regency_offsets = np.asarray(level.regency_offsets)
+
+        # Rings are stored closed, so consecutive vertices inside a ring are its edges.
+        starts = np.arange(len(lonlat) - 1)
+        starts = starts[np.isin(starts, ring_offsets[1:] - 1, invert=True)]
+        ring_of_vertex = np.repeat(np.arange(len(ring_offsets) - 1), np.diff(ring_offsets))
+        polygon_of_ring = np.repeat(np.arange(len(polygon_offsets) - 1), np.diff(polygon_offsets))
+        regency_of_polygon = np.repeat(np.arange(len(regency_offsets) - 1), np.diff(regency_offsets))
+
+        start_points, end_points = lonlat[starts], lonlat[starts + 1]
+        crossing = start_points[:, 1] != end_points[:, 1]  # horizontal edges never cross a ray
+        self.x0, self.y0 = start_points[crossing, 0], start_points[crossing, 1]
+        self.x1, self.y1 = end_points[crossing, 0], end_points[crossing, 1]
+        self.edge_regency = regency_of_polygon[polygon_of_ring[ring_of_vertex[starts[crossing]]]]
+        self.regency_count: int = len(regency_offsets) - 1
+
+        self.slab_count: int = max(1, len(self.x0) // edges_per_slab)
+        self.y_min: float = float(min(self.y0.min(), self.y1.min())) if len(self.x0) else 0.0
+        y_max = float(max(self.y0.max(), self.y1.max())) if len(self.x0) else 1.0
+        self.slab_height: float = max(y_max - self.y_min, 1e-12) / self.slab_count
+
+        low = self._slab(np.minimum(self.y0, self.y1))
+        high = self._slab(np.maximum(self.y0, self.y1))
+        spans = high - low + 1
+        edge_ids = np.repeat(np.arange(len(self.x0)), spans)
+        slab_ids = np.repeat(low, spans) + _ranges(spans)
+        order = np.argsort(slab_ids, kind="stable")
+        self.slab_edges: np.ndarray = edge_ids[order]
+        self.slab_offsets: np.ndarray = np.concatenate(
+            [[0], np.cumsum(np.bincount(slab_ids, minlength=self.slab_count))]
+        )
+
+    def _slab(self, y: np.ndarray) -> np.ndarray:
+        return np.clip(((y - self.y_min) / self.slab_height).astype(np.int64), 0, self.slab_count - 1)
+
+    def assign(self, coordinates: np.ndarray, chunk_rows: int = 100_000) -> np.ndarray:
+        """Regency position (into the level's regencies) of every (lat, lon) point; -1 if none."""
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        labels = np.full(len(coordinates), UNASSIGNED, dtype=np.int16)
+        for start in range(0, len(coordinates), chunk_rows):
+            chunk = coordinates[start:start + chunk_rows]
+            labels[start:start + len(chunk)] = self._assign_chunk(chunk[:, 1], chunk[:, 0])
+        return labels
+
+    def _assign_chunk(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        labels = np.full(len(x), UNASSIGNED, dtype=np.int16)
+        slab = self._slab(y)
+        first = self.slab_offsets[slab]
+        counts = self.slab_offsets[slab + 1] - first
+
+        point = np.repeat(np.arange(len(x)), counts)
+        edge = self.slab_edges[np.repeat(first, counts) + _ranges(counts)]
+        px, py = x[point], y[point]
+        x0, y0, x1, y1 = self.x0[edge], self.y0[edge], self.x1[edge], self.y1[edge]
+
+        # Half-open in y so a ray through a shared vertex counts exactly one edge.
+        straddles = (y0 > py) != (y1 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        crosses = straddles & (px < x_cross)
+
+        keys = point[crosses] * self.regency_count + self.edge_regency[edge[crosses]]
+        keys, crossings = np.unique(keys, return_counts=True)
+        inside = keys[crossings % 2 == 1]
+        labels[inside // self.regency_count] = inside % self.regency_count
+        return labels
+
+
+def _ranges(lengths: np.ndarray) -> np.ndarray:
+    """Concatenated ``arange(n)`` for every n in ``lengths``."""
+    total = int(lengths.sum())
+    return np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+
+@dataclass(frozen=True)
+class RegencySummary:
+    """Flood aggregates of one regency for one prediction and threshold."""
+    regency_id: int
+    name: str
+    points: int
+    flood_count: int
+    flood_ratio: float
+
+
+def summarize_labels(
+    labels: np.ndarray,
+    points: np.ndarray,
+    result: PredictionResult,
+    threshold: float,
+    regencies: List[dict],
+) -> List[RegencySummary]:
+    """Per-regency flood counts of a result from its points' regency labels."""
+    flooded = result.flood_mask(threshold) & (labels != UNASSIGNED)
+    flood_counts = np.bincount(labels[flooded], minlength=len(points))
+
+    summaries = [
+        RegencySummary(
+            regency_id=regencies[position]["id"],
+            name=regencies[position]["name"],
+            points=int(points[position]),
+            flood_count=int(flood_counts[position]),
+            flood_ratio=round(float(flood_counts[position] / points[position]), 4),
+        )
+        for position in range(len(points))
+        if points[position] > 0
+    ]
+    summaries.sort(key=lambda summary: (-summary.flood_ratio, -summary.flood_count))
+    return summaries
+
+
+class RegencyAggregator:
+    """Singleton joining prediction points to regencies once, then aggregating by bincount.
+
+    The point-to-regency labels are computed for the dataset's coordinates
+    in one bulk query and kept until the dataset changes. After that a
+    summary for any prediction result and threshold is two ``bincount``
+    calls over the labels. Results on other coordinates are labeled on the
+    fly.
+    """
+
+    _instance: Optional["RegencyAggregator"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, boundaries: Optional[RegencyBoundaries] = None):
+        """Private constructor - use get_instance() instead."""
+        self._boundaries: RegencyBoundaries = boundaries or RegencyBoundaries.get_instance()
+        self._index: Optional[RegencyIndex] = None
+        self._coordinates: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._points_per_regency: Optional[np.ndarray] = None
+        self._summaries: Dict[Tuple[int, float], Tuple[weakref.ref, List[RegencySummary]]] = {}
+        self._state_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "RegencyAggregator":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def index(self) -> RegencyIndex:
+        """Index over the finest cached boundary level, built on first use."""
+        if self._index is None:
+            with self._state_lock:
+                if self._index is None:
+                    finest = max(level["zoom"] for level in self._boundaries.manifest["levels"])
+                    self._index = RegencyIndex(self._boundaries.level(finest))
+        return self._index
+
+    def labels(self) -> np.ndarray:
+        """Regency position of every dataset point, recomputed if the dataset changed."""
+        coordinates = DataLoader.get_instance().get_coordinate_array()
+        index = self.index
+        with self._state_lock:
+            if self._labels is None or self._coordinates is not coordinates:
+                labels = index.assign(coordinates)
+                labels.setflags(write=False)
+                self._labels = labels
+                self._points_per_regency = np.bincount(
+                    labels[labels != UNASSIGNED], minlength=index.regency_count
+                )
+                self._coordinates = coordinates
+                self._summaries.clear()
+            return self._labels
+
+    def _labels_for(self, result: PredictionResult) -> Tuple[np.ndarray, np.ndarray]:
+        """Labels and per-regency point counts for a result's coordinates."""
+        labels = self.labels()
+        coordinates = self._coordinates
+        if result.coordinates.shape == coordinates.shape and (
+            np.may_share_memory(result.coordinates, coordinates)
+            or np.array_equal(result.coordinates, coordinates)
+        ):
+            return labels, self._points_per_regency
+
+        labels = self.index.assign(result.coordinates)
+        return labels, np.bincount(labels[labels != UNASSIGNED], minlength=self.index.regency_count)
+
+    def summarize(self, result: PredictionResult, threshold: float) -> List[RegencySummary]:
+        """Per-regency point and flood counts, regencies with the highest ratio first."""
+        cache_key = (id(result.probabilities), round(float(threshold), 4))
+        with self._state_lock:
+            cached = self._summaries.get(cache_key)
+        # The weak reference guards against a recycled id of a collected array.
+        if cached is not None and cached[0]() is result.probabilities:
+            return cached[1]
+
+        labels, points = self._labels_for(result)
+        summaries = summarize_labels(labels, points, result, threshold, self._boundaries.regencies)
+
+        with self._state_lock:
+            if len(self._summaries) >= 64:
+                self._summaries.pop(next(iter(self._summaries)))
+            self._summaries[cache_key] = (weakref.ref(result.probabilities), summaries)
+        return summaries
+
+    def summarize_dicts(self, result: PredictionResult, threshold: float) -> List[dict]:
+        """``summarize`` as plain dicts, for Reflex state and JSON responses."""
+        return [asdict(summary) for summary in self.summarize(result, threshold)]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    aggregator = RegencyAggregator.get_instance()
+
+    start = time.perf_counter()
+    index = aggregator.index
+    print(f"Index: {len(index.x0):,} edges in {index.slab_count:,} slabs, "
+          f"built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    coordinates = np.column_stack([rng.uniform(-6.5, -2.0, rows), rng.uniform(119.0, 121.5, rows)])
+    start = time.perf_counter()
+    labels = index.assign(coordinates)
+    print(f"Assigned {rows:,} points in {time.perf_counter() - start:.2f}s "
+          f"({np.count_nonzero(labels != UNASSIGNED):,} inside a regency)")
+
+    result = PredictionResult(coordinates, rng.random(rows, dtype=np.float32))
+    start = time.perf_counter()
+    points = np.bincount(labels[labels != UNASSIGNED], minlength=index.regency_count)
+    summaries = summarize_labels(labels, points, result, 0.9, aggregator._boundaries.regencies)
+    print(f"Summary over {rows:,} points: {(time.perf_counter() - start) * 1000:.1f} ms")
+    for summary in summaries[:5]:
+        print(f"  {summary}")
@@ -0,0 +1,84 @@
+"""What-if rainfall scenarios scored in one batched model call"""
+
+from dataclasses import dataclass
+from typing import Optional, List, Sequence
+
+import numpy as np
+
+from config import SCENARIO_MAX_BATCH_ROWS
+from .flood_prediction import FEATURE_COLUMNS
+from .incremental_prediction import DYNAMIC_COLUMNS
+from .model_registry import ModelRegistry
+from .prediction_result import PredictionResult
+from .inference import DataLoader
+from .timing import timed
+
+
+_DYNAMIC_INDEX = [FEATURE_COLUMNS.index(column) for column in DYNAMIC_COLUMNS]
+
+
+@dataclass(frozen=True)
+class RainfallScenario:
+    """Province-wide rainfall (mm) applied to every prediction point."""
+    label: str
+    precip_1d: float
+    precip_3d: float
+
+    @classmethod
+    def from_total_3d(cls, total_mm: float, label: Optional[str] = None) -> "RainfallScenario":
+        """Scenario of ``total_mm`` over three days, spread evenly."""
+        return cls(label or f"{total_mm:g} mm / 3 hari", total_mm / 3, total_mm)
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """Probabilities of one scenario over the dataset's points."""
+    scenario: RainfallScenario
+    result: PredictionResult
+
+
+@timed("scenario.predict")
+def predict_scenarios(
+    scenarios: Sequence[RainfallScenario],
+    model_id: Optional[str] = None,
+    max_batch_rows: int = SCENARIO_MAX_BATCH_ROWS,
+) -> List[ScenarioResult]:
+    """Score K scenarios as one (K * N, F) batch built by broadcasting the static features.
+
+    Only the two precipitation columns differ between scenarios; they are
+    scaled once per scenario and written into the broadcast batch. If K * N
+    exceeds ``max_batch_rows`` the scenarios are split into as few batches
+    as fit.
+    """
+    if not scenarios:
+        return []
+
+    model, spec = ModelRegistry.get_instance().get_with_spec(model_id)
+    data_loader = DataLoader.get_instance()
+    if spec.scaled_input:
+        base = data_loader.get_feature_matrix()
+    else:
+        base = data_loader.get_data()[FEATURE_COLUMNS].to_numpy(np.float32)
+    coordinates = data_loader.get_coordinate_array()
+    n_rows, n_features = base.shape
+
+    dynamic = np.array([[s.precip_1d, s.precip_3d] for s in scenarios], dtype=np.float64)
+    if spec.scaled_input:
+        dynamic = data_loader.scale_columns(dynamic, DYNAMIC_COLUMNS)
+    dynamic = dynamic.astype(np.float32)
+
+    per_batch = max(1, max_batch_rows // max(n_rows, 1))
+    probabilities = np.empty((len(scenarios), n_rows), dtype=np.float32)
+    for start in range(0, len(scenarios), per_batch):
+        stop = min(start + per_batch, len(scenarios))
+        batch = np.empty((stop - start, n_rows, n_features), dtype=np.float32)
+        batch[:] = base
+        batch[:, :, _DYNAMIC_INDEX] = dynamic[start:stop, np.newaxis, :]
+        probabilities[start:stop] = model.predict_proba(
+            batch.reshape(-1, n_features)
+        ).reshape(stop - start, n_rows)
+
+    return [
+        ScenarioResult(scenario, PredictionResult(coordinates, probabilities[index]))
+        for index, scenario in enumerate(scenarios)
+    ]
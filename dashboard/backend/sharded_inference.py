@@ -0,0 +1,207 @@
+"""Multi-process sharded inference over a shared-memory feature matrix"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import DEFAULT_MODEL_ID, SHARDED_INFERENCE_WORKERS
+from .model_registry import ModelRegistry
+
+
+def _init_shard_worker(model_id: str, intra_op_threads: int) -> None:
+    """Process-pool initializer: pin TF threads to this worker's share and load the model."""
+    registry = ModelRegistry.get_instance()
+    if registry.get_spec(model_id).backend == "keras":
+        import tensorflow as tf
+
+        # Without this every worker spins up one thread per core and they fight.
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    registry.get(model_id)
+
+
+def _release_block(block: Optional[shared_memory.SharedMemory]) -> None:
+    if block is not None:
+        block.close()
+        block.unlink()
+
+
+def _score_shard(
+    model_id: str,
+    input_name: str,
+    output_name: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+) -> int:
+    """Score rows ``start:stop`` of the shared input into the shared output.
+
+    Only names and bounds cross the process boundary; both arrays are views
+    on the shared-memory blocks.
+    """
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        features = np.ndarray(shape, dtype=np.float32, buffer=input_block.buf)
+        probabilities = np.ndarray((shape[0],), dtype=np.float32, buffer=output_block.buf)
+        model = ModelRegistry.get_instance().get(model_id)
+        probabilities[start:stop] = model.predict_proba(features[start:stop])
+        del features, probabilities
+    finally:
+        input_block.close()
+        output_block.close()
+    return stop - start
+
+
+class ShardedInferencePool:
+    """Singleton pool of spawned workers that each hold their own model copy.
+
+    ``predict_proba`` copies the feature matrix into shared memory, hands
+    each worker a contiguous slice by name and bounds, and collects the
+    probabilities from a shared output buffer, so no rows are pickled. A
+    read-only matrix (such as ``DataLoader.get_feature_matrix``) is copied
+    once and its block reused until another matrix is scored. The workers
+    stay up between calls, so the model loads once per worker.
+    """
+
+    _instance: Optional["ShardedInferencePool"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, workers: int = SHARDED_INFERENCE_WORKERS, model_id: str = DEFAULT_MODEL_ID):
+        """Configure ``workers`` processes for ``model_id``; they start on the first call.
+
+        The app shares get_instance(); the benchmark below and the tests build
+        their own pools with an explicit worker count.
+        """
+        if workers <= 0:
+            raise ValueError("Workers must be a positive integer")
+
+        self.workers: int = workers
+        self.model_id: str = model_id
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._run_lock: Lock = Lock()
+        # The read-only matrix whose copy the kept input/output blocks hold
+        self._input_source: Optional[np.ndarray] = None
+        self._input_block: Optional[shared_memory.SharedMemory] = None
+        self._output_block: Optional[shared_memory.SharedMemory] = None
+
+    @classmethod
+    def get_instance(cls) -> "ShardedInferencePool":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _get_executor(self, model_id: str) -> ProcessPoolExecutor:
+        """Start the workers on first use, or restart them for another model."""
+        if self._executor is None or model_id != self.model_id:
+            self.shutdown()
+            self.model_id = model_id
+            intra_op_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=(model_id, intra_op_threads),
+            )
+        return self._executor
+
+    def _shared_blocks(
+        self, source: np.ndarray, features: np.ndarray
+    ) -> Tuple[shared_memory.SharedMemory, shared_memory.SharedMemory]:
+        """Input and output blocks for ``features``, copied in unless ``source`` is already held.
+
+        Only a read-only ``source`` is kept: a writable one may change in
+        place between calls. Call with ``_run_lock`` held.
+        """
+        if source is self._input_source:
+            return self._input_block, self._output_block
+
+        input_block = shared_memory.SharedMemory(create=True, size=max(features.nbytes, 1))
+        output_block = shared_memory.SharedMemory(create=True, size=max(len(features) * 4, 1))
+        np.ndarray(features.shape, dtype=np.float32, buffer=input_block.buf)[:] = features
+        if not source.flags.writeable:
+            self._release_input()
+            self._input_source, self._input_block, self._output_block = source, input_block, output_block
+        return input_block, output_block
+
+    def _release_input(self) -> None:
+        """Free the kept input and output blocks."""
+        _release_block(self._input_block)
+        _release_block(self._output_block)
+        self._input_source, self._input_block, self._output_block = None, None, None
+
+    def predict_proba(self, features: np.ndarray, model_id: Optional[str] = None) -> np.ndarray:
+        """Score every row of ``features`` across the workers."""
+        model_id = model_id or self.model_id
+        source = features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 3:
+            features = features.reshape(len(features), -1)
+        shape = features.shape
+
+        with self._run_lock:
+            # Restarting the workers for another model also frees the kept input.
+            executor = self._get_executor(model_id)
+            input_block, output_block = self._shared_blocks(source, features)
+            try:
+                bounds = np.linspace(0, shape[0], self.workers + 1).astype(int)
+                futures = [
+                    executor.submit(
+                        _score_shard, model_id, input_block.name, output_block.name,
+                        shape, int(start), int(stop),
+                    )
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                    if stop > start
+                ]
+                scored = sum(future.result() for future in futures)
+
+                if scored != shape[0]:
+                    raise RuntimeError(f"Sharded inference scored {scored} of {shape[0]} rows")
+                return np.ndarray((shape[0],), dtype=np.float32, buffer=output_block.buf).copy()
+            finally:
+                if input_block is not self._input_block:
+                    _release_block(input_block)
+                    _release_block(output_block)
+
+    def shutdown(self) -> None:
+        """Stop the workers and free the kept input; both are recreated on the next call."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._release_input()
+
+
+if __name__ == "__main__":
+    import sys
+    from .inference import DataLoader
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base = DataLoader.get_instance().get_feature_matrix()
+    features = np.ascontiguousarray(np.resize(base, (rows, base.shape[1])))
+
+    model = ModelRegistry.get_instance().get()
+    start = time.perf_counter()
+    expected = model.predict_proba(features)
+    single_seconds = time.perf_counter() - start
+    print(f"1 process: {rows / single_seconds:,.0f} rows/s")
+
+    worker_counts = sorted({1, 2, 4, 8, 16, 32} & set(range(1, (os.cpu_count() or 1) + 1))) or [1]
+    for workers in worker_counts + ([2] if worker_counts == [1] else []):
+        pool = ShardedInferencePool(workers=workers)
+        pool.predict_proba(features[: workers * 1024])  # start workers and load models
+        start = time.perf_counter()
+        probabilities = pool.predict_proba(features)
+        seconds = time.perf_counter() - start
+        pool.shutdown()
+        print(
+            f"{workers} workers: {rows / seconds:,.0f} rows/s "
+            f"({single_seconds / seconds:.2f}x), max diff {np.abs(probabilities - expected).max():.2e}"
+        )
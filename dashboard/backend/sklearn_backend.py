@@ -0,0 +1,129 @@
+"""scikit-learn backend for the random forest flood model"""
+
+import pickle
+import time
+from pathlib import Path
+from typing import Optional, List
+
+import numpy as np
+import pandas as pd
+
+from .flood_prediction import FloodPredictionModel, FEATURE_COLUMNS
+
+
+# Columns the robust scaler was fitted on; landcover is categorical and stays raw.
+ROBUST_SCALED_COLUMNS = [
+    "lon",
+    "lat",
+    "precip_1d",
+    "precip_3d",
+    "NDVI",
+    "NDWI",
+    "elevation",
+    "slope",
+    "aspect",
+    "upstream_area",
+    "TWI",
+]
+
+# Column order the random forest was trained on.
+RANDOM_FOREST_FEATURES = [
+    "lon",
+    "lat",
+    "precip_1d",
+    "precip_3d",
+    "NDVI",
+    "NDWI",
+    "elevation",
+    "slope",
+    "aspect",
+    "upstream_area",
+    "TWI",
+    "landcover",
+]
+
+
+class SklearnFloodModel(FloodPredictionModel):
+    """Flood model backed by a joblib classifier and its own scaler.
+
+    Unlike the Keras and TFLite backends it takes *raw* features in
+    ``FEATURE_COLUMNS`` order and applies ``robust_scaler.pkl`` itself, the
+    same way ``simple_inference.py`` does.
+    """
+
+    _instance: Optional["SklearnFloodModel"] = None
+
+    def __init__(self, scaler_path: Optional[str] = None):
+        """Private constructor - use get_instance() instead."""
+        super().__init__()
+        self.scaler_path: Optional[str] = scaler_path
+        self._scaler = None
+
+    def _load_model(self, model_path: str) -> None:
+        """Internal method to load the classifier and its scaler."""
+        print(f"Loading model from {model_path}...")
+
+        try:
+            import joblib
+
+            self._model = joblib.load(model_path)
+            if self.scaler_path is not None:
+                with open(self.scaler_path, "rb") as f:
+                    self._scaler = pickle.load(f)
+
+            self._n_features = len(FEATURE_COLUMNS)
+            self._infer = self._predict_batch
+            start = time.perf_counter()
+            dummy = np.zeros((1, self._n_features), dtype=np.float32)
+            self.post_processor(self._predict_batch(self._scale_features(dummy)))
+            self._warmup_seconds = time.perf_counter() - start
+
+            self._model_path = model_path
+            self._is_loaded = True
+
+        except Exception as e:
+            self._is_loaded = False
+            self._model = None
+            self._infer = None
+            self._model_path = None
+            raise RuntimeError(f"Failed to load model: {e}")
+
+    def preprocess(self, input_data: List[float]) -> pd.DataFrame:
+        """Preprocess input data for model prediction."""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+
+        return self._scale_features(input_data)
+
+    def _scale_features(self, input_data: List[float]) -> pd.DataFrame:
+        """Scale raw features and reorder them for the classifier."""
+        input_array = np.asarray(input_data, dtype=np.float64)
+        if input_array.ndim == 1:
+            input_array = input_array[np.newaxis, :]
+        input_array = input_array.reshape(len(input_array), -1)
+
+        features = pd.DataFrame(input_array, columns=FEATURE_COLUMNS)
+        if self._scaler is not None:
+            features[ROBUST_SCALED_COLUMNS] = self._scaler.transform(
+                features[ROBUST_SCALED_COLUMNS]
+            )
+        return features[RANDOM_FOREST_FEATURES]
+
+    def _predict_batch(self, features: pd.DataFrame) -> np.ndarray:
+        """Probability of the flood class for one batch."""
+        return self._model.predict_proba(features)[:, 1].astype(np.float32)
+
+    def get_model_info(self) -> dict:
+        """Get information about the loaded model."""
+        if not self.is_loaded:
+            return {"status": "not_loaded"}
+
+        return {
+            "status": "loaded",
+            "backend": "sklearn",
+            "path": self._model_path,
+            "scaler_path": self.scaler_path,
+            "input_shape": (None, self._n_features),
+            "output_shape": (None, 1),
+            "warmup_seconds": self._warmup_seconds,
+        }
@@ -0,0 +1,338 @@
+"""TFLite backend for the flood LSTM on CPU-only hosts"""
+
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Optional, List, Iterable
+
+import numpy as np
+
+from .flood_prediction import FloodPredictionModel, to_model_input
+from .timing import span
+
+
+QUANTIZATION_MODES = ("none", "dynamic", "int8")
+
+
+def _interpreter_class() -> type:
+    """Prefer the standalone tflite-runtime interpreter, fall back to TensorFlow."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def tflite_cache_path(model_path: str, quantization: str = "none") -> Path:
+    """Path of the cached flatbuffer that sits next to the Keras model."""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.{quantization}.tflite")
+
+
+def convert_to_tflite(
+    model_path: str,
+    quantization: str = "none",
+    representative_data: Optional[Iterable[List[float]]] = None,
+) -> Path:
+    """Convert a Keras .h5 model to a TFLite flatbuffer cached next to it.
+
+    The cache is reused as long as it is newer than the source model. ``int8``
+    quantization needs ``representative_data`` (scaled feature rows) to
+    calibrate activation ranges; the first rows of the inference dataset are
+    used when none is given.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Quantization must be one of {QUANTIZATION_MODES}")
+
+    model_path = Path(model_path)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+
+    cache_path = tflite_cache_path(model_path, quantization)
+    if cache_path.exists() and cache_path.stat().st_mtime >= model_path.stat().st_mtime:
+        return cache_path
+
+    import tensorflow as tf
+
+    print(f"Converting {model_path} to TFLite ({quantization})...")
+    model = tf.keras.models.load_model(model_path)
+
+    # Keras 3 lowers LSTM to a while loop built on TensorList ops, which the
+    # TFLite builtin op set cannot express. The time axis is a static 1, so an
+    # unrolled clone with the same weights converts to plain builtin ops.
+    def unrolled(layer):
+        config = layer.get_config()
+        if "unroll" in config:
+            config["unroll"] = True
+        return layer.__class__.from_config(config)
+
+    unrolled_model = tf.keras.models.clone_model(model, clone_function=unrolled)
+    unrolled_model.set_weights(model.get_weights())
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(unrolled_model)
+    if quantization in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "int8":
+        if representative_data is None:
+            from .inference import DataLoader
+
+            representative_data = DataLoader.get_instance().get_features_scaled()[:500]
+        samples = to_model_input(representative_data)
+
+        def representative_dataset():
+            for sample in samples:
+                yield [sample[np.newaxis, ...]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    flatbuffer = converter.convert()
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_bytes(flatbuffer)
+    os.replace(tmp_path, cache_path)
+    print(f"TFLite model cached at {cache_path} ({len(flatbuffer)} bytes)")
+    return cache_path
+
+
+class TFLiteFloodModel(FloodPredictionModel):
+    """Singleton flood model served by the TFLite interpreter.
+
+    Exposes the same ``predict()``/``post_processor()`` API as
+    ``FloodPredictionModel`` without running Keras at inference time.
+    """
+
+    _instance: Optional["TFLiteFloodModel"] = None
+
+    def __init__(self):
+        """Private constructor - use get_instance() instead."""
+        super().__init__()
+        self.quantization: str = "none"
+        self.num_threads: Optional[int] = None
+        self._interpreter = None
+        self._interpreter_lock: Lock = Lock()
+        self._input_index: Optional[int] = None
+        self._output_index: Optional[int] = None
+        self._allocated_rows: Optional[int] = None
+        self._tflite_path: Optional[Path] = None
+
+    def load_if_needed(self, model_path: str, quantization: str = "none") -> None:
+        """Load model only if not already loaded or path/quantization changed.
+
+        Another quantization is loaded beside the current interpreter, which
+        keeps serving predictions until the new one is published.
+        """
+        model_path = Path(model_path)
+
+        if not model_path.exists():
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+
+        if self._serves(model_path, quantization):
+            return
+
+        with self._load_lock:
+            if self._serves(model_path, quantization):
+                return
+
+            with span("model.load"):
+                self._load_model(model_path, quantization)
+
+    def _serves(self, model_path: Path, quantization: str) -> bool:
+        return self._is_loaded and self._model_path == model_path and self.quantization == quantization
+
+    def _load_model(self, model_path: str, quantization: Optional[str] = None) -> None:
+        """Internal method to convert (if needed) and load the flatbuffer.
+
+        The interpreter is built and warmed up in locals, then published in
+        one step under the interpreter lock, so concurrent predictions see
+        either the old interpreter or the new one. A failed load leaves the
+        old one serving.
+        """
+        quantization = quantization or self.quantization
+        try:
+            tflite_path = convert_to_tflite(model_path, quantization)
+            print(f"Loading TFLite model from {tflite_path}...")
+
+            Interpreter = _interpreter_class()
+            interpreter = Interpreter(model_path=str(tflite_path), num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+            input_details = interpreter.get_input_details()[0]
+            input_index = input_details["index"]
+            output_index = interpreter.get_output_details()[0]["index"]
+            n_features = int(input_details["shape_signature"][-1])
+            interpreter.resize_tensor_input(input_index, [1, 1, n_features])
+            interpreter.allocate_tensors()
+
+            start = time.perf_counter()
+            interpreter.set_tensor(input_index, np.zeros((1, 1, n_features), np.float32))
+            interpreter.invoke()
+            self.post_processor(interpreter.get_tensor(output_index))
+            warmup_seconds = time.perf_counter() - start
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to load model: {e}")
+
+        with self._interpreter_lock:
+            self._interpreter = interpreter
+            self._input_index = input_index
+            self._output_index = output_index
+            self._n_features = n_features
+            self._allocated_rows = 1
+            self._tflite_path = tflite_path
+            self.quantization = quantization
+            self._warmup_seconds = warmup_seconds
+            self._infer = self._invoke
+            self._model_path = model_path
+            self._is_loaded = True
+
+    def _invoke(self, input_array: np.ndarray) -> np.ndarray:
+        """Run one batch through the interpreter, resizing only on shape change."""
+        rows = input_array.shape[0]
+        with self._interpreter_lock:
+            if rows != self._allocated_rows:
+                self._interpreter.resize_tensor_input(
+                    self._input_index, [rows, 1, self._n_features]
+                )
+                self._interpreter.allocate_tensors()
+                self._allocated_rows = rows
+            self._interpreter.set_tensor(self._input_index, input_array)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index)
+
+    def preprocess(self, input_data: List[float]) -> np.ndarray:
+        """Preprocess input data for model prediction."""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+
+        return np.ascontiguousarray(to_model_input(input_data))
+
+    def get_model_info(self) -> dict:
+        """Get information about the loaded model."""
+        if not self.is_loaded:
+            return {"status": "not_loaded"}
+
+        return {
+            "status": "loaded",
+            "backend": "tflite",
+            "path": self._model_path,
+            "tflite_path": str(self._tflite_path),
+            "quantization": self.quantization,
+            "input_shape": (None, 1, self._n_features),
+            "output_shape": (None, 1),
+            "warmup_seconds": self._warmup_seconds,
+        }
+
+
+def check_parity(
+    reference: FloodPredictionModel,
+    candidate: FloodPredictionModel,
+    input_data: List[float],
+) -> dict:
+    """Compare probabilities and classes of two loaded backends on the same input."""
+    expected = reference.predict_proba(input_data)
+    actual = candidate.predict_proba(input_data)
+    expected_class = np.asarray(reference.post_processor(expected))
+    actual_class = np.asarray(candidate.post_processor(actual))
+
+    return {
+        "rows": len(expected),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))),
+        "mean_abs_diff": float(np.mean(np.abs(expected - actual))),
+        "class_agreement": float(np.mean(expected_class == actual_class)),
+    }
+
+
+def _measure_backend(
+    backend: str, model_path: str, quantization: str, data_path: str, repeats: int
+) -> dict:
+    """Import, load and time one backend in a fresh process (see compare_backends)."""
+    import psutil
+    import pandas as pd
+
+    process = psutil.Process()
+    rss_start = process.memory_info().rss
+
+    start = time.perf_counter()
+    if backend == "keras":
+        model = FloodPredictionModel.get_instance()
+        model.load_if_needed(model_path)
+    else:
+        model = TFLiteFloodModel.get_instance()
+        model.load_if_needed(model_path, quantization=quantization)
+    load_seconds = time.perf_counter() - start
+
+    features = pd.read_csv(data_path).drop(columns=["target"]).to_numpy(np.float32)
+    single_row = features[:1]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(single_row)
+    single_ms = (time.perf_counter() - start) / repeats * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(features)
+    full_ms = (time.perf_counter() - start) / repeats * 1000
+
+    return {
+        "backend": backend if backend == "keras" else f"tflite-{quantization}",
+        "load_seconds": round(load_seconds, 3),
+        "load_rss_mb": round((process.memory_info().rss - rss_start) / 2**20, 1),
+        "total_rss_mb": round(process.memory_info().rss / 2**20, 1),
+        "single_row_ms": round(single_ms, 3),
+        f"{len(features)}_rows_ms": round(full_ms, 3),
+    }
+
+
+def compare_backends(
+    model_path: str,
+    data_path: str,
+    quantizations: Iterable[str] = QUANTIZATION_MODES,
+    repeats: int = 20,
+) -> List[dict]:
+    """Latency and RSS of Keras vs. TFLite backends, each in its own process.
+
+    Every measurement runs in a spawned interpreter so import cost and resident
+    memory are not shared between backends. TFLite flatbuffers are converted
+    up front so conversion time does not count as load time.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    for quantization in quantizations:
+        convert_to_tflite(model_path, quantization)
+
+    runs = [("keras", "none")] + [("tflite", q) for q in quantizations]
+    results = []
+    for backend, quantization in runs:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results.append(
+                executor.submit(
+                    _measure_backend, backend, model_path, quantization, data_path, repeats
+                ).result()
+            )
+    return results
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from .inference import DataLoader
+
+    model_path = os.path.join("dashboard", "models", "lstm_smote_cv.h5")
+    data_path = os.path.join("dashboard", "data", "flood_inference_data.csv")
+
+    keras_model = FloodPredictionModel.get_instance()
+    keras_model.load_if_needed(model_path)
+    features = DataLoader.get_instance().get_features_scaled()
+
+    for quantization in QUANTIZATION_MODES:
+        tflite_model = TFLiteFloodModel()
+        tflite_model.load_if_needed(model_path, quantization=quantization)
+        print(f"Parity ({quantization}):", check_parity(keras_model, tflite_model, features))
+
+    print(pd.DataFrame(compare_backends(model_path, data_path)).to_string(index=False))
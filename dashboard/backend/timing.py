@@ -0,0 +1,176 @@
+"""Span timing for the flood prediction path, aggregated into latency histograms"""
+
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from threading import Lock
+from typing import Optional, Dict, List, Callable, Iterator
+
+import numpy as np
+
+from config import TRACE_FILE, TRACE_MAX_EVENTS
+
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended.
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+RECENT_SAMPLES = 1024
+
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class SpanHistogram:
+    """Latency histogram of one span name plus a window of recent samples for percentiles."""
+
+    def __init__(self):
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.min_ms: float = float("inf")
+        self.max_ms: float = 0.0
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.recent: deque = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = min(self.min_ms, duration_ms)
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.recent.append(duration_ms)
+
+    def summary(self) -> dict:
+        p50, p95, p99 = np.percentile(list(self.recent), [50, 95, 99]) if self.recent else (0, 0, 0)
+        labels = [f"le_{bound}" for bound in BUCKET_BOUNDS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class SpanRecorder:
+    """Singleton collecting span durations per name and a bounded trace of events.
+
+    Spans are cheap (two ``perf_counter`` calls and a dict update), so they
+    can wrap per-batch work. Events are kept in Chrome trace format and can
+    be dumped to a file that opens in ``chrome://tracing`` or Perfetto. Spans
+    recorded inside process-pool workers stay in those workers.
+    """
+
+    _instance: Optional["SpanRecorder"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS):
+        """Private constructor - use get_instance() instead."""
+        self._histograms: Dict[str, SpanHistogram] = {}
+        self._events: deque = deque(maxlen=max_events)
+        self._origin: float = time.perf_counter()
+        self._records_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "SpanRecorder":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def record(self, name: str, start: float, end: float, parent: Optional[str] = None) -> None:
+        """Record one finished span from ``perf_counter`` timestamps."""
+        duration_ms = (end - start) * 1000
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round(duration_ms * 1000, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if parent:
+            event["args"] = {"parent": parent}
+
+        with self._records_lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = SpanHistogram()
+            histogram.add(duration_ms)
+            self._events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block under ``name``, nested under the current span."""
+        parent = _current_span.get()
+        token = _current_span.set(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            _current_span.reset(token)
+            self.record(name, start, end, parent)
+
+    def get_histograms(self) -> Dict[str, dict]:
+        """Latency summary and histogram buckets per span name."""
+        with self._records_lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def get_trace(self) -> dict:
+        """Recent events in Chrome trace format."""
+        with self._records_lock:
+            return {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+
+    def dump_trace(self, path: str = TRACE_FILE) -> Optional[str]:
+        """Write the recent events to ``path``; does nothing if no path is set."""
+        if not path:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_trace(), f)
+        return path
+
+    def reset(self) -> None:
+        """Drop every histogram and event."""
+        with self._records_lock:
+            self._histograms.clear()
+            self._events.clear()
+
+
+def span(name: str):
+    """Context manager timing a block on the shared recorder."""
+    return SpanRecorder.get_instance().span(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function on the shared recorder."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.asynccontextmanager
+async def trace_lifespan_task():
+    """Reflex lifespan task: dump the trace to TRACE_FILE when the server stops."""
+    try:
+        yield
+    finally:
+        path = SpanRecorder.get_instance().dump_trace()
+        if path:
+            print(f"Span trace written to {path}")
@@ -0,0 +1,514 @@
+"""Mapbox Vector Tiles of flood points and regency boundaries, generated on demand"""
+
+import hashlib
+import struct
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, List, Dict, Tuple, Hashable
+
+import numpy as np
+
+from config import TILE_CACHE_MAX_MB, TILE_MAX_RUNS, TILE_EXTENT, TILE_BUFFER
+from .boundaries import BoundaryLevel, RegencyBoundaries
+from .prediction_result import PredictionResult
+
+
+MVT_VERSION = 2
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+# Points are bucketed into tiles of this zoom; deeper tiles filter one bucket.
+INDEX_ZOOM = 16
+GEOMETRY_POINT = 1
+GEOMETRY_POLYGON = 3
+
+
+def project(coordinates: np.ndarray) -> np.ndarray:
+    """(lat, lon) to Web Mercator (x, y) in [0, 1), y growing southwards."""
+    coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    lat = np.radians(np.clip(coordinates[:, 0], -85.05112878, 85.05112878))
+    x = (coordinates[:, 1] + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return np.column_stack([x, y])
+
+
+def unproject(projected: np.ndarray) -> np.ndarray:
+    """Web Mercator (x, y) in [0, 1) back to (lat, lon)."""
+    projected = np.asarray(projected, dtype=np.float64).reshape(-1, 2)
+    lon = projected[:, 0] * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * projected[:, 1]))))
+    return np.column_stack([lat, lon])
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Interleave zeros between the low 32 bits (for Morton keys)."""
+    values = values.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def morton_key(tile_x: np.ndarray, tile_y: np.ndarray) -> np.ndarray:
+    """Z-order key of tile coordinates; a tile's descendants form one key range."""
+    return _spread_bits(tile_x) | (_spread_bits(tile_y) << np.uint64(1))
+
+
+# --- Protocol buffer wire format (just what vector_tile.proto needs) ---
+
+def _varint_lengths(values: np.ndarray) -> np.ndarray:
+    lengths = np.ones(len(values), dtype=np.int64)
+    for bits in range(7, 64, 7):
+        lengths += values >= np.uint64(1 << bits)
+    return lengths
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """Concatenated base-128 varints of non-negative integers, vectorized."""
+    values = np.asarray(values, dtype=np.uint64).reshape(-1)
+    if not len(values):
+        return b""
+    lengths = _varint_lengths(values)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.empty(int(ends[-1]), dtype=np.uint8)
+    for position in range(int(lengths.max())):
+        active = lengths > position
+        chunk = (values[active] >> np.uint64(7 * position)) & np.uint64(0x7F)
+        more = (lengths[active] > position + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[active] + position] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def _varint(value: int) -> bytes:
+    return encode_varints(np.array([value]))
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Length-delimited field."""
+    return _varint((number << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _field_varint(number: int, value: int) -> bytes:
+    return _varint(number << 3) + _varint(value)
+
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def _value(value) -> bytes:
+    """A vector_tile Value message."""
+    if isinstance(value, str):
+        return _field(1, value.encode("utf-8"))
+    if isinstance(value, (bool, np.bool_)):
+        return _field_varint(7, int(value))
+    if isinstance(value, (int, np.integer)):
+        return _field_varint(6, int(zigzag(np.array([value]))[0]))
+    return _varint((3 << 3) | 1) + struct.pack("<d", float(value))
+
+
+def encode_layer(name: str, features: List[bytes], keys: List[str], values: list) -> bytes:
+    """A vector_tile Layer from already encoded Feature messages."""
+    return b"".join([
+        _field_varint(15, MVT_VERSION),
+        _field(1, name.encode("utf-8")),
+        *[_field(2, feature) for feature in features],
+        *[_field(3, key.encode("utf-8")) for key in keys],
+        *[_field(4, _value(value)) for value in values],
+        _field_varint(5, TILE_EXTENT),
+    ])
+
+
+def encode_point_layer(name: str, points: np.ndarray, value_index: np.ndarray, values: list, key: str) -> bytes:
+    """A Layer with one Point feature per row of ``points`` (tile units).
+
+    Every feature has a single tag ``key = values[value_index]``. All
+    features share one layout, so the whole layer is assembled as one
+    varint stream instead of message by message.
+    """
+    if not len(points):
+        return encode_layer(name, [], [key], values)
+
+    zx, zy = zigzag(points[:, 0]), zigzag(points[:, 1])
+    value_index = value_index.astype(np.uint64)
+    tags_length = 1 + _varint_lengths(value_index)
+    geometry_length = 1 + _varint_lengths(zx) + _varint_lengths(zy)
+    feature_length = (
+        1 + _varint_lengths(tags_length.astype(np.uint64)) + tags_length
+        + 2
+        + 1 + _varint_lengths(geometry_length.astype(np.uint64)) + geometry_length
+    )
+
+    count = len(points)
+    tokens = np.column_stack([
+        np.full(count, (2 << 3) | 2), feature_length,      # Layer.features
+        np.full(count, (2 << 3) | 2), tags_length,         # Feature.tags (packed)
+        np.zeros(count), value_index,
+        np.full(count, 3 << 3), np.full(count, GEOMETRY_POINT),  # Feature.type
+        np.full(count, (4 << 3) | 2), geometry_length,     # Feature.geometry (packed)
+        np.full(count, _command(1, 1)), zx, zy,
+    ]).astype(np.uint64)
+    features = encode_varints(tokens)
+
+    return b"".join([
+        _field_varint(15, MVT_VERSION),
+        _field(1, name.encode("utf-8")),
+        features,
+        _field(3, key.encode("utf-8")),
+        *[_field(4, _value(value)) for value in values],
+        _field_varint(5, TILE_EXTENT),
+    ])
+
+
+def _polygon_geometry(rings: List[np.ndarray]) -> Optional[np.ndarray]:
+    """Command stream of one polygon's rings (integer tile units, not closed)."""
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for ring_index, ring in enumerate(rings):
+        if len(ring):
+            ring = ring[np.r_[True, np.any(ring[1:] != ring[:-1], axis=1)]]
+        if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+            ring = ring[:-1]
+        if len(ring) < 3:
+            if ring_index == 0:
+                return None
+            continue
+
+        # Exterior rings have positive area in tile space (y down), holes negative.
+        area = np.sum(ring[:, 0] * np.roll(ring[:, 1], -1) - np.roll(ring[:, 0], -1) * ring[:, 1])
+        if area == 0:
+            if ring_index == 0:
+                return None
+            continue
+        if (area > 0) != (ring_index == 0):
+            ring = ring[::-1]
+
+        deltas = np.diff(np.vstack([cursor, ring]), axis=0)
+        cursor = ring[-1]
+        commands.append(np.array([_command(1, 1)], dtype=np.uint64))
+        commands.append(zigzag(deltas[0]))
+        commands.append(np.array([_command(2, len(ring) - 1)], dtype=np.uint64))
+        commands.append(zigzag(deltas[1:]).reshape(-1))
+        commands.append(np.array([_command(7, 1)], dtype=np.uint64))
+    return np.concatenate(commands) if commands else None
+
+
+def _clip_ring(ring: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Sutherland-Hodgman clip of a closed ring (not repeated) to a square."""
+    for axis, bound, keep_above in ((0, low, True), (0, high, False), (1, low, True), (1, high, False)):
+        if len(ring) == 0:
+            break
+        following = np.roll(ring, -1, axis=0)
+        inside = ring[:, axis] >= bound if keep_above else ring[:, axis] <= bound
+        crosses = inside != np.roll(inside, -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (bound - ring[:, axis]) / (following[:, axis] - ring[:, axis])
+            intersection = ring + t[:, np.newaxis] * (following - ring)
+        # Per edge: its start vertex if inside, then the crossing point if it crosses.
+        candidates = np.stack([ring, intersection], axis=1).reshape(-1, 2)
+        ring = candidates[np.stack([inside, crosses], axis=1).reshape(-1)]
+    return ring
+
+
+class PointTileIndex:
+    """Points sorted by the Z-order key of their zoom-16 tile.
+
+    All points of any tile at zoom <= 16 are one contiguous slice, found
+    with two binary searches; deeper tiles filter that slice.
+    """
+
+    def __init__(self, coordinates: np.ndarray, probabilities: np.ndarray):
+        projected = project(coordinates)
+        scale = float(1 << INDEX_ZOOM)
+        tiles = np.clip((projected * scale).astype(np.int64), 0, (1 << INDEX_ZOOM) - 1)
+        keys = morton_key(tiles[:, 0], tiles[:, 1])
+        order = np.argsort(keys, kind="stable")
+
+        self.keys: np.ndarray = keys[order]
+        self.projected: np.ndarray = projected[order]
+        self.probabilities: np.ndarray = np.asarray(probabilities, dtype=np.float32)[order]
+        self.order: np.ndarray = order
+
+    def tile_slice(self, z: int, x: int, y: int) -> slice:
+        """Sorted positions of the points in tile z/x/y (coarsened to zoom 16)."""
+        if z > INDEX_ZOOM:
+            x, y, z = x >> (z - INDEX_ZOOM), y >> (z - INDEX_ZOOM), INDEX_ZOOM
+        shift = np.uint64(2 * (INDEX_ZOOM - z))
+        first = morton_key(np.array([x]), np.array([y]))[0] << shift
+        last = first + (np.uint64(1) << shift)
+        return slice(
+            int(np.searchsorted(self.keys, first, side="left")),
+            int(np.searchsorted(self.keys, last, side="left")),
+        )
+
+    def query(self, z: int, x: int, y: int, buffer: float = 0.0) -> np.ndarray:
+        """Sorted positions of the points inside tile z/x/y grown by ``buffer`` tile fractions."""
+        tiles = 1 << z
+        positions = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = x + dx, y + dy
+                if (dx or dy) and not buffer:
+                    continue
+                if 0 <= nx < tiles and 0 <= ny < tiles:
+                    found = self.tile_slice(z, nx, ny)
+                    positions.append(np.arange(found.start, found.stop))
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+
+        local = self.projected[positions] * tiles - np.array([x, y])
+        inside = np.all((local >= -buffer) & (local < 1 + buffer), axis=1)
+        return positions[inside]
+
+
+def encode_point_tile(
+    index: PointTileIndex, z: int, x: int, y: int, threshold: float = 0.0, layer: str = "flood"
+) -> bytes:
+    """Tile with the points at or above ``threshold`` and their probability (2 decimals)."""
+    positions = index.query(z, x, y, TILE_BUFFER / TILE_EXTENT)
+    positions = positions[index.probabilities[positions] >= np.float32(threshold)]
+    tiles = 1 << z
+    local = np.round((index.projected[positions] * tiles - np.array([x, y])) * TILE_EXTENT)
+
+    buckets = np.round(index.probabilities[positions] * 100).astype(np.int64)
+    used, value_index = np.unique(buckets, return_inverse=True)
+    return _field(3, encode_point_layer(
+        layer, local.astype(np.int64), value_index, [float(bucket) / 100 for bucket in used], "probability"
+    ))
+
+
+class BoundaryTiles:
+    """Regency polygons of the matching simplification level, clipped per tile."""
+
+    def __init__(self, boundaries: Optional[RegencyBoundaries] = None):
+        self._boundaries: RegencyBoundaries = boundaries or RegencyBoundaries.get_instance()
+        self._projected: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock: Lock = Lock()
+
+    def _level(self, z: int) -> Tuple[BoundaryLevel, np.ndarray, np.ndarray]:
+        """A level, its vertices in Web Mercator, and per-ring bounding boxes."""
+        level = self._boundaries.level(z)
+        with self._lock:
+            if level.zoom not in self._projected:
+                projected = project(level.lonlat()[:, ::-1])
+                offsets = np.asarray(level.ring_offsets)
+                starts = offsets[:-1]
+                boxes = np.column_stack([
+                    np.minimum.reduceat(projected, starts, axis=0),
+                    np.maximum.reduceat(projected, starts, axis=0),
+                ]) if len(starts) else np.empty((0, 4))
+                self._projected[level.zoom] = (projected, boxes)
+            projected, boxes = self._projected[level.zoom]
+        return level, projected, boxes
+
+    def encode(self, z: int, x: int, y: int) -> bytes:
+        level, projected, boxes = self._level(z)
+        tiles = 1 << z
+        margin = TILE_BUFFER / TILE_EXTENT
+        low, high = np.array([x - margin, y - margin]) / tiles, np.array([x + 1 + margin, y + 1 + margin]) / tiles
+        ring_hits = np.all(boxes[:, :2] <= high, axis=1) & np.all(boxes[:, 2:] >= low, axis=1)
+
+        regencies = self._boundaries.regencies
+        features = []
+        values = []
+        for regency_position in range(len(regencies)):
+            polygon_start = level.regency_offsets[regency_position]
+            polygon_stop = level.regency_offsets[regency_position + 1]
+            geometry = []
+            for polygon in range(polygon_start, polygon_stop):
+                first_ring, stop_ring = level.polygon_offsets[polygon], level.polygon_offsets[polygon + 1]
+                if not ring_hits[first_ring]:
+                    continue
+                rings = []
+                for ring in range(first_ring, stop_ring):
+                    if not ring_hits[ring]:
+                        continue
+                    points = projected[level.ring_offsets[ring]:level.ring_offsets[ring + 1] - 1]
+                    local = (points * tiles - np.array([x, y])) * TILE_EXTENT
+                    clipped = _clip_ring(local, -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER)
+                    rings.append(np.round(clipped).astype(np.int64))
+                commands = _polygon_geometry(rings)
+                if commands is not None:
+                    geometry.append(commands)
+            if not geometry:
+                continue
+
+            regency = regencies[regency_position]
+            for value in (regency["id"], regency["name"]):
+                if value not in values:
+                    values.append(value)
+            tags = np.array([0, values.index(regency["id"]), 1, values.index(regency["name"])])
+            features.append(b"".join([
+                _field_varint(1, int(regency["id"]) + 1),
+                _field(2, encode_varints(tags)),
+                _field_varint(3, GEOMETRY_POLYGON),
+                _field(4, encode_varints(np.concatenate(geometry))),
+            ]))
+
+        return _field(3, encode_layer("boundaries", features, ["id", "name"], values))
+
+
+class TileCache:
+    """Singleton LRU of encoded tiles bounded by total bytes."""
+
+    _instance: Optional["TileCache"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_mb: int = TILE_CACHE_MAX_MB):
+        """Private constructor - use get_instance() instead."""
+        self.max_bytes: int = max_mb * 2**20
+        self._tiles: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "TileCache":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._cache_lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def put(self, key: Hashable, tile: bytes) -> None:
+        with self._cache_lock:
+            previous = self._tiles.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._tiles[key] = tile
+            self._bytes += len(tile)
+            while self._bytes > self.max_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def invalidate(self, source: str) -> int:
+        """Drop every tile whose key starts with ``source``; returns how many."""
+        with self._cache_lock:
+            stale = [key for key in self._tiles if key[0] == source]
+            for key in stale:
+                self._bytes -= len(self._tiles.pop(key))
+            return len(stale)
+
+    def get_cache_info(self) -> dict:
+        with self._cache_lock:
+            return {"tiles": len(self._tiles), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+def run_id_for(cache_key: tuple) -> str:
+    """Stable id of a prediction run, from its prediction cache key."""
+    return hashlib.sha1(repr(cache_key).encode("utf-8")).hexdigest()[:12]
+
+
+class TileRunRegistry:
+    """Singleton of the prediction runs whose tiles can be served.
+
+    A run is published under an id derived from its prediction cache key,
+    so sessions showing the same prediction share tiles. Publishing a new
+    result under an existing id drops that run's cached tiles; runs beyond
+    ``TILE_MAX_RUNS`` are forgotten oldest first, along with their tiles.
+    """
+
+    _instance: Optional["TileRunRegistry"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_runs: int = TILE_MAX_RUNS):
+        """Private constructor - use get_instance() instead."""
+        self.max_runs: int = max_runs
+        self._runs: "OrderedDict[str, PredictionResult]" = OrderedDict()
+        self._indexes: Dict[str, PointTileIndex] = {}
+        self._boundary_tiles: Optional[BoundaryTiles] = None
+        self._runs_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "TileRunRegistry":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def publish(self, cache_key: tuple, result: PredictionResult, run_id: Optional[str] = None) -> str:
+        """Make a result's tiles servable; returns the run id to put in tile URLs."""
+        run_id = run_id or run_id_for(cache_key)
+        stale = []
+        with self._runs_lock:
+            if self._runs.get(run_id) is not result:
+                if run_id in self._runs:
+                    stale.append(run_id)
+                self._runs[run_id] = result
+                self._indexes.pop(run_id, None)
+            self._runs.move_to_end(run_id)
+            while len(self._runs) > self.max_runs:
+                evicted, _ = self._runs.popitem(last=False)
+                self._indexes.pop(evicted, None)
+                stale.append(evicted)
+
+        for stale_run in stale:
+            TileCache.get_instance().invalidate(stale_run)
+        return run_id
+
+    def is_published(self, run_id: str) -> bool:
+        return run_id in self._runs
+
+    def result(self, run_id: str) -> Optional[PredictionResult]:
+        """The result published under ``run_id``, or None."""
+        with self._runs_lock:
+            return self._runs.get(run_id)
+
+    def index(self, run_id: str) -> Optional[PointTileIndex]:
+        """Point index of a published run, built on its first tile request."""
+        with self._runs_lock:
+            result = self._runs.get(run_id)
+            index = self._indexes.get(run_id)
+        if result is None:
+            return None
+        if index is None:
+            index = PointTileIndex(result.coordinates, result.probabilities)
+            with self._runs_lock:
+                if self._runs.get(run_id) is result:
+                    self._indexes[run_id] = index
+        return index
+
+    def point_tile(self, run_id: str, z: int, x: int, y: int, threshold: float) -> Optional[bytes]:
+        """Encoded points tile of a run, or None if the run is unknown."""
+        threshold = round(float(threshold), 2)
+        cache = TileCache.get_instance()
+        key = (run_id, threshold, z, x, y)
+        tile = cache.get(key)
+        if tile is not None:
+            return tile
+
+        index = self.index(run_id)
+        if index is None:
+            return None
+        tile = encode_point_tile(index, z, x, y, threshold)
+        cache.put(key, tile)
+        return tile
+
+    def boundary_tile(self, z: int, x: int, y: int) -> bytes:
+        """Encoded regency boundaries tile."""
+        cache = TileCache.get_instance()
+        key = ("boundaries", z, x, y)
+        tile = cache.get(key)
+        if tile is None:
+            if self._boundary_tiles is None:
+                self._boundary_tiles = BoundaryTiles()
+            tile = self._boundary_tiles.encode(z, x, y)
+            cache.put(key, tile)
+        return tile
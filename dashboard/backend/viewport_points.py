@@ -0,0 +1,154 @@
+"""Map points inside the current viewport, cached by quantized bounding box"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from config import VIEWPORT_MARGIN, VIEWPORT_CACHE_SIZE, VIEWPORT_MAX_TILES
+from .prediction_result import PredictionResult, flat_coordinates
+from .vector_tiles import INDEX_ZOOM, PointTileIndex, TileRunRegistry, project
+from .inference import DataLoader, get_ground_truth_classes
+
+
+GROUND_TRUTH_RUN_ID = "ground_truth"
+
+# (zoom, x0, y0, x1, y1): an inclusive range of tiles
+TileRange = Tuple[int, int, int, int, int]
+
+
+_ground_truth_lock: Lock = Lock()
+_ground_truth_source: Optional[np.ndarray] = None  # Loader coordinate array the run was built from
+
+
+def publish_ground_truth() -> PredictionResult:
+    """The ground truth points as run ``GROUND_TRUTH_RUN_ID``, their class as probability.
+
+    The run is republished once the dataset changes on disk (the loader then
+    hands out a new coordinate array), which also drops its stale tiles,
+    clusters and viewport entries.
+    """
+    global _ground_truth_source
+
+    coordinates = DataLoader.get_instance().get_coordinate_array()
+    registry = TileRunRegistry.get_instance()
+    with _ground_truth_lock:
+        result = registry.result(GROUND_TRUTH_RUN_ID)
+        if result is None or _ground_truth_source is not coordinates:
+            result = PredictionResult(coordinates, get_ground_truth_classes())
+            registry.publish((GROUND_TRUTH_RUN_ID,), result, run_id=GROUND_TRUTH_RUN_ID)
+            _ground_truth_source = coordinates
+    return result
+
+
+def quantize_view(
+    zoom: float, bounds: List[float], margin: float = VIEWPORT_MARGIN, max_tiles: int = VIEWPORT_MAX_TILES
+) -> TileRange:
+    """Tiles covering ``bounds`` (west, south, east, north) grown by ``margin`` of the view per side.
+
+    Tiles are taken at the view's zoom, coarser if that needs more than
+    ``max_tiles``. Small pans map to the same range and so to the same cache
+    entry; the range always contains the whole padded view.
+    """
+    west, south, east, north = bounds
+    pad_lon, pad_lat = (east - west) * margin, (north - south) * margin
+    corners = project([[north + pad_lat, west - pad_lon], [south - pad_lat, east + pad_lon]])
+
+    tile_zoom = int(np.clip(np.floor(zoom), 0, INDEX_ZOOM))
+    while True:
+        tiles = 1 << tile_zoom
+        (x0, y0), (x1, y1) = np.clip(np.floor(corners * tiles).astype(np.int64), 0, tiles - 1)
+        if tile_zoom == 0 or (x1 - x0 + 1) * (y1 - y0 + 1) <= max_tiles:
+            return tile_zoom, int(x0), int(y0), int(x1), int(y1)
+        tile_zoom -= 1
+
+
+def tile_range_positions(index: PointTileIndex, tile_range: TileRange) -> np.ndarray:
+    """Positions (into ``index``) of the points in a range of tiles, tile by tile.
+
+    Each tile is one contiguous slice of the Morton-sorted index, so the
+    range costs two binary searches per tile.
+    """
+    zoom, x0, y0, x1, y1 = tile_range
+    slices = [index.tile_slice(zoom, x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+    if not slices:
+        return np.empty(0, dtype=np.int64)
+    starts = np.array([found.start for found in slices], dtype=np.int64)
+    lengths = np.array([found.stop - found.start for found in slices], dtype=np.int64)
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+class ViewportPoints:
+    """Singleton LRU of the points shown for a (run, selection, quantized view).
+
+    A selection is a threshold (``("threshold", 0.5)``) or the top k
+    points (``("top_k", 100)``). Entries remember the result they were cut
+    from, so a run republished with new probabilities is never served
+    stale points.
+    """
+
+    _instance: Optional["ViewportPoints"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, max_entries: int = VIEWPORT_CACHE_SIZE):
+        """Private constructor - use get_instance() instead."""
+        self.max_entries: int = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[PredictionResult, List[float], List[float]]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "ViewportPoints":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def points(
+        self,
+        run_id: str,
+        result: PredictionResult,
+        selection: tuple,
+        zoom: float,
+        bounds: List[float],
+    ) -> Tuple[List[float], List[float]]:
+        """Flat (lat, lon) list and probabilities of the selected points around the view."""
+        tile_range = quantize_view(zoom, bounds)
+        key = (run_id, selection, tile_range)
+        with self._entries_lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] is result:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1], cached[2]
+            self.misses += 1
+
+        registry = TileRunRegistry.get_instance()
+        if registry.result(run_id) is not result:
+            registry.publish((run_id,), result, run_id=run_id)
+        index = registry.index(run_id)
+
+        positions = tile_range_positions(index, tile_range)
+        kind, value = selection
+        if kind == "top_k":
+            selected = np.zeros(len(result), dtype=bool)
+            selected[result.top_k_indices(value)] = True
+            positions = positions[selected[index.order[positions]]]
+        else:
+            positions = positions[index.probabilities[positions] >= np.float32(value)]
+
+        points = flat_coordinates(result.coordinates[index.order[positions]])
+        probabilities = index.probabilities[positions].astype(np.float64).round(2).tolist()
+        with self._entries_lock:
+            self._entries[key] = (result, points, probabilities)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return points, probabilities
+
+    def get_cache_info(self) -> dict:
+        with self._entries_lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
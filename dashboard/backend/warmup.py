@@ -0,0 +1,177 @@
+"""Background warm-up of the inference artifacts at server start"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from threading import Lock, Thread
+from typing import Optional, Callable, Sequence, Any
+
+import numpy as np
+
+from config import WARMUP_MODEL_IDS
+from .flood_prediction import FEATURE_COLUMNS
+from .model_registry import ModelRegistry
+from .inference_executor import InferenceExecutor
+from .inference import DataLoader
+from .vector_tiles import TileRunRegistry
+from .viewport_points import GROUND_TRUTH_RUN_ID, publish_ground_truth
+
+
+@dataclass
+class ArtifactStatus:
+    """Warm-up state of one artifact."""
+    name: str
+    status: str = "pending"  # pending | loading | ready | failed
+    seconds: Optional[float] = None
+    error: str = ""
+
+
+class WarmupManager:
+    """Singleton that loads the dataset, scaler and models off the request path.
+
+    ``start()`` returns immediately; the artifacts load one after another on a
+    daemon thread, each with its own status and timing, and every model runs a
+    dummy batch so the first real prediction doesn't pay for graph setup.
+    Page handlers never wait on it: they share the registry's loading futures.
+    Model readiness is not tracked here but read from ``ModelRegistry``, so a
+    model loaded, evicted or failed outside the warm-up is reported as it is.
+    """
+
+    _instance: Optional["WarmupManager"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self, model_ids: Sequence[str] = WARMUP_MODEL_IDS):
+        """Use get_instance() in the app; a separate instance only runs its own warm-up."""
+        self.model_ids: Sequence[str] = model_ids
+        self._artifacts: "OrderedDict[str, ArtifactStatus]" = OrderedDict()
+        self._started_at: Optional[float] = None
+        self._cold_start_seconds: Optional[float] = None
+        self._thread: Optional[Thread] = None
+        self._state_lock: Lock = Lock()
+
+        for name in ("dataset", "scaler", "feature_matrix", "ground_truth_index"):
+            self._artifacts[name] = ArtifactStatus(name)
+        for model_id in model_ids:
+            self._artifacts[f"dummy_batch:{model_id}"] = ArtifactStatus(f"dummy_batch:{model_id}")
+
+    @classmethod
+    def get_instance(cls) -> "WarmupManager":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    # Worker processes preload their own models; the web process keeps none.
+                    in_workers = InferenceExecutor.get_instance().mode == "process"
+                    cls._instance = cls(model_ids=() if in_workers else WARMUP_MODEL_IDS)
+        return cls._instance
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if every artifact has been attempted."""
+        return self._cold_start_seconds is not None
+
+    @property
+    def is_ready(self) -> bool:
+        """Check if every artifact loaded successfully and every model is resident."""
+        registry = ModelRegistry.get_instance()
+        return all(artifact.status == "ready" for artifact in self._artifacts.values()) and all(
+            registry.is_ready(model_id) for model_id in self.model_ids
+        )
+
+    def start(self) -> None:
+        """Start warming up in the background; later calls are no-ops."""
+        with self._state_lock:
+            if self._thread is not None:
+                return
+            self._started_at = time.perf_counter()
+            self._thread = Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warm-up finishes; for scripts and tests, not handlers."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_finished
+
+    def run(self) -> None:
+        """Load every artifact in order, recording status and timing."""
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+
+        data_loader = DataLoader.get_instance()
+        self._timed("dataset", data_loader.load_data)
+        self._timed("scaler", data_loader.load_scaler)
+        self._timed("feature_matrix", data_loader.get_feature_matrix)
+        self._timed("ground_truth_index", self._build_ground_truth_index)
+
+        registry = ModelRegistry.get_instance()
+        for model_id in self.model_ids:
+            # The registry records the load's status, timing and error itself.
+            try:
+                registry.load_async(model_id).result()
+            except Exception as e:
+                print(f"Warm-up of model:{model_id} failed: {e}")
+                self._set(f"dummy_batch:{model_id}", status="failed", error="model not loaded")
+                continue
+            self._timed(f"dummy_batch:{model_id}", lambda: self._run_dummy_batch(model_id))
+
+        self._cold_start_seconds = time.perf_counter() - self._started_at
+        print(f"Warm-up finished in {self._cold_start_seconds:.3f}s")
+        for artifact in self.get_warmup_info()["artifacts"]:
+            seconds = f"{artifact['seconds']:.3f}s" if artifact["seconds"] is not None else "-"
+            print(f"  {artifact['name']:<40} {artifact['status']:<8} {seconds} {artifact['error']}")
+
+    @staticmethod
+    def _build_ground_truth_index() -> None:
+        """Publish the ground truth run and index it, so the first map views don't."""
+        publish_ground_truth()
+        TileRunRegistry.get_instance().index(GROUND_TRUTH_RUN_ID)
+
+    @staticmethod
+    def _run_dummy_batch(model_id: str) -> None:
+        """Push one all-zero row through the model's full prediction path."""
+        model = ModelRegistry.get_instance().get(model_id)
+        model.predict_proba(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32))
+
+    def _timed(self, name: str, load: Callable[[], Any]) -> bool:
+        """Run one warm-up step and record its outcome."""
+        self._set(name, status="loading")
+        start = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            self._set(name, status="failed", seconds=time.perf_counter() - start, error=str(e))
+            print(f"Warm-up of {name} failed: {e}")
+            return False
+        self._set(name, status="ready", seconds=time.perf_counter() - start)
+        return True
+
+    def _set(self, name: str, **changes: Any) -> None:
+        """Update an artifact's status under the state lock."""
+        with self._state_lock:
+            artifact = self._artifacts.setdefault(name, ArtifactStatus(name))
+            for field, value in changes.items():
+                setattr(artifact, field, value)
+
+    def get_warmup_info(self) -> dict:
+        """Get readiness and per-artifact timings, models as the registry reports them."""
+        registry = ModelRegistry.get_instance()
+        with self._state_lock:
+            artifacts = [
+                asdict(artifact) for name, artifact in self._artifacts.items()
+                if not name.startswith("dummy_batch:")
+            ]
+            for model_id in self.model_ids:
+                artifacts.append(registry.model_status(model_id))
+                artifacts.append(asdict(self._artifacts[f"dummy_batch:{model_id}"]))
+        return {
+            "ready": self.is_ready,
+            "finished": self.is_finished,
+            "cold_start_seconds": self._cold_start_seconds,
+            "artifacts": artifacts,
+        }
+
+
+async def warmup_lifespan_task() -> None:
+    """Reflex lifespan task: kick off the warm-up without delaying server start."""
+    WarmupManager.get_instance().start()
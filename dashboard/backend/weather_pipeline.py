@@ -0,0 +1,172 @@
+"""Live rainfall from WeatherService mapped onto the flood prediction points"""
+
+import datetime
+import hashlib
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from config import SULSEL_CITIES, WEATHER_IDW_NEIGHBORS, WEATHER_IDW_POWER
+from .weather_service import WeatherService
+from .incremental_prediction import IncrementalPredictor
+from .prediction_result import PredictionResult
+from .inference import DataLoader
+
+
+EARTH_RADIUS_KM = 6371.0
+CITY_NAMES = list(SULSEL_CITIES)
+CITY_COORDINATES = np.array(
+    [[SULSEL_CITIES[city]["lat"], SULSEL_CITIES[city]["lon"]] for city in CITY_NAMES],
+    dtype=np.float64,
+)
+
+
+@dataclass(frozen=True)
+class CityRainfall:
+    """Rainfall (mm) per city in ``SULSEL_CITIES`` order; NaN where the API failed."""
+    precip_1d: np.ndarray
+    precip_3d: np.ndarray
+    fetched_at: str
+
+    @property
+    def available(self) -> int:
+        """Number of cities with usable rainfall."""
+        return int(np.count_nonzero(np.isfinite(self.precip_1d) & np.isfinite(self.precip_3d)))
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the rainfall values; equal rainfall gives equal predictions."""
+        digest = hashlib.sha1(np.ascontiguousarray(self.precip_1d).tobytes())
+        digest.update(np.ascontiguousarray(self.precip_3d).tobytes())
+        return digest.hexdigest()
+
+
+def _fetch_one_city(city: str) -> Tuple[float, float]:
+    """(precip_1d, precip_3d) for one city from the current weather and forecast.
+
+    precip_1d is today's forecast total (at least the rain of the last hour),
+    precip_3d the total of the first three forecast days.
+    """
+    coordinates = SULSEL_CITIES[city]
+    current = WeatherService.fetch_current_weather(city, coordinates["lat"], coordinates["lon"])
+    forecast = WeatherService.fetch_forecast_data(city, coordinates["lat"], coordinates["lon"])
+
+    daily = [day["rainfall"] for day in forecast[:3]]
+    current_rainfall = current["rainfall"] if current else math.nan
+    if not daily:
+        return current_rainfall, math.nan
+
+    precip_1d = max(daily[0], current_rainfall) if current else daily[0]
+    return precip_1d, sum(daily)
+
+
+def fetch_city_rainfall(workers: int = 8) -> CityRainfall:
+    """Fetch rainfall for every city concurrently (the requests are I/O bound)."""
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather") as executor:
+        rainfall = np.array(list(executor.map(_fetch_one_city, CITY_NAMES)), dtype=np.float64)
+
+    return CityRainfall(
+        precip_1d=rainfall[:, 0],
+        precip_3d=rainfall[:, 1],
+        fetched_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+    )
+
+
+class CityNeighborIndex:
+    """Precomputed inverse-distance weights from each point to its nearest cities.
+
+    Built once per set of points; interpolating a new rainfall reading is
+    then a gather and a weighted sum over an (N, k) array. ``k=1`` is the
+    nearest-city mode.
+    """
+
+    def __init__(
+        self,
+        coordinates: np.ndarray,
+        neighbors: int = WEATHER_IDW_NEIGHBORS,
+        power: float = WEATHER_IDW_POWER,
+    ):
+        tree = BallTree(np.radians(CITY_COORDINATES), metric="haversine")
+        distance, index = tree.query(
+            np.radians(np.asarray(coordinates, dtype=np.float64)),
+            k=max(1, min(neighbors, len(CITY_NAMES))),
+        )
+        distance_km = np.maximum(distance * EARTH_RADIUS_KM, 1e-3)
+
+        self.index: np.ndarray = index
+        self.weights: np.ndarray = 1.0 / distance_km ** power
+
+    def interpolate(self, city_values: np.ndarray) -> np.ndarray:
+        """Per-point values; NaN where none of a point's cities has data."""
+        values = np.asarray(city_values, dtype=np.float64)[self.index]
+        available = np.isfinite(values)
+        weights = np.where(available, self.weights, 0.0)
+        total = weights.sum(axis=1)
+
+        weighted = (np.where(available, values, 0.0) * weights).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, weighted / total, np.nan)
+
+
+class WeatherFloodPipeline:
+    """Singleton that turns city rainfall into an incremental re-prediction."""
+
+    _instance: Optional["WeatherFloodPipeline"] = None
+    _lock: Lock = Lock()
+
+    def __init__(self):
+        """Private constructor - use get_instance() instead."""
+        self._coordinates: Optional[np.ndarray] = None
+        self._index: Optional[CityNeighborIndex] = None
+        self._index_lock: Lock = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "WeatherFloodPipeline":
+        """Get singleton instance using double-checked locking."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def neighbor_index(self) -> CityNeighborIndex:
+        """Neighbor index for the dataset's points, rebuilt if the dataset changed."""
+        coordinates = DataLoader.get_instance().get_coordinate_array()
+        with self._index_lock:
+            if self._index is None or self._coordinates is not coordinates:
+                self._index = CityNeighborIndex(coordinates)
+                self._coordinates = coordinates
+            return self._index
+
+    def apply(self, rainfall: CityRainfall, model_id: Optional[str] = None) -> PredictionResult:
+        """Rebuild the precipitation columns from city rainfall and re-predict.
+
+        Points whose neighboring cities all lack data fall back to the
+        dataset's precipitation, never to an earlier live run's, so equal
+        rainfall always gives an equal result. Raises ``RuntimeError`` if no
+        city has rainfall at all, rather than passing the previous prediction
+        off as a live one.
+        """
+        if rainfall.available == 0:
+            raise RuntimeError(f"No live rainfall: all {len(CITY_NAMES)} city requests failed")
+
+        index = self.neighbor_index()
+        precip_1d = index.interpolate(rainfall.precip_1d)
+        precip_3d = index.interpolate(rainfall.precip_3d)
+        live = np.isfinite(precip_1d) & np.isfinite(precip_3d)
+        data = DataLoader.get_instance().get_data()
+
+        return IncrementalPredictor.get_instance(model_id).update_precipitation(
+            np.where(live, precip_1d, data["precip_1d"].to_numpy(np.float64)),
+            np.where(live, precip_3d, data["precip_3d"].to_numpy(np.float64)),
+        )
+
+
+def predict_live_result(model_id: str, rainfall: CityRainfall) -> PredictionResult:
+    """Blocking live-rainfall prediction; meant to run on the ``InferenceExecutor`` pool."""
+    return WeatherFloodPipeline.get_instance().apply(rainfall, model_id)
@@ -1,4 +1,4 @@
-from .maps import map_container, tile_layer, circle_marker, map_with_circle_points
+from .maps import map_container, tile_layer, circle_marker, point_canvas_layer, cluster_layer, vector_tile_layer, map_with_circle_points
 from .filter_sidebar import filter_sidebar , FilterSidebarState
 
 
@@ -6,6 +6,9 @@ __all__ = [
     "map_container",
     "tile_layer",
     "circle_marker",
+    "point_canvas_layer",
+    "cluster_layer",
+    "vector_tile_layer",
     "map_with_circle_points",
     "filter_sidebar",
     "FilterSidebarState"
@@ -1,7 +1,7 @@
 from typing import  Optional
 import asyncio
 import reflex as rx
-from ..backend import  MapState
+from ..backend import  MapState, ModelRegistry
 
 
 class FilterSidebarState(rx.State):
@@ -26,12 +26,112 @@ class FilterSidebarState(rx.State):
             print("Loading flood prediction coordinates...")
             self.progress_text = "Loading Flood Prediction Coordinates..."
             yield MapState.set_flood_prediction_coordinates
+
+        elif selected_value == "live":
+            print("Loading live rainfall flood prediction...")
+            self.progress_text = "Loading Live Rainfall Prediction..."
+            yield MapState.run_live_prediction
         print(f"Selected value: {self.value}")
         self.progress_text = "Loading completed"
         await asyncio.sleep(0.9)  # Simulate additional loading delay
         self.is_loading = False
 
 
+def model_selector(size: str = "2") -> rx.Component:
+    """Select the flood model; the switch happens once it is loaded in the background."""
+    specs = ModelRegistry.get_instance().list_specs()
+    return rx.vstack(
+        rx.select.root(
+            rx.select.trigger(width="100%"),
+            rx.select.content(
+                *[
+                    rx.select.item(spec.label or spec.model_id, value=spec.model_id)
+                    for spec in specs
+                ],
+            ),
+            value=MapState.model_id,
+            on_change=MapState.switch_model,
+            disabled=MapState.is_switching_model,
+            size=size,
+            width="100%",
+        ),
+        rx.cond(
+            ~MapState.model_ready & (MapState.model_error == ""),
+            rx.hstack(
+                rx.spinner(size="1"),
+                rx.text("Model warming up...", font_size="sm", color="gray"),
+                align_items="center",
+                spacing="2",
+            ),
+        ),
+        rx.cond(
+            MapState.is_switching_model,
+            rx.hstack(
+                rx.spinner(size="1"),
+                rx.text("Loading model...", font_size="sm", color="gray"),
+                align_items="center",
+                spacing="2",
+            ),
+        ),
+        rx.cond(
+            MapState.model_error != "",
+            rx.text(MapState.model_error, font_size="sm", color="red"),
+        ),
+        spacing="2",
+        align_items="stretch",
+        width="100%",
+    )
+
+
+def threshold_slider(size: str = "2") -> rx.Component:
+    """Tune the flood probability threshold without re-running the model."""
+    return rx.vstack(
+        rx.hstack(
+            rx.text("Threshold", weight="medium", font_size="sm"),
+            rx.spacer(),
+            rx.text(MapState.sigmoid_threshold, font_size="sm", color="gray"),
+            width="100%",
+        ),
+        rx.slider(
+            value=[MapState.sigmoid_threshold * 100],
+            min=1,
+            max=99,
+            step=1,
+            on_change=MapState.preview_threshold,
+            on_value_commit=MapState.set_threshold,
+            size=size,
+            width="100%",
+        ),
+        spacing="2",
+        align_items="stretch",
+        width="100%",
+    )
+
+
+def regency_risk_list(size: str = "2", limit: int = 5) -> rx.Component:
+    """Kabupaten with the highest share of predicted flood points."""
+    return rx.vstack(
+        rx.text("Kabupaten Berisiko", weight="medium", font_size="sm"),
+        rx.foreach(
+            MapState.regency_summary[:limit],
+            lambda regency: rx.hstack(
+                rx.text(regency["name"], font_size="sm"),
+                rx.spacer(),
+                rx.badge(
+                    regency["flood_count"], "/", regency["points"],
+                    color_scheme="red",
+                    size=size,
+                ),
+                width="100%",
+                align_items="center",
+            ),
+        ),
+        spacing="1",
+        align_items="stretch",
+        width="100%",
+    )
+
+
 def filter_sidebar(
     title: str = "Filter & Analisis",
     additional_content: Optional[rx.Component] = None,
@@ -75,10 +175,25 @@ def filter_sidebar(
                 rx.segmented_control.root(
                     rx.segmented_control.item("Ground Truth", value="target"),
                     rx.segmented_control.item("Predict", value="predict"),
+                    rx.segmented_control.item("Live", value="live"),
                     on_change=FilterSidebarState.show_marker,
                     value=FilterSidebarState.value,
                     width="100%",
                 ),
+                rx.text("Model", weight="medium", font_size=text_size),
+                model_selector(size="1"),
+                rx.cond(
+                    FilterSidebarState.value != "target",
+                    threshold_slider(size="1"),
+                ),
+                rx.cond(
+                    (FilterSidebarState.value != "target") & (MapState.regency_summary.length() > 0),
+                    regency_risk_list(size="1"),
+                ),
+                rx.cond(
+                    FilterSidebarState.value == "live",
+                    rx.text(MapState.live_weather_status, font_size="sm", color="gray"),
+                ),
                 rx.cond(
                     FilterSidebarState.is_loading,
                     rx.hstack(
@@ -106,11 +221,26 @@ def filter_sidebar(
                 rx.segmented_control.root(
                     rx.segmented_control.item("Ground Truth", value="target"),
                     rx.segmented_control.item("Predict", value="predict"),
+                    rx.segmented_control.item("Live", value="live"),
                     on_change=FilterSidebarState.show_marker,
                     value=FilterSidebarState.value,
                     width="100%",
                     size="2",
                 ),
+                rx.text("Model", weight="medium", margin_bottom="0.25em"),
+                model_selector(),
+                rx.cond(
+                    FilterSidebarState.value != "target",
+                    threshold_slider(),
+                ),
+                rx.cond(
+                    (FilterSidebarState.value != "target") & (MapState.regency_summary.length() > 0),
+                    regency_risk_list(),
+                ),
+                rx.cond(
+                    FilterSidebarState.value == "live",
+                    rx.text(MapState.live_weather_status, font_size="sm", color="gray"),
+                ),
                 rx.cond(
                     FilterSidebarState.is_loading,
                     rx.hstack(
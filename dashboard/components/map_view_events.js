@@ -0,0 +1,29 @@
+// Reports the map's zoom and bounds when mounted and after every move or zoom.
+import { useEffect } from "react";
+import { useMapEvents } from "react-leaflet";
+
+function viewOf(map) {
+  const bounds = map.getBounds();
+  return {
+    zoom: map.getZoom(),
+    west: bounds.getWest(),
+    south: bounds.getSouth(),
+    east: bounds.getEast(),
+    north: bounds.getNorth(),
+  };
+}
+
+export function MapViewEvents({ onViewChange }) {
+  // Leaflet fires moveend after zooms as well, once per gesture.
+  const map = useMapEvents({
+    moveend() {
+      if (onViewChange) onViewChange(viewOf(map));
+    },
+  });
+
+  useEffect(() => {
+    if (onViewChange) onViewChange(viewOf(map));
+  }, [map]);
+
+  return null;
+}
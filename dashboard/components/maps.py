@@ -17,6 +17,20 @@ class MapContainer(rx.NoSSRComponent):
     def add_imports(self):
         return {"": ["leaflet/dist/leaflet.css"]}
 
+    @classmethod
+    def create(cls, *children, **props):
+        """Create the map; ``on_view_change`` gets {zoom, west, south, east, north} after each move."""
+        on_view_change = props.pop("on_view_change", None)
+        if on_view_change is not None:
+            children = (*children, MapViewEvents.create(on_view_change=on_view_change))
+        return super().create(*children, **props)
+
+class MapViewEvents(rx.NoSSRComponent):
+    """Reports the view of its parent map on mount and after every move or zoom."""
+    library = "$/public" + rx.asset("map_view_events.js", shared=True)
+    tag = "MapViewEvents"
+    on_view_change: rx.EventHandler[lambda view: [view]]
+
 class TileLayer(rx.NoSSRComponent):
     library = "react-leaflet"
     tag = "TileLayer"
@@ -32,6 +46,31 @@ class CircleMarker(rx.NoSSRComponent):
     fill_opacity: rx.Var[float] = 0.6
     weight: rx.Var[int] = 1  
 
+class PointCanvasLayer(rx.NoSSRComponent):
+    """A whole point set drawn on one canvas: one layer however many points."""
+    library = "$/public" + rx.asset("point_canvas_layer.js", shared=True)
+    tag = "PointCanvasLayer"
+    points: rx.Var[list]  # Flat [lat0, lon0, lat1, lon1, ...]
+    values: rx.Var[list]  # Per-point class or probability, matched against color_stops
+    color_stops: rx.Var[list]  # [[minimum value, color], ...], ascending
+    radius: rx.Var[float] = 3
+    color: rx.Var[str] = "blue"  # Points without a value or below the first stop
+    fill_opacity: rx.Var[float] = 0.6
+    weight: rx.Var[float] = 0
+    min_zoom: rx.Var[int]  # Nothing is drawn below this zoom
+
+class ClusterLayer(rx.NoSSRComponent):
+    """Server-side point clusters for the current view, refetched on every map move."""
+    library = "$/public" + rx.asset("point_canvas_layer.js", shared=True)
+    tag = "ClusterLayer"
+    url: rx.Var[str]  # /api/clusters/<run id>?threshold=...; empty draws nothing
+    max_zoom: rx.Var[int]  # Nothing is fetched above this zoom
+    color_stops: rx.Var[list]  # [[minimum probability, color], ...], ascending
+    radius: rx.Var[float] = 3
+    color: rx.Var[str] = "blue"
+    fill_opacity: rx.Var[float] = 0.6
+    weight: rx.Var[float] = 0
+
 class Polyline(rx.NoSSRComponent):
     library = "react-leaflet"
     tag = "Polyline"
@@ -48,14 +87,32 @@ class MultiPolyline(rx.NoSSRComponent):
     weight: rx.Var[int] = 3
     opacity: rx.Var[float] = 1.0
 
+class VectorTileLayer(rx.NoSSRComponent):
+    """Canvas layer drawing the backend's Mapbox Vector Tiles, styled per tile layer name."""
+    library = "$/public" + rx.asset("vector_tile_layer.js", shared=True)
+    tag = "VectorTileLayer"
+    url: rx.Var[str]  # Template with {z}/{x}/{y}
+    layer_styles: rx.Var[dict]  # {layer name: {color, weight, fillColor, fillOpacity, radius}}
+    max_native_zoom: rx.Var[int]
+    min_zoom: rx.Var[int]  # No tiles are requested below this zoom
+    z_index: rx.Var[int]
+
+    lib_dependencies: list[str] = [
+        "@mapbox/vector-tile@2.0.3",
+        "pbf@4.0.1",
+    ]
+
 
     
     
 map_container = MapContainer.create
 tile_layer = TileLayer.create
 circle_marker = CircleMarker.create
+point_canvas_layer = PointCanvasLayer.create
+cluster_layer = ClusterLayer.create
 polyline = Polyline.create
 multi_polyline = MultiPolyline.create
+vector_tile_layer = VectorTileLayer.create
 
 def map_with_circle_points():
     return map_container(
@@ -0,0 +1,283 @@
+// Leaflet layer drawing a whole point set on one canvas, redrawn per view change.
+import { createElementObject, createLayerComponent } from "@react-leaflet/core";
+import { DomUtil, Layer, Util } from "leaflet";
+
+const WORLD_SIZE = 256;
+const MAX_LATITUDE = 85.0511287798;
+
+// Web Mercator pixels at zoom 0 of a flat [lat0, lon0, lat1, lon1, ...] array.
+function projectPoints(points) {
+  const projected = new Float64Array(points.length - (points.length % 2));
+  for (let i = 0; i < projected.length; i += 2) {
+    const lat = Math.max(-MAX_LATITUDE, Math.min(MAX_LATITUDE, points[i]));
+    const sin = Math.sin((lat * Math.PI) / 180);
+    projected[i] = WORLD_SIZE * (points[i + 1] / 360 + 0.5);
+    projected[i + 1] = WORLD_SIZE * (0.5 - Math.log((1 + sin) / (1 - sin)) / (4 * Math.PI));
+  }
+  return projected;
+}
+
+const PointCanvas = Layer.extend({
+  options: {
+    pane: "overlayPane",
+    radius: 3,
+    color: "blue",
+    fillOpacity: 0.6,
+    weight: 0,
+    // [[minimum value, color], ...] ascending; a point takes the last stop its value reaches.
+    colorStops: null,
+    // Nothing is drawn below this zoom (clusters cover it).
+    minZoom: 0,
+  },
+
+  initialize(points, values, options) {
+    Util.setOptions(this, options);
+    this.setData(points, values);
+  },
+
+  // `counts` (optional) marks points as clusters: drawn larger and labeled.
+  setData(points, values, counts) {
+    this._projected = projectPoints(points || []);
+    this._values = values || [];
+    this._counts = counts || null;
+    this._groups = null;
+    this._redraw();
+  },
+
+  setStyle(options) {
+    Util.setOptions(this, options);
+    this._groups = null;
+    this._redraw();
+  },
+
+  onAdd() {
+    this._canvas = DomUtil.create("canvas", "leaflet-zoom-animated");
+    this._canvas.style.pointerEvents = "none";
+    this.getPane().appendChild(this._canvas);
+    this._redraw();
+  },
+
+  onRemove() {
+    DomUtil.remove(this._canvas);
+    this._canvas = null;
+  },
+
+  getEvents() {
+    const events = { viewreset: this._redraw, moveend: this._redraw, resize: this._redraw };
+    if (this._zoomAnimated) events.zoomanim = this._animateZoom;
+    return events;
+  },
+
+  // Scale the last frame during the zoom animation; moveend redraws it sharp.
+  _animateZoom(event) {
+    const map = this._map;
+    const scale = map.getZoomScale(event.zoom);
+    const offset = map._latLngBoundsToNewLayerBounds(map.getBounds(), event.zoom, event.center).min;
+    DomUtil.setTransform(this._canvas, offset, scale);
+  },
+
+  // Point indices bucketed by fill color, so each color is one path and one fill.
+  _colorGroups() {
+    if (this._groups) return this._groups;
+    const stops = this.options.colorStops || [];
+    const count = this._projected.length / 2;
+    const colorOf = new Uint16Array(count);
+    const sizes = new Uint32Array(stops.length + 1);
+    for (let i = 0; i < count; i++) {
+      const value = this._values[i];
+      let color = 0;
+      if (value !== undefined && value !== null) {
+        for (let stop = 0; stop < stops.length; stop++) {
+          if (value >= stops[stop][0]) color = stop + 1;
+        }
+      }
+      colorOf[i] = color;
+      sizes[color]++;
+    }
+
+    const groups = [this.options.color, ...stops.map((stop) => stop[1])].map((color, index) => ({
+      color,
+      indices: new Uint32Array(sizes[index]),
+      size: 0,
+    }));
+    for (let i = 0; i < count; i++) {
+      const group = groups[colorOf[i]];
+      group.indices[group.size++] = i;
+    }
+    this._groups = groups.filter((group) => group.size > 0);
+    return this._groups;
+  },
+
+  _redraw() {
+    const map = this._map;
+    if (!map || !this._canvas) return;
+
+    const size = map.getSize();
+    const ratio = window.devicePixelRatio || 1;
+    const canvas = this._canvas;
+    DomUtil.setPosition(canvas, map.containerPointToLayerPoint([0, 0]));
+    canvas.width = size.x * ratio;
+    canvas.height = size.y * ratio;
+    canvas.style.width = `${size.x}px`;
+    canvas.style.height = `${size.y}px`;
+
+    if (map.getZoom() < this.options.minZoom) return;
+
+    const context = canvas.getContext("2d");
+    context.setTransform(ratio, 0, 0, ratio, 0, 0);
+    const scale = map.getZoomScale(map.getZoom(), 0);
+    const origin = map.getPixelBounds().min;
+    const { weight } = this.options;
+    const projected = this._projected;
+    const counts = this._counts;
+
+    for (const group of this._colorGroups()) {
+      context.beginPath();
+      for (let n = 0; n < group.size; n++) {
+        const index = group.indices[n];
+        const x = projected[index * 2] * scale - origin.x;
+        const y = projected[index * 2 + 1] * scale - origin.y;
+        const radius = this._radius(counts ? counts[index] : 1);
+        if (x < -radius || y < -radius || x > size.x + radius || y > size.y + radius) continue;
+        context.moveTo(x + radius, y);
+        context.arc(x, y, radius, 0, 2 * Math.PI);
+      }
+      context.globalAlpha = this.options.fillOpacity;
+      context.fillStyle = group.color;
+      context.fill();
+      if (weight > 0) {
+        context.globalAlpha = 1;
+        context.lineWidth = weight;
+        context.strokeStyle = group.color;
+        context.stroke();
+      }
+    }
+    if (counts) this._drawLabels(context, scale, origin);
+  },
+
+  _radius(count) {
+    return count > 1 ? this.options.radius * (2 + Math.log10(count)) : this.options.radius;
+  },
+
+  _drawLabels(context, scale, origin) {
+    context.globalAlpha = 1;
+    context.fillStyle = "white";
+    context.font = "bold 11px sans-serif";
+    context.textAlign = "center";
+    context.textBaseline = "middle";
+    for (let index = 0; index < this._counts.length; index++) {
+      const count = this._counts[index];
+      if (count < 2) continue;
+      const label = count >= 10000 ? `${Math.round(count / 1000)}k` : String(count);
+      context.fillText(
+        label,
+        this._projected[index * 2] * scale - origin.x,
+        this._projected[index * 2 + 1] * scale - origin.y,
+      );
+    }
+  },
+});
+
+// Clusters of a prediction run for the current view, fetched from the backend on every move.
+// The URL (e.g. /api/clusters/<run id>?threshold=0.5) gets z and the padded bounds appended.
+const ClusterCanvas = PointCanvas.extend({
+  initialize(url, options) {
+    this._url = url;
+    PointCanvas.prototype.initialize.call(this, [], [], options);
+  },
+
+  setUrl(url) {
+    if (url !== this._url) {
+      this._url = url;
+      this._fetchClusters();
+    }
+    return this;
+  },
+
+  onAdd(map) {
+    PointCanvas.prototype.onAdd.call(this, map);
+    this._fetchClusters();
+  },
+
+  onRemove(map) {
+    if (this._request) this._request.abort();
+    PointCanvas.prototype.onRemove.call(this, map);
+  },
+
+  getEvents() {
+    const events = PointCanvas.prototype.getEvents.call(this);
+    events.moveend = this._onMoveEnd;
+    return events;
+  },
+
+  _onMoveEnd() {
+    this._redraw();
+    this._fetchClusters();
+  },
+
+  _fetchClusters() {
+    const map = this._map;
+    if (!map) return;
+    if (this._request) this._request.abort();
+    const zoom = Math.floor(map.getZoom());
+    if (!this._url || zoom > this.options.maxZoom) {
+      this.setData([], [], []);
+      return;
+    }
+
+    const bounds = map.getBounds().pad(0.25);
+    const params = new URLSearchParams({
+      z: zoom,
+      west: Math.max(bounds.getWest(), -180),
+      south: Math.max(bounds.getSouth(), -90),
+      east: Math.min(bounds.getEast(), 180),
+      north: Math.min(bounds.getNorth(), 90),
+    });
+    const request = new AbortController();
+    this._request = request;
+    fetch(`${this._url}${this._url.includes("?") ? "&" : "?"}${params}`, { signal: request.signal })
+      .then((response) => (response.ok ? response.json() : Promise.reject(new Error(response.statusText))))
+      .then((clusters) => this.setData(clusters.points, clusters.probabilities, clusters.counts))
+      .catch((error) => {
+        if (error.name !== "AbortError") console.error("Failed to load map clusters", error);
+      });
+  },
+});
+
+const STYLE_OPTIONS = ["radius", "color", "fillOpacity", "weight", "colorStops", "minZoom", "maxZoom"];
+
+function styleOf(props) {
+  const style = {};
+  for (const name of STYLE_OPTIONS) {
+    if (props[name] !== undefined) style[name] = props[name];
+  }
+  return style;
+}
+
+export const PointCanvasLayer = createLayerComponent(
+  function createPointCanvasLayer({ points, values, ...options }, context) {
+    return createElementObject(new PointCanvas(points, values, options), context);
+  },
+  function updatePointCanvasLayer(layer, props, prevProps) {
+    if (props.points !== prevProps.points || props.values !== prevProps.values) {
+      layer.setData(props.points, props.values);
+    }
+    const style = styleOf(props);
+    if (JSON.stringify(style) !== JSON.stringify(styleOf(prevProps))) {
+      layer.setStyle(style);
+    }
+  },
+);
+
+export const ClusterLayer = createLayerComponent(
+  function createClusterLayer({ url, ...options }, context) {
+    return createElementObject(new ClusterCanvas(url, options), context);
+  },
+  function updateClusterLayer(layer, props, prevProps) {
+    const style = styleOf(props);
+    if (JSON.stringify(style) !== JSON.stringify(styleOf(prevProps))) {
+      layer.setStyle(style);
+    }
+    layer.setUrl(props.url);
+  },
+);
@@ -0,0 +1,120 @@
+// Leaflet grid layer drawing Mapbox Vector Tiles on one canvas per tile.
+import { createElementObject, createLayerComponent, updateGridLayer } from "@react-leaflet/core";
+import { DomUtil, GridLayer, Util } from "leaflet";
+import { VectorTile } from "@mapbox/vector-tile";
+import Pbf from "pbf";
+
+const POINT = 1;
+const POLYGON = 3;
+
+// Fill colour of a point: the last of `probabilityColors` ([[min, color], ...])
+// whose minimum the feature's probability reaches, else `fillColor`.
+function pointColor(style, properties) {
+  let color = style.fillColor || style.color || "blue";
+  const stops = style.probabilityColors;
+  if (stops && properties.probability !== undefined) {
+    for (const [minimum, stopColor] of stops) {
+      if (properties.probability >= minimum) color = stopColor;
+    }
+  }
+  return color;
+}
+
+function drawFeature(context, feature, style, scale, ratio) {
+  const rings = feature.loadGeometry();
+  context.beginPath();
+  if (feature.type === POINT) {
+    const radius = (style.radius || 3) * ratio;
+    for (const ring of rings) {
+      for (const point of ring) {
+        context.moveTo(point.x * scale + radius, point.y * scale);
+        context.arc(point.x * scale, point.y * scale, radius, 0, 2 * Math.PI);
+      }
+    }
+    context.globalAlpha = style.fillOpacity ?? 0.6;
+    context.fillStyle = pointColor(style, feature.properties);
+    context.fill();
+    return;
+  }
+
+  for (const ring of rings) {
+    ring.forEach((point, index) => {
+      if (index === 0) context.moveTo(point.x * scale, point.y * scale);
+      else context.lineTo(point.x * scale, point.y * scale);
+    });
+    if (feature.type === POLYGON) context.closePath();
+  }
+  if (feature.type === POLYGON && style.fillOpacity) {
+    context.globalAlpha = style.fillOpacity;
+    context.fillStyle = style.fillColor || style.color || "blue";
+    context.fill("evenodd");
+  }
+  context.globalAlpha = style.opacity ?? 1;
+  context.strokeStyle = style.color || "blue";
+  context.lineWidth = (style.weight ?? 1) * ratio;
+  context.stroke();
+}
+
+const VectorTileGrid = GridLayer.extend({
+  initialize(url, options) {
+    this._url = url;
+    GridLayer.prototype.initialize.call(this, options);
+  },
+
+  setUrl(url) {
+    if (url !== this._url) {
+      this._url = url;
+      this.redraw();
+    }
+    return this;
+  },
+
+  createTile(coords, done) {
+    const size = this.getTileSize();
+    const ratio = window.devicePixelRatio || 1;
+    const canvas = DomUtil.create("canvas", "leaflet-tile");
+    canvas.width = size.x * ratio;
+    canvas.height = size.y * ratio;
+    canvas.style.width = `${size.x}px`;
+    canvas.style.height = `${size.y}px`;
+    if (!this._url) {
+      // No source (e.g. before the first prediction): an empty tile.
+      setTimeout(() => done(null, canvas), 0);
+      return canvas;
+    }
+
+    fetch(Util.template(this._url, coords))
+      .then((response) => (response.ok ? response.arrayBuffer() : Promise.reject(new Error(response.statusText))))
+      .then((buffer) => {
+        const tile = new VectorTile(new Pbf(buffer));
+        const context = canvas.getContext("2d");
+        const styles = this.options.layerStyles || {};
+        for (const name of Object.keys(tile.layers)) {
+          const style = styles[name];
+          if (!style) continue;
+          const layer = tile.layers[name];
+          const scale = (size.x * ratio) / layer.extent;
+          for (let index = 0; index < layer.length; index++) {
+            drawFeature(context, layer.feature(index), style, scale, ratio);
+          }
+        }
+        done(null, canvas);
+      })
+      .catch((error) => done(error, canvas));
+    return canvas;
+  },
+});
+
+export const VectorTileLayer = createLayerComponent(
+  function createVectorTileLayer({ url, ...options }, context) {
+    return createElementObject(new VectorTileGrid(url, options), context);
+  },
+  function updateVectorTileLayer(layer, props, prevProps) {
+    updateGridLayer(layer, props, prevProps);
+    if (props.layerStyles !== prevProps.layerStyles) {
+      layer.options.layerStyles = props.layerStyles;
+      layer.redraw();
+    }
+    layer.setUrl(props.url);
+  },
+);
@@ -6,9 +6,17 @@ import reflex as rx
 
 from . import styles
 from .pages import *
+from .backend.warmup import warmup_lifespan_task
+from .backend.timing import trace_lifespan_task
+from .backend.api import api
 
 app = rx.App(
     style=styles.base_style,
     stylesheets=styles.base_stylesheets,   
+    api_transformer=api,
 )
 
+# Load models, scaler and dataset in the background once the server is up.
+app.register_lifespan_task(warmup_lifespan_task)
+# Write the span trace to TRACE_FILE (if set) when the server stops.
+app.register_lifespan_task(trace_lifespan_task)
@@ -1,20 +1,17 @@
 import os
 import reflex as rx
 from ..templates import template
-from ..backend import FloodPredictionModel
-import os
+from ..backend import MapState
 from ..views.map_display import south_sulawesi_map_display
 from ..components import filter_sidebar
 from ..layout import map_display_area, responsive_two_column_layout
-model = FloodPredictionModel.get_instance()
-
 
 
 @template(
     title="FloodSense",
     description="FloodSense is a web application that provides real-time flood monitoring and alerts.",
     route="/floodsense",
-    on_load=model.load_if_needed(f"{os.getcwd()}/dashboard/models/lstm_smote_cv (3).h5"),
+    on_load=MapState.warm_up_model,
 )
 def floodsense():
     # Main map content
@@ -0,0 +1,220 @@
+"""Stage-by-stage inference benchmarks on synthetic data.
+
+Run with ``pytest -m benchmark`` (or ``make benchmark``). Every stage is timed
+per row count and batch size, and the results are written as JSON to
+``BENCHMARK_OUTPUT``. Pass a previous results file as ``BENCHMARK_BASELINE`` to
+fail on stages that got slower than ``BENCHMARK_TOLERANCE`` times the baseline
+(and by more than ``BENCHMARK_MIN_DELTA_S``, so sub-millisecond noise is ignored).
+"""
+
+import datetime
+import functools
+import json
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.backend import inference
+from dashboard.backend.columnar_cache import read_csv_cached
+from dashboard.backend.flood_prediction import FEATURE_COLUMNS, FloodPredictionModel
+from dashboard.backend.inference import DataLoader
+from dashboard.backend.model_registry import ModelRegistry
+from dashboard.backend.prediction_result import PredictionResult
+
+pytestmark = pytest.mark.benchmark
+
+ROW_COUNTS = [int(rows) for rows in os.getenv("BENCHMARK_ROWS", "2000,100000").split(",")]
+BATCH_SIZES = [int(size) for size in os.getenv("BENCHMARK_BATCH_SIZES", "256,1024,4096").split(",")]
+REPEATS = int(os.getenv("BENCHMARK_REPEATS", "5"))
+OUTPUT_PATH = os.getenv(
+    "BENCHMARK_OUTPUT", os.path.join(os.path.dirname(__file__), ".benchmarks", "latest.json")
+)
+BASELINE_PATH = os.getenv("BENCHMARK_BASELINE")
+TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "1.5"))
+MIN_DELTA_S = float(os.getenv("BENCHMARK_MIN_DELTA_S", "0.001"))
+
+_results = []
+
+
+def _synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Random rows with roughly the value ranges of the inference dataset."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "lon": rng.uniform(119.0, 121.0, rows),
+        "lat": rng.uniform(-7.0, -2.0, rows),
+        "precip_1d": rng.gamma(1.5, 10.0, rows),
+        "precip_3d": rng.gamma(1.5, 30.0, rows),
+        "NDVI": rng.uniform(-2000.0, 9000.0, rows),
+        "NDWI": rng.uniform(-0.5, 0.5, rows),
+        "landcover": rng.choice([10.0, 12.0, 13.0, 17.0], rows),
+        "elevation": rng.uniform(0.0, 500.0, rows),
+        "slope": rng.uniform(0.0, 30.0, rows),
+        "aspect": rng.uniform(0.0, 360.0, rows),
+        "upstream_area": rng.lognormal(-2.0, 2.0, rows),
+        "TWI": rng.uniform(-2.0, 15.0, rows),
+        "target": rng.integers(0, 2, rows),
+    })
+
+
+def _measure(stage: str, rows: int, fn, batch_size: int = None) -> dict:
+    """Time ``fn`` after one warm-up call and record median/min/max seconds."""
+    fn()
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        "stage": stage,
+        "rows": rows,
+        "batch_size": batch_size,
+        "repeats": REPEATS,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "rows_per_s": rows / statistics.median(timings),
+    }
+    _results.append(result)
+    return result
+
+
+@pytest.fixture(scope="module", autouse=True)
+def write_results():
+    """Write every recorded timing to BENCHMARK_OUTPUT when the module finishes."""
+    yield
+    import tensorflow as tf
+
+    os.makedirs(os.path.dirname(os.path.abspath(OUTPUT_PATH)), exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "results": _results,
+        }, f, indent=2)
+
+
+@pytest.fixture(scope="module")
+def datasets(tmp_path_factory):
+    """Synthetic CSVs per row count, with their columnar cache kept in tmp."""
+    work_dir = tmp_path_factory.mktemp("benchmark_data")
+    paths = {}
+    for rows in ROW_COUNTS:
+        paths[rows] = str(work_dir / f"synthetic_{rows}.csv")
+        _synthetic_frame(rows).to_csv(paths[rows], index=False)
+    return paths, str(work_dir / "cache")
+
+
+@pytest.fixture(scope="module")
+def model():
+    return ModelRegistry.get_instance().get()
+
+
+def _loaded(datasets, rows: int, monkeypatch) -> DataLoader:
+    paths, cache_root = datasets
+    monkeypatch.setattr(
+        inference, "read_csv_cached", functools.partial(read_csv_cached, cache_root=cache_root)
+    )
+    data_loader = DataLoader()
+    data_loader.load_data(paths[rows])
+    return data_loader
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_data_loader_load_and_scale(datasets, rows, monkeypatch):
+    _measure("data_loader.load", rows, lambda: _loaded(datasets, rows, monkeypatch))
+
+    data_loader = _loaded(datasets, rows, monkeypatch)
+    raw = data_loader.get_data()[FEATURE_COLUMNS]
+    _measure("data_loader.scale", rows, lambda: data_loader.scale_features(raw))
+    assert data_loader.get_feature_matrix().shape == (rows, len(FEATURE_COLUMNS))
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_preprocess_and_predict(datasets, model, rows, batch_size, monkeypatch):
+    features = _loaded(datasets, rows, monkeypatch).get_feature_matrix()
+
+    def preprocess_all():
+        for start in range(0, rows, batch_size):
+            model.preprocess(features[start:start + batch_size])
+
+    previous_batch_size = model.batch_size
+    model.set_batch_size(batch_size)
+    try:
+        _measure("model.preprocess", rows, preprocess_all, batch_size)
+        _measure("model.predict", rows, lambda: model.predict(features), batch_size)
+        _measure("model.predict_proba", rows, lambda: model.predict_proba(features), batch_size)
+    finally:
+        model.set_batch_size(previous_batch_size)
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_post_processor_and_map_points(datasets, model, rows, monkeypatch):
+    data_loader = _loaded(datasets, rows, monkeypatch)
+    coordinates = data_loader.get_coordinate_array()
+    probabilities = np.random.default_rng(0).random(rows, dtype=np.float32)
+
+    _measure("model.post_processor", rows, lambda: model.post_processor(probabilities))
+
+    # What MapState.run_flood_prediction builds for the map: the shared
+    # result and the thresholded point list sent to the browser.
+    def map_points():
+        return PredictionResult(coordinates, probabilities).flood_points(0.5).tolist()
+
+    _measure("map_state.flood_points", rows, map_points)
+    assert len(map_points()) == int(np.count_nonzero(probabilities >= 0.5))
+
+
+@pytest.mark.parametrize("source", ["h5", "artifact"])
+def test_model_load(tmp_path_factory, source):
+    # In-process loads after the first one skip some one-off TF setup; see
+    # ``python -m dashboard.backend.model_artifacts`` for cold-process numbers.
+    spec = ModelRegistry.get_instance().get_spec(ModelRegistry.get_instance().default_model_id)
+    cache_root = str(tmp_path_factory.mktemp("model_artifacts")) if source == "artifact" else ""
+
+    def load():
+        model = FloodPredictionModel()
+        model.artifact_dir = cache_root
+        model.load_if_needed(spec.path)
+
+    _measure(f"model.load_{source}", 1, load)
+
+
+def test_no_regression_against_baseline():
+    if not BASELINE_PATH:
+        pytest.skip("BENCHMARK_BASELINE not set")
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = {
+            (entry["stage"], entry["rows"], entry["batch_size"]): entry["median_s"]
+            for entry in json.load(f)["results"]
+        }
+
+    # The timings come from the other tests of this module; comparing nothing
+    # (e.g. this test selected on its own) must not pass as "no regression".
+    if not _results:
+        pytest.fail("No timings recorded: run the whole module, e.g. `pytest -m benchmark " + __file__ + "`")
+    compared = [
+        (entry, baseline[key]) for entry in _results
+        if (key := (entry["stage"], entry["rows"], entry["batch_size"])) in baseline
+    ]
+    if not compared:
+        pytest.fail(f"No recorded stage matches the baseline in {BASELINE_PATH}")
+
+    regressions = [
+        f"{entry['stage']} rows={entry['rows']} batch={entry['batch_size']}: "
+        f"{entry['median_s']:.4f}s vs {baseline_s:.4f}s"
+        for entry, baseline_s in compared
+        if entry["median_s"] > baseline_s * TOLERANCE
+        and entry["median_s"] - baseline_s > MIN_DELTA_S
+    ]
+    assert not regressions, "Slower than baseline:\n" + "\n".join(regressions)
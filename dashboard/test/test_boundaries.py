@@ -0,0 +1,72 @@
+import json
+import os
+import numpy as np
+from dashboard.backend import boundaries as boundaries_module
+from dashboard.backend.boundaries import BoundaryTopology, RegencyBoundaries, read_regencies
+
+
+def _square(x0, x1, shared_border):
+    """Ring from x0 to x1 whose side at x=1 follows ``shared_border`` (bottom to top)."""
+    if x0 < 1:
+        ring = [[x0, 0.0]] + shared_border + [[x0, 1.0]]
+    else:
+        ring = shared_border[::-1] + [[x1, 1.0], [x1, 0.0]]
+    return {"type": "MultiPolygon", "coordinates": [[ring + [ring[0]]]]}
+
+
+def _write_fixture(geojson_dir):
+    rng = np.random.default_rng(0)
+    y = np.linspace(0.0, 1.0, 400)
+    border = np.stack([1.0 + 0.01 * rng.standard_normal(len(y)), y], axis=1)
+    border[[0, -1], 0] = 1.0
+    border = border.tolist()
+
+    os.makedirs(geojson_dir, exist_ok=True)
+    for name, geometry in (("0_west", _square(0.0, 1.0, border)), ("1_east", _square(1.0, 2.0, border))):
+        with open(os.path.join(geojson_dir, f"{name}.geojson"), "w") as f:
+            json.dump(geometry, f)
+
+
+def test_shared_border_stays_shared_at_every_level(tmp_path):
+    geojson_dir = str(tmp_path / "geojson")
+    _write_fixture(geojson_dir)
+
+    regencies = read_regencies(geojson_dir)
+    assert [regency.name for regency in regencies] == ["West", "East"]
+    assert BoundaryTopology(regencies).shared_arcs == 1
+
+    boundaries = RegencyBoundaries(geojson_dir, str(tmp_path / "cache"), zoom_levels=[4, 8, 12])
+    vertices = []
+    for zoom in (4, 8, 12):
+        level = boundaries.level(zoom)
+        west, east = (level.regency_polygons(index)[0][0] for index in range(2))
+        west_border = {tuple(point) for point in west if 0.5 < point[0] < 1.5}
+        east_border = {tuple(point) for point in east if 0.5 < point[0] < 1.5}
+        assert west_border == east_border
+        vertices.append(level.vertex_count)
+    assert vertices == sorted(vertices) and vertices[0] < vertices[-1]
+
+    collection = boundaries.to_geojson(12)
+    assert [feature["properties"]["name"] for feature in collection["features"]] == ["West", "East"]
+
+
+def test_cache_is_reused_until_sources_change(tmp_path, monkeypatch):
+    geojson_dir = str(tmp_path / "geojson")
+    cache_root = str(tmp_path / "cache")
+    _write_fixture(geojson_dir)
+    RegencyBoundaries(geojson_dir, cache_root, zoom_levels=[6]).manifest
+
+    def fail(*args, **kwargs):
+        raise AssertionError("GeoJSON parsed again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(boundaries_module, "read_regencies", fail)
+        assert RegencyBoundaries(geojson_dir, cache_root, zoom_levels=[6]).level(6).vertex_count > 0
+
+    os.utime(os.path.join(geojson_dir, "0_west.geojson"), ns=(0, 0))
+    calls = []
+    monkeypatch.setattr(
+        boundaries_module, "read_regencies", lambda path: calls.append(path) or read_regencies(path)
+    )
+    RegencyBoundaries(geojson_dir, cache_root, zoom_levels=[6]).manifest
+    assert calls == [geojson_dir]
@@ -0,0 +1,21 @@
+import os
+import pandas as pd
+from dashboard.backend.columnar_cache import read_csv_cached, load_columnar
+
+
+def test_columnar_cache_roundtrip_and_invalidation(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    cache_root = str(tmp_path / "cache")
+    pd.DataFrame({"lat": [-5.1, -4.2], "lon": [119.4, 120.1], "target": [0, 1]}).to_csv(csv_path, index=False)
+
+    assert load_columnar(csv_path, cache_root) is None
+    parsed = read_csv_cached(csv_path, cache_root)
+    cached = load_columnar(csv_path, cache_root)
+    pd.testing.assert_frame_equal(cached, parsed)
+
+    # Touching the file keeps the cache (same content hash), editing it drops it
+    os.utime(csv_path, ns=(0, 0))
+    assert load_columnar(csv_path, cache_root) is not None
+    pd.DataFrame({"lat": [-3.0], "lon": [121.0], "target": [1]}).to_csv(csv_path, index=False)
+    assert load_columnar(csv_path, cache_root) is None
+    assert read_csv_cached(csv_path, cache_root)["lat"].tolist() == [-3.0]
@@ -0,0 +1,63 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from dashboard.backend import inference
+from dashboard.backend.flood_prediction import FEATURE_COLUMNS
+from dashboard.backend.inference import DataLoader
+
+
+def _write_dataset(path, value):
+    stat = os.stat(path) if os.path.exists(path) else None
+    frame = pd.DataFrame({column: [value, value + 1.0] for column in FEATURE_COLUMNS})
+    frame["target"] = [0, 1]
+    frame.to_csv(path, index=False)
+    if stat is not None:
+        # Same-size rewrites within the mtime granularity must still look changed.
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_rewritten_csv_changes_the_feature_matrix(tmp_path, monkeypatch):
+    cache_root = str(tmp_path / "cache")
+    monkeypatch.setattr(
+        inference, "read_csv_cached",
+        lambda path, _read=inference.read_csv_cached: _read(path, cache_root),
+    )
+    # No scaler is found from here, so features stay unscaled.
+    monkeypatch.chdir(tmp_path)
+    csv_path = str(tmp_path / "data.csv")
+    _write_dataset(csv_path, 1.0)
+
+    loader = DataLoader()
+    loader.load_data(csv_path)
+    before = loader.get_feature_matrix()
+    assert loader.get_feature_matrix() is before
+
+    _write_dataset(csv_path, 5.0)
+    after = loader.get_feature_matrix()
+    assert after is not before
+    assert not np.array_equal(after, before)
+    assert loader.get_data()["precip_1d"].tolist() == [5.0, 6.0]
+
+
+def test_concurrent_refreshes_reload_a_changed_file_once(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "data.csv")
+    _write_dataset(csv_path, 1.0)
+    reads = []
+    monkeypatch.setattr(
+        inference, "read_csv_cached", lambda path: reads.append(path) or pd.read_csv(path)
+    )
+
+    loader = DataLoader()
+    loader.load_data(csv_path)
+    _write_dataset(csv_path, 2.0)
+
+    threads = [threading.Thread(target=loader.refresh_if_changed) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reads) == 2
+    assert loader.is_loaded and loader.get_data()["precip_1d"].tolist() == [2.0, 3.0]
@@ -0,0 +1,18 @@
+import numpy as np
+from dashboard.backend.grid_inference import GridInferenceRun, GridSpec, open_grid_raster
+
+
+def test_grid_run_writes_raster_and_resumes(tmp_path):
+    # Small window around Makassar, where the inference samples are
+    grid = GridSpec(north=-5.0, west=119.4, south=-5.2, east=119.6, resolution_deg=0.01)
+    grid_run = GridInferenceRun(out_dir=str(tmp_path), grid=grid, tile_size=8)
+
+    first = grid_run.run()
+    raster, sidecar = open_grid_raster(str(tmp_path))
+    assert raster.shape == (20, 20) == tuple(sidecar["shape"])
+    assert first["tiles"] == 9 and first["predicted_cells"] > 0
+    assert np.count_nonzero(~np.isnan(raster)) == first["predicted_cells"]
+    assert np.nanmax(raster) <= 1.0
+
+    second = grid_run.run()
+    assert second["resumed"] and second["tiles"] == 0
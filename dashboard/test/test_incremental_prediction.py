@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+from dashboard.backend import inference
+from dashboard.backend.flood_prediction import FEATURE_COLUMNS
+from dashboard.backend.incremental_prediction import IncrementalPredictor
+from dashboard.backend.inference import DataLoader
+from dashboard.backend.model_registry import ModelRegistry
+
+
+def test_incremental_update_matches_full_rescore():
+    predictor = IncrementalPredictor("lstm_smote_cv_3")
+    data = DataLoader.get_instance().get_data()
+    rows = np.arange(10)
+
+    unchanged = data[["precip_1d", "precip_3d"]].to_numpy()[rows]
+    predictor.update_precipitation(unchanged[:, 0], unchanged[:, 1], rows=rows)
+    assert predictor.last_update_info["rows_rescored"] == 0
+
+    result = predictor.update_precipitation(unchanged[:, 0] + 50, unchanged[:, 1] + 80, rows=rows)
+    assert predictor.last_update_info["rows_rescored"] == 10
+
+    raw = data[FEATURE_COLUMNS].copy()
+    raw.loc[rows, "precip_1d"] += 50
+    raw.loc[rows, "precip_3d"] += 80
+    expected = ModelRegistry.get_instance().get("lstm_smote_cv_3").predict_proba(
+        DataLoader.get_instance().scale_features(raw)
+    )
+    np.testing.assert_allclose(result.probabilities, expected, atol=1e-5)
+
+
+def test_base_is_rescored_when_the_dataset_changes(tmp_path, monkeypatch):
+    cache_root = str(tmp_path / "cache")
+    monkeypatch.setattr(
+        inference, "read_csv_cached",
+        lambda path, _read=inference.read_csv_cached: _read(path, cache_root),
+    )
+    csv_path = str(tmp_path / "data.csv")
+    source = DataLoader.get_instance().get_data().iloc[:50].reset_index(drop=True)
+    source.to_csv(csv_path, index=False)
+
+    data_loader = DataLoader()
+    data_loader.load_data(csv_path)
+    predictor = IncrementalPredictor("lstm_smote_cv_3", data_loader)
+    before = predictor.result()
+    assert predictor.result() is before
+
+    wetter = source.copy()
+    wetter["precip_1d"] += 50
+    wetter["precip_3d"] += 80
+    stat = os.stat(csv_path)
+    wetter.to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    after = predictor.result()
+    assert after is not before and predictor.version == 1
+    expected = ModelRegistry.get_instance().get("lstm_smote_cv_3").predict_proba(
+        data_loader.get_feature_matrix()
+    )
+    np.testing.assert_allclose(after.probabilities, expected, atol=1e-5)
+    assert not np.allclose(after.probabilities, before.probabilities)
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from dashboard.backend.inference_executor import InferenceExecutor
+
+
+def _add(a, b, scale=1):
+    return (a + b) * scale
+
+
+def _fail():
+    raise ValueError("model exploded")
+
+
+def test_run_returns_the_result_from_a_worker_thread():
+    executor = InferenceExecutor(mode="thread", workers=1, queue_depth=2)
+
+    async def main():
+        return await executor.run(_add, 2, 3, scale=10), await executor.run(threading.current_thread)
+
+    try:
+        total, worker = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert total == 50
+    assert worker.name.startswith("inference")
+    assert executor.pending == 0
+
+
+def test_exceptions_propagate_and_release_the_slot():
+    executor = InferenceExecutor(mode="thread", workers=1, queue_depth=1)
+
+    async def main():
+        with pytest.raises(ValueError, match="model exploded"):
+            await executor.run(_fail)
+        return await executor.run(_add, 1, 1)
+
+    try:
+        assert asyncio.run(main()) == 2
+    finally:
+        executor.shutdown()
+    assert executor.pending == 0
+
+
+def test_jobs_beyond_the_queue_depth_are_rejected():
+    executor = InferenceExecutor(mode="thread", workers=1, queue_depth=2)
+    release = threading.Event()
+
+    async def main():
+        blocked = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.pending == 2
+        with pytest.raises(RuntimeError, match="queue is full"):
+            await executor.run(_add, 1, 1)
+
+        release.set()
+        assert await asyncio.gather(*blocked) == [True, True]
+        return await executor.run(_add, 1, 1)
+
+    try:
+        assert asyncio.run(main()) == 2
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.pending == 0
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="fiber")
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="thread", workers=0)
+
+
+def test_process_mode_leaves_model_loading_to_the_workers(monkeypatch):
+    from dashboard.backend.inference import await_model
+    from dashboard.backend.model_registry import ModelRegistry
+
+    executor = InferenceExecutor(mode="process", workers=1)
+    monkeypatch.setattr(InferenceExecutor, "_instance", executor)
+    loads = []
+    monkeypatch.setattr(ModelRegistry.get_instance(), "load_async", loads.append)
+
+    asyncio.run(await_model("lstm_smote_cv_3"))
+    assert loads == []
+    with pytest.raises(KeyError):
+        asyncio.run(await_model("missing"))
+    executor.shutdown()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import numpy as np
+from dashboard.backend import FloodPredictionModel
+from dashboard.backend.model_artifacts import artifact_paths, load_frozen_graph
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "models", "lstm_smote_cv.h5"
+)
+
+
+def _load(model_path, cache_root) -> FloodPredictionModel:
+    model = FloodPredictionModel()
+    model.artifact_dir = str(cache_root)
+    model.load_if_needed(str(model_path))
+    return model
+
+
+def test_artifact_is_written_once_and_matches_keras(tmp_path):
+    cache_root = tmp_path / "cache"
+    keras_model = _load(MODEL_PATH, cache_root)
+    assert keras_model.get_model_info()["artifact"] is None
+    graph_path, meta_path = artifact_paths(MODEL_PATH, str(cache_root))
+    assert os.path.exists(graph_path) and os.path.exists(meta_path)
+
+    cached_model = _load(MODEL_PATH, cache_root)
+    info = cached_model.get_model_info()
+    assert info["artifact"] == graph_path
+    assert info["input_shape"] == keras_model.get_model_info()["input_shape"]
+
+    data = np.random.default_rng(0).standard_normal((300, 12)).astype(np.float32)
+    np.testing.assert_allclose(
+        cached_model.predict_proba(data), keras_model.predict_proba(data), atol=1e-6
+    )
+
+
+def test_changed_model_file_misses_the_cache(tmp_path):
+    cache_root = tmp_path / "cache"
+    model_path = tmp_path / "model.h5"
+    shutil.copy(MODEL_PATH, model_path)
+    _load(model_path, cache_root)
+    assert load_frozen_graph(str(model_path), str(cache_root)) is not None
+
+    with open(model_path, "ab") as f:
+        f.write(b"\0")
+    assert load_frozen_graph(str(model_path), str(cache_root)) is None
+    assert load_frozen_graph(str(model_path), "") is None
+
+
+def test_truncated_artifact_falls_back_to_the_h5(tmp_path):
+    cache_root = tmp_path / "cache"
+    keras_model = _load(MODEL_PATH, cache_root)
+    graph_path, _ = artifact_paths(MODEL_PATH, str(cache_root))
+    with open(graph_path, "rb") as f:
+        graph = f.read()
+    with open(graph_path, "wb") as f:
+        f.write(graph[: len(graph) // 2])
+
+    model = _load(MODEL_PATH, cache_root)
+    assert model.is_loaded and model.get_model_info()["artifact"] is None
+    data = np.random.default_rng(0).standard_normal((50, 12)).astype(np.float32)
+    np.testing.assert_allclose(model.predict_proba(data), keras_model.predict_proba(data), atol=1e-6)
+
+    # The corrupt artifact was replaced by a fresh export.
+    assert os.path.getsize(graph_path) > len(graph) // 2
+    assert load_frozen_graph(MODEL_PATH, str(cache_root)) is not None
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+from dashboard.backend import model_registry
+from dashboard.backend.model_registry import ModelRegistry, ModelSpec
+
+
+MB = 2**20
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A registry of fake models that each grow resident memory by 100 MB."""
+    resident = {"bytes": 0}
+    built = []
+
+    def build_model(spec):
+        built.append(spec.model_id)
+        resident["bytes"] += 100 * MB
+        return object()
+
+    monkeypatch.setattr(model_registry, "_resident_bytes", lambda: resident["bytes"])
+    monkeypatch.setattr(ModelRegistry, "_build_model", staticmethod(build_model))
+    monkeypatch.setattr(ModelRegistry, "_import_backend", staticmethod(lambda backend: None))
+
+    registry = ModelRegistry(memory_budget_mb=350)
+    registry.default_model_id = "default"
+    for model_id in ("default", "a", "b", "c"):
+        registry.register(ModelSpec(model_id, f"{model_id}.h5"))
+    registry.built = built
+    registry.resident = resident
+    return registry
+
+
+def test_footprint_is_the_resident_growth_of_the_load(registry):
+    registry.get("a")
+    info = registry.get_registry_info()
+    assert info["footprint_bytes"] == 100 * MB
+
+
+def test_runtime_import_is_not_charged_to_the_first_model(registry, monkeypatch):
+    def import_backend(backend):
+        registry.resident["bytes"] += 400 * MB
+
+    monkeypatch.setattr(ModelRegistry, "_import_backend", staticmethod(import_backend))
+    registry.get("default")
+    registry.get("a")
+
+    assert registry._footprints == {"default": 100 * MB, "a": 100 * MB}
+    assert registry.get_registry_info()["runtime_bytes"] == {"keras": 400 * MB}
+    assert registry.get_registry_info()["loaded"] == ["default", "a"]
+
+
+def test_least_recently_used_model_is_evicted_first(registry):
+    registry.get("default")
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    # "b" was used less recently than "a"; the default model is never evicted.
+    assert registry.get_registry_info()["loaded"] == ["default", "a", "c"]
+
+    registry.get("b")
+    assert registry.get_registry_info()["loaded"] == ["default", "c", "b"]
+    assert registry.get_registry_info()["footprint_bytes"] <= registry.memory_budget_bytes
+
+
+def test_concurrent_loads_share_one_future(registry, monkeypatch):
+    release = threading.Event()
+    build_model = ModelRegistry._build_model
+
+    def slow_build(spec):
+        release.wait(timeout=5)
+        return build_model(spec)
+
+    monkeypatch.setattr(ModelRegistry, "_build_model", staticmethod(slow_build))
+    first = registry.load_async("a")
+    second = registry.load_async("a")
+    assert first is second
+    assert registry.get_registry_info()["loading"] == ["a"]
+
+    release.set()
+    assert first.result(timeout=5) is second.result(timeout=5)
+    assert registry.built == ["a"]
+    assert registry.is_loaded("a") and registry.get_registry_info()["loading"] == []
+
+
+def test_switching_to_an_unknown_model_fails_without_side_effects(registry):
+    registry.get("default")
+    with pytest.raises(KeyError):
+        registry.load_async("missing")
+
+    info = registry.get_registry_info()
+    assert info["default_model_id"] == "default"
+    assert info["loaded"] == ["default"] and info["loading"] == []
+
+
+def test_model_status_records_load_failures(registry, monkeypatch):
+    def broken_build(spec):
+        raise RuntimeError("Failed to load model: truncated file")
+
+    assert registry.model_status("a")["status"] == "pending"
+    monkeypatch.setattr(ModelRegistry, "_build_model", staticmethod(broken_build))
+    with pytest.raises(RuntimeError):
+        registry.load_async("a").result(timeout=5)
+
+    status = registry.model_status("a")
+    assert status["status"] == "failed" and "truncated" in status["error"]
+    assert status["seconds"] is not None
+    assert registry.model_status("missing")["status"] == "failed"
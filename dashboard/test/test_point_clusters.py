@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from dashboard.backend.point_clusters import ClusterIndex, ClusterRegistry
+from dashboard.backend.prediction_result import PredictionResult
+from dashboard.backend.vector_tiles import TileRunRegistry, project
+
+
+def _points(count=20000):
+    rng = np.random.default_rng(0)
+    coordinates = np.column_stack([rng.uniform(-6.5, -2.0, count), rng.uniform(119.0, 121.5, count)])
+    return coordinates, rng.random(count, dtype=np.float32)
+
+
+def test_levels_nest_and_keep_every_point():
+    coordinates, probabilities = _points()
+    index = ClusterIndex(coordinates, probabilities, max_zoom=10, cell_px=64)
+
+    assert [level.zoom for level in index.levels] == list(range(11))
+    for level in index.levels:
+        assert level.counts.sum() == len(coordinates)
+        assert np.all(np.diff(level.keys) > 0)
+    # Each cluster's maximum is the maximum of the points in its cell.
+    finest = index.levels[-1]
+    cells = np.clip((project(coordinates) * finest.side).astype(np.int64), 0, finest.side - 1)
+    keys = cells[:, 1] * finest.side + cells[:, 0]
+    expected = np.full(len(finest), -1.0, dtype=np.float32)
+    np.maximum.at(expected, np.searchsorted(finest.keys, keys), probabilities)
+    assert np.array_equal(finest.max_probability, expected)
+
+
+@pytest.mark.parametrize("zoom", [3, 7, 10])
+def test_viewport_query_matches_cell_filter(zoom):
+    coordinates, probabilities = _points()
+    index = ClusterIndex(coordinates, probabilities, max_zoom=10, cell_px=64)
+    west, south, east, north = 119.6, -4.9, 120.4, -3.7
+
+    view = index.query(zoom + 0.7, west, south, east, north)
+    level = index.levels[zoom]
+    (x0, y0), (x1, y1) = np.floor(project([[north, west], [south, east]]) * level.side).astype(np.int64)
+    inside = (level.cell_x >= x0) & (level.cell_x <= x1) & (level.cell_y >= y0) & (level.cell_y <= y1)
+    assert view.zoom == zoom
+    assert np.array_equal(view.keys, level.keys[inside])
+
+    payload = view.to_dict()
+    assert len(payload["points"]) == 2 * len(payload["counts"]) == 2 * len(view)
+
+
+def test_cell_size_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        ClusterIndex(np.zeros((1, 2)), np.zeros(1), cell_px=48)
+
+
+def test_registry_rebuilds_after_republish():
+    runs = TileRunRegistry.get_instance()
+    clusters = ClusterRegistry(max_indexes=2)
+    coordinates = np.array([[-4.5, 119.5], [-4.5001, 119.5001]])
+
+    run_id = runs.publish(("cluster-test",), PredictionResult(coordinates, np.array([0.9, 0.2], np.float32)))
+    assert clusters.get(run_id, 0.5).point_count == 1
+    assert clusters.get(run_id, 0.5) is clusters.get(run_id, 0.5)
+    assert clusters.get(run_id, 0.1).point_count == 2
+
+    runs.publish(("cluster-test",), PredictionResult(coordinates, np.array([0.9, 0.9], np.float32)))
+    assert clusters.get(run_id, 0.5).point_count == 2
+    assert clusters.get("unknown-run", 0.5) is None
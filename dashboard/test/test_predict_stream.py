@@ -0,0 +1,25 @@
+import os
+import numpy as np
+from dashboard.backend import FloodPredictionModel
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "models", "lstm_smote_cv.h5"
+)
+
+
+def test_predict_stream_matches_predict():
+    model = FloodPredictionModel.get_instance()
+    model.load_if_needed(MODEL_PATH)
+
+    data = np.random.rand(100, 12).astype(np.float32)
+    chunks = (data[start:start + 30] for start in range(0, len(data), 30))
+
+    previous_batch_size = model.batch_size
+    model.set_batch_size(8)
+    try:
+        streamed = list(model.predict_stream(chunks))
+    finally:
+        model.set_batch_size(previous_batch_size)
+
+    assert [len(chunk) for chunk in streamed] == [30, 30, 30, 10]
+    assert sum(streamed, []) == model.predict(data)
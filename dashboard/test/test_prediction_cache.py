@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+from dashboard.backend.prediction_cache import PredictionCache, file_fingerprint
+from dashboard.backend.prediction_result import PredictionResult
+
+
+def _result(count=20000):
+    return PredictionResult(np.zeros((count, 2)), np.zeros(count, dtype=np.float32))
+
+
+def _rewrite(path, content):
+    stat = os.stat(path) if path.exists() else None
+    path.write_bytes(content)
+    if stat is not None:
+        # Same-second rewrites on coarse-mtime filesystems must still look changed.
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    cache = PredictionCache(max_mb=1)
+    first, second, third = _result(), _result(), _result()
+
+    cache.put("first", first)
+    cache.put("second", second)
+    assert cache.get("first") is first
+    cache.put("third", third)
+
+    # Two 400 KB results fit in 1 MB; "second" was used least recently.
+    assert cache.get("second") is None
+    assert cache.get("first") is first and cache.get("third") is third
+    info = cache.get_cache_info()
+    assert info["entries"] == 2 and info["size_bytes"] == first.nbytes + third.nbytes
+
+    cache.put("too-large", _result(60000))
+    assert cache.get("too-large") is None and cache.get_cache_info()["entries"] == 2
+
+
+def test_key_changes_when_the_model_or_dataset_changes(tmp_path):
+    model, scaler, data = tmp_path / "model.h5", tmp_path / "scaler.pkl", tmp_path / "data.csv"
+    _rewrite(model, b"weights v1")
+    _rewrite(scaler, b"scaler")
+    _rewrite(data, b"a,b\n1,2\n")
+
+    key = PredictionCache.make_key(str(model), "keras:none", str(scaler), str(data))
+    assert PredictionCache.make_key(str(model), "keras:none", str(scaler), str(data)) == key
+    assert PredictionCache.make_key(str(model), "tflite:none", str(scaler), str(data)) != key
+
+    _rewrite(model, b"weights v2")
+    model_key = PredictionCache.make_key(str(model), "keras:none", str(scaler), str(data))
+    assert model_key[0] != key[0] and model_key[1:] == key[1:]
+
+    _rewrite(data, b"a,b\n1,3\n")
+    data_key = PredictionCache.make_key(str(model), "keras:none", str(scaler), str(data))
+    assert data_key[2] != model_key[2] and data_key[:2] == model_key[:2]
+    assert data_key[2] == file_fingerprint(str(data))
@@ -0,0 +1,20 @@
+import numpy as np
+from dashboard.backend.prediction_result import PredictionResult, flat_coordinates
+
+
+def test_rethreshold_and_top_k():
+    coordinates = np.array([[-5.0, 119.0], [-4.0, 120.0], [-3.0, 121.0], [-2.0, 122.0]])
+    probabilities = np.array([0.2, 0.9, 0.5, 0.7], dtype=np.float32)
+    result = PredictionResult(coordinates, probabilities)
+
+    assert result.flood_points(0.5).tolist() == [[-4.0, 120.0], [-3.0, 121.0], [-2.0, 122.0]]
+    assert result.flood_count(0.8) == 1
+    assert result.top_k_indices(2).tolist() == [1, 3]
+    assert result.top_k_points(10).shape == (4, 2)
+    assert not result.probabilities.flags.writeable, "Shared results must be read-only"
+
+
+def test_flat_coordinates_interleave_lat_lon():
+    coordinates = np.array([[-5.123456789, 119.0], [-4.0, 120.987654321]])
+    assert flat_coordinates(coordinates) == [-5.123457, 119.0, -4.0, 120.987654]
+    assert flat_coordinates(np.empty((0, 2))) == []
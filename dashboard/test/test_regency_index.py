@@ -0,0 +1,79 @@
+import json
+import numpy as np
+from dashboard.backend.boundaries import RegencyBoundaries
+from dashboard.backend.prediction_result import PredictionResult
+from dashboard.backend.regency_index import RegencyIndex, UNASSIGNED, summarize_labels
+
+# West: unit square with a hole; east: the square to its right plus a separate island.
+WEST = [[[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]], [[0.2, 0.2], [0.2, 0.4], [0.4, 0.4], [0.4, 0.2], [0.2, 0.2]]]]
+EAST = [
+    [[[1, 0], [2, 0], [2, 1], [1, 1], [1, 0]]],
+    [[[3, 0], [3.5, 0.5], [3, 1], [3, 0]]],
+]
+
+
+def _boundaries(tmp_path) -> RegencyBoundaries:
+    geojson_dir = tmp_path / "geojson"
+    geojson_dir.mkdir()
+    for name, coordinates in (("0_west", WEST), ("1_east", EAST)):
+        with open(geojson_dir / f"{name}.geojson", "w") as f:
+            json.dump({"type": "MultiPolygon", "coordinates": coordinates}, f)
+    return RegencyBoundaries(str(geojson_dir), str(tmp_path / "cache"), zoom_levels=[14])
+
+
+def _expected(lon, lat):
+    if 0.2 < lon < 0.4 and 0.2 < lat < 0.4:
+        return UNASSIGNED
+    if 0 < lon < 1 and 0 < lat < 1:
+        return 0
+    if 1 < lon < 2 and 0 < lat < 1:
+        return 1
+    if 3 < lon and abs(lat - 0.5) < 0.5 - (lon - 3):
+        return 1
+    return UNASSIGNED
+
+
+def test_bulk_assignment_matches_point_by_point(tmp_path):
+    index = RegencyIndex(_boundaries(tmp_path).level(14), edges_per_slab=1)
+
+    rng = np.random.default_rng(0)
+    lonlat = np.column_stack([rng.uniform(-0.5, 4.0, 20000), rng.uniform(-0.5, 1.5, 20000)])
+    # Keep clear of the edges, where float rounding may go either way.
+    margin = np.min(np.abs(lonlat[:, :, None] - np.array([0, 0.2, 0.4, 1, 2, 3])), axis=2)
+    lonlat = lonlat[margin.min(axis=1) > 1e-3]
+
+    labels = index.assign(lonlat[:, ::-1], chunk_rows=777)
+    expected = np.array([_expected(lon, lat) for lon, lat in lonlat])
+    assert np.array_equal(labels, expected)
+
+
+def test_summary_counts_flood_points_per_regency(tmp_path):
+    boundaries = _boundaries(tmp_path)
+    index = RegencyIndex(boundaries.level(14))
+    coordinates = np.array([[0.5, 0.5], [0.9, 0.9], [0.3, 0.3], [0.5, 1.5], [0.5, 3.1], [5, 5]])
+    probabilities = np.array([0.9, 0.1, 0.9, 0.9, 0.9, 0.9], dtype=np.float32)
+
+    labels = index.assign(coordinates)
+    assert labels.tolist() == [0, 0, UNASSIGNED, 1, 1, UNASSIGNED]
+
+    points = np.bincount(labels[labels != UNASSIGNED], minlength=index.regency_count)
+    summaries = summarize_labels(
+        labels, points, PredictionResult(coordinates, probabilities), 0.5, boundaries.regencies
+    )
+    assert [(s.name, s.points, s.flood_count, s.flood_ratio) for s in summaries] == [
+        ("East", 2, 2, 1.0),
+        ("West", 2, 1, 0.5),
+    ]
+
+
+def test_missing_boundary_files_give_an_empty_summary(tmp_path, monkeypatch):
+    from dashboard.backend import inference
+    from dashboard.backend.regency_index import RegencyAggregator
+
+    (tmp_path / "empty").mkdir()
+    boundaries = RegencyBoundaries(geojson_dir=str(tmp_path / "empty"), cache_root=str(tmp_path / "cache"))
+    monkeypatch.setattr(RegencyAggregator, "_instance", RegencyAggregator(boundaries))
+
+    result = PredictionResult(np.array([[0.5, 0.5]]), np.array([0.9], np.float32))
+    assert inference._regency_summary(result, 0.5) == []
+    inference._warm_regency_labels()
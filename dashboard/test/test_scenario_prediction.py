@@ -0,0 +1,31 @@
+import numpy as np
+from dashboard.backend.flood_prediction import FEATURE_COLUMNS
+from dashboard.backend.inference import DataLoader
+from dashboard.backend.model_registry import ModelRegistry
+from dashboard.backend.scenario_prediction import RainfallScenario, predict_scenarios
+
+
+def test_batched_scenarios_match_individual_predictions():
+    scenarios = [RainfallScenario.from_total_3d(total) for total in (0, 90, 300)]
+    data = DataLoader.get_instance().get_data()
+
+    # A small batch limit forces the scenarios into separate model calls.
+    for max_batch_rows in (10 ** 9, len(data)):
+        results = predict_scenarios(scenarios, "lstm_smote_cv_3", max_batch_rows=max_batch_rows)
+        assert [result.scenario for result in results] == scenarios
+
+        for scenario, scenario_result in zip(scenarios, results):
+            raw = data[FEATURE_COLUMNS].copy()
+            raw["precip_1d"] = scenario.precip_1d
+            raw["precip_3d"] = scenario.precip_3d
+            expected = ModelRegistry.get_instance().get("lstm_smote_cv_3").predict_proba(
+                DataLoader.get_instance().scale_features(raw)
+            )
+            np.testing.assert_allclose(scenario_result.result.probabilities, expected, atol=1e-5)
+
+
+def test_from_total_3d_splits_evenly():
+    scenario = RainfallScenario.from_total_3d(150)
+    assert scenario.precip_3d == 150
+    assert scenario.precip_1d == 50
+    assert predict_scenarios([]) == []
@@ -0,0 +1,31 @@
+import numpy as np
+from dashboard.backend.inference import DataLoader
+from dashboard.backend.model_registry import ModelRegistry
+from dashboard.backend.sharded_inference import ShardedInferencePool
+
+
+def test_sharded_predictions_match_single_process():
+    features = DataLoader.get_instance().get_feature_matrix()[:999]
+    expected = ModelRegistry.get_instance().get("lstm_smote_cv_3").predict_proba(features)
+
+    pool = ShardedInferencePool(workers=2, model_id="lstm_smote_cv_3")
+    try:
+        probabilities = pool.predict_proba(features)
+        np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+
+        # A read-only matrix is copied into shared memory once and reused ...
+        block = pool._input_block
+        assert block is not None
+        np.testing.assert_allclose(pool.predict_proba(features), expected, atol=1e-6)
+        assert pool._input_block is block
+
+        # ... until another matrix is scored; writable inputs are never kept.
+        changed = features[::-1].copy()
+        changed.setflags(write=False)
+        np.testing.assert_allclose(pool.predict_proba(changed), expected[::-1], atol=1e-6)
+        assert pool._input_block is not block and pool._input_source is changed
+        np.testing.assert_allclose(pool.predict_proba(features.copy()), expected, atol=1e-6)
+        assert pool._input_source is changed
+    finally:
+        pool.shutdown()
+    assert pool._input_block is None
@@ -0,0 +1,59 @@
+import os
+import shutil
+import threading
+import numpy as np
+from dashboard.backend import FloodPredictionModel, TFLiteFloodModel
+from dashboard.backend.tflite_backend import check_parity, tflite_cache_path
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "models", "lstm_smote_cv.h5"
+)
+
+
+def test_tflite_matches_keras(tmp_path):
+    model_path = tmp_path / "lstm_smote_cv.h5"
+    shutil.copy(MODEL_PATH, model_path)
+
+    keras_model = FloodPredictionModel.get_instance()
+    keras_model.load_if_needed(MODEL_PATH)
+
+    tflite_model = TFLiteFloodModel.get_instance()
+    assert tflite_model is not keras_model, "Backends must not share a singleton"
+    tflite_model.load_if_needed(str(model_path))
+    assert tflite_cache_path(model_path).exists(), "Flatbuffer should be cached"
+
+    data = np.random.randn(256, 12).astype(np.float32)
+    parity = check_parity(keras_model, tflite_model, data)
+    assert parity["max_abs_diff"] < 1e-4
+    assert parity["class_agreement"] == 1.0
+    assert tflite_model.predict(data) == keras_model.predict(data)
+
+
+def test_switching_quantization_never_interrupts_predictions(tmp_path):
+    model_path = tmp_path / "lstm_smote_cv.h5"
+    shutil.copy(MODEL_PATH, model_path)
+    tflite_model = TFLiteFloodModel()
+    tflite_model.load_if_needed(str(model_path))
+
+    data = np.random.randn(64, 12).astype(np.float32)
+    done, errors = threading.Event(), []
+
+    def predict_until_done():
+        while not done.is_set():
+            try:
+                assert tflite_model.is_loaded
+                assert len(tflite_model.predict_proba(data)) == len(data)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    thread = threading.Thread(target=predict_until_done)
+    thread.start()
+    try:
+        for quantization in ("dynamic", "none", "dynamic"):
+            tflite_model.load_if_needed(str(model_path), quantization=quantization)
+            assert tflite_model.quantization == quantization
+    finally:
+        done.set()
+        thread.join()
+    assert errors == []
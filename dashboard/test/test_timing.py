@@ -0,0 +1,47 @@
+import asyncio
+import json
+import threading
+
+from dashboard.backend.inference_executor import InferenceExecutor
+from dashboard.backend.timing import SpanRecorder, span
+
+
+def test_spans_feed_histograms_and_trace(tmp_path):
+    recorder = SpanRecorder()
+    for _ in range(3):
+        with recorder.span("outer"):
+            with recorder.span("inner"):
+                pass
+
+    histograms = recorder.get_histograms()
+    assert histograms["outer"]["count"] == 3
+    assert sum(histograms["inner"]["buckets"].values()) == 3
+    assert histograms["outer"]["max_ms"] >= histograms["inner"]["max_ms"]
+
+    events = recorder.get_trace()["traceEvents"]
+    assert [event["args"]["parent"] for event in events if event["name"] == "inner"] == ["outer"] * 3
+
+    path = recorder.dump_trace(str(tmp_path / "trace.json"))
+    assert len(json.load(open(path))["traceEvents"]) == 6
+
+
+def test_spans_in_executor_jobs_keep_their_parent(monkeypatch):
+    recorder = SpanRecorder()
+    monkeypatch.setattr(SpanRecorder, "_instance", recorder)
+    executor = InferenceExecutor(mode="thread", workers=1, queue_depth=1)
+
+    def job():
+        with span("job"):
+            return threading.current_thread().name
+
+    async def main():
+        with span("handler"):
+            return await executor.run(job)
+
+    try:
+        assert asyncio.run(main()).startswith("inference")
+    finally:
+        executor.shutdown()
+
+    parents = {event["name"]: event.get("args", {}).get("parent") for event in recorder.get_trace()["traceEvents"]}
+    assert parents == {"job": "handler", "handler": None}
@@ -0,0 +1,31 @@
+import os
+import numpy as np
+from dashboard.backend import FloodPredictionModel
+
+MODEL_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "models", "lstm_smote_cv.h5"
+)
+
+
+def test_predict_reuses_one_traced_graph(monkeypatch):
+    # A fresh singleton that loads through Keras, not from the frozen-graph cache.
+    monkeypatch.setattr(FloodPredictionModel, "_instance", None)
+    model = FloodPredictionModel.get_instance()
+    model.artifact_dir = ""
+    model.load_if_needed(MODEL_PATH)
+
+    infer = model._infer
+    assert model.get_model_info()["warmup_seconds"] is not None
+    # Warm-up (two batch sizes) traced the (None, 1, n_features) signature exactly once.
+    assert infer.experimental_get_tracing_count() == 1
+
+    def keras_predict(*args, **kwargs):
+        raise AssertionError("predict must not go through keras.Model.predict")
+
+    monkeypatch.setattr(model._model, "predict", keras_predict)
+    model.set_batch_size(64)
+    for rows in (1, 7, 64, 150):
+        assert len(model.predict(np.random.rand(rows, 12).astype(np.float32))) == rows
+
+    # Still the one concrete function: no retrace for any batch length.
+    assert infer.experimental_get_tracing_count() == 1
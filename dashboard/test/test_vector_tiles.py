@@ -0,0 +1,139 @@
+import json
+import numpy as np
+from config import TILE_EXTENT
+from dashboard.backend.boundaries import RegencyBoundaries
+from dashboard.backend.prediction_result import PredictionResult
+from dashboard.backend.vector_tiles import (
+    BoundaryTiles, PointTileIndex, TileCache, TileRunRegistry, encode_point_tile, project,
+)
+
+
+def _varint(data, i):
+    value = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, i
+
+
+def _fields(data):
+    i, fields = 0, []
+    while i < len(data):
+        key, i = _varint(data, i)
+        if key & 7 == 0:
+            value, i = _varint(data, i)
+        elif key & 7 == 2:
+            length, i = _varint(data, i)
+            value, i = data[i:i + length], i + length
+        else:
+            value, i = np.frombuffer(data[i:i + 8], "<f8")[0], i + 8
+        fields.append((key >> 3, value))
+    return fields
+
+
+def _packed(data):
+    i, values = 0, []
+    while i < len(data):
+        value, i = _varint(data, i)
+        values.append(value)
+    return values
+
+
+def _decode(tile):
+    """{layer: (extent, [(properties, [[(x, y), ...], ...]), ...])} of an MVT."""
+    layers = {}
+    for _, layer in _fields(tile):
+        fields = _fields(layer)
+        keys = [value.decode() for number, value in fields if number == 3]
+        values = []
+        for number, value in fields:
+            if number == 4:
+                (kind, raw), = _fields(value)
+                values.append(raw.decode() if kind == 1 else raw)
+        features = []
+        for number, value in fields:
+            if number != 2:
+                continue
+            feature = dict(_fields(value))
+            tags = _packed(feature[2])
+            properties = {keys[tags[j]]: values[tags[j + 1]] for j in range(0, len(tags), 2)}
+            commands, x, y, j, rings = _packed(feature[4]), 0, 0, 0, []
+            while j < len(commands):
+                command, count = commands[j] & 7, commands[j] >> 3
+                j += 1
+                if command == 1:
+                    rings.append([])
+                for _ in range(count if command != 7 else 0):
+                    x += (commands[j] >> 1) ^ -(commands[j] & 1)
+                    y += (commands[j + 1] >> 1) ^ -(commands[j + 1] & 1)
+                    j += 2
+                    rings[-1].append((x, y))
+            features.append((properties, rings))
+        name = [value for number, value in fields if number == 1][0].decode()
+        layers[name] = ([value for number, value in fields if number == 5][0], features)
+    return layers
+
+
+def _tile_of(coordinate, z):
+    x, y = (project(np.array([coordinate]))[0] * (1 << z)).astype(int)
+    return x, y
+
+
+def test_point_tile_holds_points_above_threshold():
+    rng = np.random.default_rng(0)
+    coordinates = np.column_stack([rng.uniform(-6, -2, 5000), rng.uniform(119, 121, 5000)])
+    probabilities = rng.random(5000, dtype=np.float32)
+    index = PointTileIndex(coordinates, probabilities)
+    z = 9
+    x, y = _tile_of(coordinates[0], z)
+
+    extent, features = _decode(encode_point_tile(index, z, x, y, threshold=0.5))["flood"]
+    assert extent == TILE_EXTENT
+
+    local = (project(coordinates) * (1 << z) - [x, y]) * TILE_EXTENT
+    expected = np.all((local >= 0) & (local < TILE_EXTENT), axis=1) & (probabilities >= 0.5)
+    decoded = np.array([point for _, rings in features for ring in rings for point in ring])
+    inside = np.all((decoded >= 0) & (decoded < TILE_EXTENT), axis=1)
+    assert inside.sum() == expected.sum() > 0
+    assert all(properties["probability"] >= 0.5 for properties, _ in features)
+
+
+def test_boundary_tile_clips_regency_polygons(tmp_path):
+    geojson_dir = tmp_path / "geojson"
+    geojson_dir.mkdir()
+    square = [[[[119.0, -5.0], [120.0, -5.0], [120.0, -4.0], [119.0, -4.0], [119.0, -5.0]]]]
+    with open(geojson_dir / "0_square.geojson", "w") as f:
+        json.dump({"type": "MultiPolygon", "coordinates": square}, f)
+    tiles = BoundaryTiles(RegencyBoundaries(str(geojson_dir), str(tmp_path / "cache"), zoom_levels=[6, 10]))
+
+    x, y = _tile_of([-4.5, 119.5], 10)
+    extent, features = _decode(tiles.encode(10, x, y))["boundaries"]
+    (properties, rings), = features
+    assert properties["name"] == "Square"
+    # The tile lies inside the square, so the clipped ring is the buffered tile itself.
+    ring = np.array(rings[0])
+    assert ring.min() < 0 and ring.max() > extent
+
+    x, y = _tile_of([-10.0, 110.0], 10)
+    assert _decode(tiles.encode(10, x, y))["boundaries"][1] == []
+
+
+def test_republishing_a_run_drops_its_cached_tiles():
+    registry = TileRunRegistry(max_runs=1)
+    coordinates = np.array([[-4.5, 119.5]])
+    run_id = registry.publish(("test", 1), PredictionResult(coordinates, np.array([0.9], np.float32)))
+    x, y = _tile_of(coordinates[0], 8)
+
+    first = registry.point_tile(run_id, 8, x, y, threshold=0.5)
+    assert len(_decode(first)["flood"][1]) == 1
+    assert TileCache.get_instance().get((run_id, 0.5, 8, x, y)) == first
+
+    registry.publish(("test", 1), PredictionResult(coordinates, np.array([0.1], np.float32)))
+    assert _decode(registry.point_tile(run_id, 8, x, y, threshold=0.5))["flood"][1] == []
+
+    registry.publish(("test", 2), PredictionResult(coordinates, np.array([0.9], np.float32)))
+    assert not registry.is_published(run_id)
+    assert registry.point_tile(run_id, 8, x, y, threshold=0.5) is None
@@ -0,0 +1,239 @@
+import asyncio
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from config import CLUSTER_MAX_ZOOM
+from dashboard.backend import inference
+from dashboard.backend.inference import DataLoader, MapState
+from dashboard.backend.prediction_cache import PredictionCache
+from dashboard.backend.prediction_result import PredictionResult
+from dashboard.backend.vector_tiles import PointTileIndex, TileRunRegistry, project, run_id_for
+from dashboard.backend.viewport_points import (
+    GROUND_TRUTH_RUN_ID,
+    ViewportPoints,
+    publish_ground_truth,
+    quantize_view,
+    tile_range_positions,
+)
+
+
+def _result(count=20000):
+    rng = np.random.default_rng(0)
+    coordinates = np.column_stack([rng.uniform(-6.5, -2.0, count), rng.uniform(119.0, 121.5, count)])
+    return PredictionResult(coordinates, rng.random(count, dtype=np.float32))
+
+
+def test_quantized_view_covers_the_padded_view_and_absorbs_small_pans():
+    bounds = [119.40, -5.20, 119.55, -5.10]
+    zoom, x0, y0, x1, y1 = quantize_view(12, bounds, margin=0.25)
+    assert zoom == 12
+    (left, top), (right, bottom) = project([[-5.10 + 0.025, 119.40 - 0.0375], [-5.20 - 0.025, 119.55 + 0.0375]]) * 2**12
+    assert x0 <= left and right < x1 + 1 and y0 <= top and bottom < y1 + 1
+
+    assert quantize_view(12.4, [119.401, -5.199, 119.551, -5.099], margin=0.25) == (zoom, x0, y0, x1, y1)
+    # A province-wide view at a deep zoom falls back to coarser tiles.
+    zoom, x0, y0, x1, y1 = quantize_view(14, [116, -8, 124, -1], max_tiles=64)
+    assert zoom < 14 and (x1 - x0 + 1) * (y1 - y0 + 1) <= 64
+
+
+def test_tile_range_positions_match_a_full_scan():
+    result = _result()
+    index = PointTileIndex(result.coordinates, result.probabilities)
+    tile_range = quantize_view(10, [119.6, -4.9, 120.4, -3.7])
+
+    zoom, x0, y0, x1, y1 = tile_range
+    tiles = np.floor(index.projected * 2**zoom)
+    expected = np.flatnonzero(
+        (tiles[:, 0] >= x0) & (tiles[:, 0] <= x1) & (tiles[:, 1] >= y0) & (tiles[:, 1] <= y1)
+    )
+    assert np.array_equal(np.sort(tile_range_positions(index, tile_range)), expected)
+
+
+def test_viewport_points_follow_the_selection_and_cache_by_view():
+    result = _result()
+    viewport = ViewportPoints(max_entries=8)
+    bounds = [119.6, -4.9, 120.4, -3.7]
+
+    points, probabilities = viewport.points("viewport-test", result, ("threshold", 0.8), 10, bounds)
+    assert len(points) == 2 * len(probabilities) > 0
+    assert min(probabilities) >= 0.8
+    lat, lon = np.array(points[0::2]), np.array(points[1::2])
+    assert lon.min() > 119.0 and lat.max() < -2.0
+
+    assert viewport.points("viewport-test", result, ("threshold", 0.8), 10.2, bounds)[0] is points
+    assert viewport.get_cache_info()["hits"] == 1
+
+    top_points, top_probabilities = viewport.points("viewport-test", result, ("top_k", 50), 10, bounds)
+    riskiest = result.probabilities[result.top_k_indices(50)]
+    assert len(top_probabilities) <= 50 and min(top_probabilities) >= round(float(riskiest.min()), 2)
+
+    # The same run id with new probabilities is recomputed, not served from the cache.
+    lowered = PredictionResult(result.coordinates, result.probabilities * 0.5)
+    assert viewport.points("viewport-test", lowered, ("threshold", 0.8), 10, bounds) == ([], [])
+
+
+def test_ground_truth_is_republished_when_the_dataset_changes(tmp_path, monkeypatch):
+    cache_root = str(tmp_path / "cache")
+    monkeypatch.setattr(
+        inference, "read_csv_cached",
+        lambda path, _read=inference.read_csv_cached: _read(path, cache_root),
+    )
+    csv_path = str(tmp_path / "data.csv")
+    source = DataLoader.get_instance().get_data().iloc[:20].reset_index(drop=True)
+    source.to_csv(csv_path, index=False)
+    data_loader = DataLoader()
+    data_loader.load_data(csv_path)
+    monkeypatch.setattr(DataLoader, "_instance", data_loader)
+
+    first = publish_ground_truth()
+    assert publish_ground_truth() is first
+    assert TileRunRegistry.get_instance().result(GROUND_TRUTH_RUN_ID) is first
+
+    moved = source.assign(lat=source["lat"] + 0.5, target=1)
+    stat = os.stat(csv_path)
+    moved.to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    second = publish_ground_truth()
+    assert second is not first
+    assert TileRunRegistry.get_instance().result(GROUND_TRUTH_RUN_ID) is second
+    np.testing.assert_allclose(second.coordinates[:, 0], moved["lat"])
+    assert np.all(second.probabilities == 1)
+
+
+class _FakeMapState:
+    """Just enough of a background-event ``self`` to drive the ``MapState`` view events."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(
+            view_zoom=0.0, view_bounds=[], has_prediction=True, is_predicting=False,
+            flood_tile_run_id="viewport-state-test", top_k=0, sigmoid_threshold=0.5,
+            prediction_source="dataset", model_id="lstm_smote_cv_3", live_rainfall_fingerprint="",
+            predicted_flood_points=None, predicted_flood_probabilities=None, regency_summary=None,
+            _running_predictions=0,
+        )
+        self.__dict__.update(fields)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _rerun_prediction(self):
+        return "rerun"
+
+    _flood_view_settings = MapState._flood_view_settings
+    _show_flood_view = MapState._show_flood_view
+    _rederive_flood_points = MapState._rederive_flood_points
+    _begin_prediction = MapState._begin_prediction
+    _end_prediction = MapState._end_prediction
+
+
+def _run_event(event, state, *args):
+    async def collect():
+        return [yielded async for yielded in event.fn(state, *args)]
+
+    return asyncio.run(collect())
+
+
+def _set_viewport(state, view):
+    return _run_event(MapState.set_viewport, state, view)
+
+
+def test_set_viewport_cuts_points_off_the_loop_and_respects_running_predictions(monkeypatch):
+    result = _result()
+    monkeypatch.setattr(inference, "_cached_prediction", lambda *source: result)
+    view = {"zoom": CLUSTER_MAX_ZOOM + 1, "west": 119.6, "south": -4.9, "east": 120.4, "north": -3.7}
+
+    state = _FakeMapState(top_k=500)
+    assert _set_viewport(state, view) == []
+    assert state.view_bounds == [119.6, -4.9, 120.4, -3.7]
+    assert len(state.predicted_flood_points) == 2 * len(state.predicted_flood_probabilities) > 0
+    riskiest = result.probabilities[result.top_k_indices(500)]
+    assert min(state.predicted_flood_probabilities) >= round(float(riskiest.min()), 2)
+
+    # Threshold views are drawn from vector tiles: no points go through the state.
+    state = _FakeMapState()
+    _set_viewport(state, view)
+    assert state.predicted_flood_points == [] and state.predicted_flood_probabilities == []
+
+    # An evicted prediction is re-run, but not while one is already running.
+    monkeypatch.setattr(inference, "_cached_prediction", lambda *source: None)
+    assert _set_viewport(_FakeMapState(), view) == ["rerun"]
+    assert _set_viewport(_FakeMapState(is_predicting=True), view) == []
+
+
+def test_threshold_and_top_k_rederive_off_the_loop(monkeypatch):
+    result = _result()
+    threads = []
+
+    def cached_prediction(*source):
+        threads.append(threading.current_thread())
+        return result
+
+    monkeypatch.setattr(inference, "_cached_prediction", cached_prediction)
+    monkeypatch.setattr(inference, "_regency_summary", lambda result, threshold: [{"threshold": threshold}])
+    state = _FakeMapState(view_zoom=CLUSTER_MAX_ZOOM + 1, view_bounds=[119.6, -4.9, 120.4, -3.7])
+
+    assert _run_event(MapState.set_threshold, state, [80]) == []
+    assert state.sigmoid_threshold == 0.8 and state.regency_summary == [{"threshold": 0.8}]
+    assert state.predicted_flood_points == []
+    assert threads and threading.main_thread() not in threads
+
+    assert _run_event(MapState.show_top_k, state, 500) == []
+    assert state.top_k == 500 and 0 < len(state.predicted_flood_probabilities) <= 500
+
+    # An evicted prediction is re-run, but not while one is already running.
+    monkeypatch.setattr(inference, "_cached_prediction", lambda *source: None)
+    assert _run_event(MapState.set_threshold, state, [50]) == ["rerun"]
+    state.is_predicting = True
+    assert _run_event(MapState.show_top_k, state, 0) == []
+
+
+def test_prediction_run_derives_its_view_off_the_loop(monkeypatch):
+    result = _result()
+    cache_key = ("run-view-test",)
+    PredictionCache.get_instance().put(cache_key, result)
+    threads = []
+
+    def regency_summary(result, threshold):
+        threads.append(threading.current_thread())
+        return [{"threshold": threshold}]
+
+    monkeypatch.setattr(inference, "prediction_cache_key", lambda model_id: cache_key)
+    monkeypatch.setattr(inference, "_warm_regency_labels", lambda: None)
+    monkeypatch.setattr(inference, "_regency_summary", regency_summary)
+    state = _FakeMapState(
+        has_prediction=False, flood_tile_run_id="", prediction_source="live", top_k=500,
+        view_zoom=CLUSTER_MAX_ZOOM + 1, view_bounds=[119.6, -4.9, 120.4, -3.7],
+    )
+
+    asyncio.run(MapState.run_flood_prediction.fn(state))
+    assert state.has_prediction and state.prediction_source == "dataset"
+    assert state.flood_tile_run_id == run_id_for(cache_key)
+    assert state.regency_summary == [{"threshold": 0.5}] and state.predicted_flood_points
+    assert threads and threading.main_thread() not in threads
+    assert not state.is_predicting and state._running_predictions == 0
+
+
+def test_cache_keys_are_computed_off_the_loop(monkeypatch):
+    result = _result()
+    PredictionCache.get_instance().put(("key-thread-test",), result)
+    PredictionCache.get_instance().put(("key-thread-test", "live:abc"), result)
+    threads = []
+
+    def prediction_cache_key(model_id):
+        threads.append(threading.current_thread())
+        return ("key-thread-test",)
+
+    monkeypatch.setattr(inference, "prediction_cache_key", prediction_cache_key)
+    monkeypatch.setattr(inference, "_regency_summary", lambda result, threshold: [])
+    view = {"zoom": CLUSTER_MAX_ZOOM + 1, "west": 119.6, "south": -4.9, "east": 120.4, "north": -3.7}
+
+    _run_event(MapState.set_threshold, _FakeMapState(), [70])
+    _run_event(MapState.show_top_k, _FakeMapState(prediction_source="live", live_rainfall_fingerprint="abc"), 3)
+    _set_viewport(_FakeMapState(), view)
+    assert len(threads) == 3 and threading.main_thread() not in threads
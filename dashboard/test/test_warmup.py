@@ -0,0 +1,28 @@
+from dashboard.backend.model_registry import ModelRegistry
+from dashboard.backend.warmup import WarmupManager
+
+
+def test_warmup_reports_every_artifact():
+    manager = WarmupManager(model_ids=["lstm_smote_cv_3", "does_not_exist"])
+    manager.run()
+    info = manager.get_warmup_info()
+
+    statuses = {artifact["name"]: artifact["status"] for artifact in info["artifacts"]}
+    assert statuses["feature_matrix"] == "ready"
+    assert statuses["dummy_batch:lstm_smote_cv_3"] == "ready"
+    assert statuses["model:does_not_exist"] == "failed"
+    assert statuses["dummy_batch:does_not_exist"] == "failed"
+    assert info["finished"] and not info["ready"]
+    assert info["cold_start_seconds"] > 0
+    assert statuses["model:lstm_smote_cv_3"] == "ready"
+
+
+def test_model_status_is_read_from_the_registry():
+    registry = ModelRegistry.get_instance()
+    manager = WarmupManager(model_ids=["lstm_smote_cv_3"])
+    artifacts = {artifact["name"]: artifact for artifact in manager.get_warmup_info()["artifacts"]}
+
+    assert artifacts["model:lstm_smote_cv_3"] == registry.model_status("lstm_smote_cv_3")
+    assert manager.is_ready == (
+        registry.is_ready("lstm_smote_cv_3") and artifacts["dataset"]["status"] == "ready"
+    )
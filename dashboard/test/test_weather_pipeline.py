@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+import pytest
+from dashboard.backend import weather_pipeline
+from dashboard.backend.incremental_prediction import IncrementalPredictor
+from dashboard.backend.inference import DataLoader
+from dashboard.backend.weather_pipeline import (
+    CITY_COORDINATES,
+    CITY_NAMES,
+    CityNeighborIndex,
+    CityRainfall,
+    WeatherFloodPipeline,
+    fetch_city_rainfall,
+)
+
+
+def test_neighbor_index_interpolates_and_skips_missing_cities():
+    points = CITY_COORDINATES[:2] + 0.01
+    city_values = np.arange(len(CITY_COORDINATES), dtype=np.float64)
+
+    nearest = CityNeighborIndex(points, neighbors=1)
+    np.testing.assert_allclose(nearest.interpolate(city_values), [0.0, 1.0])
+
+    idw = CityNeighborIndex(points, neighbors=4)
+    interpolated = idw.interpolate(city_values)
+    assert np.all((interpolated >= city_values.min()) & (interpolated <= city_values.max()))
+
+    # A city without data drops out of the weights; no data at all gives NaN
+    city_values[0] = np.nan
+    assert np.isfinite(idw.interpolate(city_values)[0])
+    assert np.isnan(nearest.interpolate(city_values)[0])
+
+
+def test_idw_weights_follow_inverse_distance():
+    city_values = np.arange(len(CITY_COORDINATES), dtype=np.float64) * 10
+
+    # At a city the weight of that city dominates every other one.
+    on_city = CityNeighborIndex(CITY_COORDINATES[3:4], neighbors=4, power=2)
+    np.testing.assert_allclose(on_city.interpolate(city_values), [30.0], atol=1e-3)
+
+    # With power 0 every neighbor weighs the same: the plain mean of the k nearest.
+    point = CITY_COORDINATES[:1] + 0.2
+    flat = CityNeighborIndex(point, neighbors=3, power=0)
+    np.testing.assert_allclose(flat.interpolate(city_values), [city_values[flat.index[0]].mean()])
+
+    weighted = CityNeighborIndex(point, neighbors=3, power=2)
+    lat, lon = np.radians(point[0])
+    city_lat, city_lon = np.radians(CITY_COORDINATES[weighted.index[0]]).T
+    distances = 2 * 6371.0 * np.arcsin(np.sqrt(
+        np.sin((city_lat - lat) / 2) ** 2 + np.cos(lat) * np.cos(city_lat) * np.sin((city_lon - lon) / 2) ** 2
+    ))
+    expected = np.sum(city_values[weighted.index[0]] / distances**2) / np.sum(1.0 / distances**2)
+    np.testing.assert_allclose(weighted.interpolate(city_values), [expected])
+
+
+def _stub_weather(monkeypatch, current, forecast):
+    monkeypatch.setattr(weather_pipeline.WeatherService, "fetch_current_weather", staticmethod(current))
+    monkeypatch.setattr(weather_pipeline.WeatherService, "fetch_forecast_data", staticmethod(forecast))
+
+
+def test_rainfall_combines_current_weather_and_forecast(monkeypatch):
+    _stub_weather(
+        monkeypatch,
+        lambda city, lat, lon: {"rainfall": 4.0},
+        lambda city, lat, lon: [{"rainfall": 2.0}, {"rainfall": 3.0}, {"rainfall": 5.0}, {"rainfall": 7.0}],
+    )
+    rainfall = fetch_city_rainfall(workers=2)
+    assert rainfall.available == len(CITY_NAMES)
+    np.testing.assert_allclose(rainfall.precip_1d, 4.0)
+    np.testing.assert_allclose(rainfall.precip_3d, 10.0)
+
+
+def test_all_cities_failing_is_an_error_not_a_stale_prediction(monkeypatch):
+    _stub_weather(monkeypatch, lambda city, lat, lon: None, lambda city, lat, lon: [])
+    rainfall = fetch_city_rainfall(workers=2)
+    assert rainfall.available == 0
+    assert all(math.isnan(value) for value in rainfall.precip_1d)
+
+    with pytest.raises(RuntimeError, match="city requests failed"):
+        WeatherFloodPipeline().apply(rainfall)
+
+
+def test_equal_rainfall_gives_equal_results_whatever_ran_before(monkeypatch):
+    coordinates = DataLoader.get_instance().get_coordinate_array()
+    pipeline = WeatherFloodPipeline()
+    pipeline._index, pipeline._coordinates = CityNeighborIndex(coordinates, neighbors=1), coordinates
+    predictor = {"current": IncrementalPredictor("lstm_smote_cv_3")}
+    monkeypatch.setattr(
+        IncrementalPredictor, "get_instance", classmethod(lambda cls, model_id=None: predictor["current"])
+    )
+
+    # The two cities nearest to most points fail in turn.
+    first_city, second_city = np.argsort(np.bincount(pipeline._index.index[:, 0]))[-2:]
+
+    def partial_fetch(failed_city, mm):
+        values = np.full(len(CITY_NAMES), mm)
+        values[failed_city] = np.nan
+        return CityRainfall(values, values * 3, "test")
+
+    first, second = partial_fetch(first_city, 150.0), partial_fetch(second_city, 250.0)
+    pipeline.apply(first)
+    after_first = pipeline.apply(second).probabilities.copy()
+
+    predictor["current"] = IncrementalPredictor("lstm_smote_cv_3")
+    np.testing.assert_array_equal(after_first, pipeline.apply(second).probabilities)
@@ -1,29 +1,91 @@
 import reflex as rx
 
-from ..components import map_container, tile_layer, circle_marker, FilterSidebarState
+from config import SULSEL_MAX_BOUNDS, CLUSTER_MAX_ZOOM
+
+from ..components import (
+    map_container, tile_layer, point_canvas_layer, cluster_layer, vector_tile_layer, FilterSidebarState,
+)
 from ..backend import MapState
 
 
-def circle_marker_component(coordinate):
-    return circle_marker(
-        center=coordinate,
+# [[minimum value, color], ...] of the canvas point layer
+GROUND_TRUTH_COLORS = [[1, "#dc2626"]]
+FLOOD_PROBABILITY_COLORS = [[0.7, "#f97316"], [0.9, "#dc2626"]]
+
+def flood_cluster_url():
+    """Cluster endpoint of the shown points; empty (no clusters) for top-k or before a prediction."""
+    api_url = rx.config.get_config().api_url
+    prediction_url = f"{api_url}/api/clusters/{MapState.flood_tile_run_id}?threshold={MapState.sigmoid_threshold}"
+    return rx.cond(
+        FilterSidebarState.value == "target",
+        f"{api_url}/api/clusters/ground_truth?threshold=0",
+        rx.cond((MapState.flood_tile_run_id != "") & (MapState.top_k == 0), prediction_url, ""),
+    )
+
+def flood_cluster_layer():
+    return cluster_layer(
+        url=flood_cluster_url(),
+        max_zoom=CLUSTER_MAX_ZOOM,
+        color_stops=rx.cond(FilterSidebarState.value == "target", GROUND_TRUTH_COLORS, FLOOD_PROBABILITY_COLORS),
         radius=3,
         color="blue",
-        fill_color="blue",
         fill_opacity=0.6,
         weight=1,
     )
 
-def flood_marker():
+def flood_tile_url():
+    """Vector tiles of the shown points; empty (no tiles) for top-k or before a prediction."""
+    api_url = rx.config.get_config().api_url
+    prediction_url = (
+        f"{api_url}/api/tiles/flood/{MapState.flood_tile_run_id}/{{z}}/{{x}}/{{y}}.mvt"
+        f"?threshold={MapState.sigmoid_threshold}"
+    )
     return rx.cond(
         FilterSidebarState.value == "target",
-        rx.foreach(MapState.ground_truth_coordinates, circle_marker_component),
-        rx.foreach(MapState.predicted_flood_coordinates, circle_marker_component)
+        f"{api_url}/api/tiles/flood/ground_truth/{{z}}/{{x}}/{{y}}.mvt?threshold=0",
+        rx.cond((MapState.flood_tile_run_id != "") & (MapState.top_k == 0), prediction_url, ""),
+    )
+
+def flood_point_tile_layer():
+    # Takes over from the clusters: every point past CLUSTER_MAX_ZOOM, fetched per visible tile.
+    return vector_tile_layer(
+        url=flood_tile_url(),
+        layer_styles={
+            "flood": {
+                "probabilityColors": rx.cond(
+                    FilterSidebarState.value == "target", GROUND_TRUTH_COLORS, FLOOD_PROBABILITY_COLORS
+                ),
+                "radius": 3,
+                "fillColor": "blue",
+                "fillOpacity": 0.6,
+            },
+        },
+        min_zoom=CLUSTER_MAX_ZOOM + 1,
+        z_index=400,
+    )
+
+def top_k_marker():
+    # The top-k points are few enough to send as state and draw at every zoom.
+    return point_canvas_layer(
+        points=rx.cond(FilterSidebarState.value == "target", [], MapState.predicted_flood_points),
+        values=MapState.predicted_flood_probabilities,
+        color_stops=FLOOD_PROBABILITY_COLORS,
+        radius=3,
+        color="blue",
+        fill_opacity=0.6,
+        weight=1,
+    )
+
+def regency_boundary_layer():
+    return vector_tile_layer(
+        url=f"{rx.config.get_config().api_url}/api/tiles/boundaries/{{z}}/{{x}}/{{y}}.mvt",
+        layer_styles={"boundaries": {"color": "#6b7280", "weight": 1, "fillOpacity": 0}},
+        z_index=300,
     )
 
 def south_sulawesi_map_display() -> rx.Component:
     """Render the map display with a tile layer."""
-    max_bounds = [[-1.396842, 118.991911], [-7.941256, 122.786092]]
+    max_bounds = SULSEL_MAX_BOUNDS
     raster_map_url = rx.color_mode_cond(
         "https://{s}.basemaps.cartocdn.com/rastertiles/voyager_nolabels/{z}/{x}/{y}{r}.png",
         "https://{s}.basemaps.cartocdn.com/light_nolabels/{z}/{x}/{y}.png",
@@ -33,11 +95,15 @@ def south_sulawesi_map_display() -> rx.Component:
                 url=raster_map_url,
                 attribution="&copy; <a href='https://www.openstreetmap.org/copyright'>OpenStreetMap</a> contributors",
             ),
-            flood_marker(),
+            regency_boundary_layer(),
+            flood_cluster_layer(),
+            flood_point_tile_layer(),
+            top_k_marker(),
             center=[-4.056912, 119.910098],
             max_bounds=max_bounds,
             zoom=6.3,
             scroll_wheel_zoom=True,
+            on_view_change=MapState.set_viewport,
             height="100%",
             width="100%",
             border_radius="1em",